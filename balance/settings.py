@@ -45,6 +45,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'main.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -142,6 +143,54 @@ CACHES = {
     }
 }
 
+# Время, в течение которого процесс не сверяет локальную таблицу курсов валют с Redis, в секундах
+EXCHANGE_RATES_L1_TTL = config('EXCHANGE_RATES_L1_TTL', default=60, cast=float)
+
+# Обновление курсов валют: курсы актуальны EXCHANGE_RATES_FRESH_TTL секунд после получения и отдаются
+# до EXCHANGE_RATES_STALE_TTL секунд, если обновить их не удаётся. Задача обновления запускается раз
+# в EXCHANGE_RATES_CHECK_INTERVAL секунд и запрашивает API, когда до истечения актуальности остаётся
+# не более EXCHANGE_RATES_REFRESH_AHEAD секунд
+EXCHANGE_API_URL = config('EXCHANGE_API_URL', default='https://v6.exchangerate-api.com/v6/{key}/latest/RUB')
+EXCHANGE_RATES_FRESH_TTL = config('EXCHANGE_RATES_FRESH_TTL', default=60 * 60 * 24, cast=int)
+EXCHANGE_RATES_STALE_TTL = config('EXCHANGE_RATES_STALE_TTL', default=60 * 60 * 24 * 3, cast=int)
+EXCHANGE_RATES_REFRESH_AHEAD = config('EXCHANGE_RATES_REFRESH_AHEAD', default=60 * 60, cast=int)
+EXCHANGE_RATES_CHECK_INTERVAL = config('EXCHANGE_RATES_CHECK_INTERVAL', default=5 * 60, cast=int)
+# Запрос к API: количество попыток, начальная задержка между ними (удваивается) и тайм-аут, в секундах
+EXCHANGE_RATES_FETCH_ATTEMPTS = config('EXCHANGE_RATES_FETCH_ATTEMPTS', default=4, cast=int)
+EXCHANGE_RATES_FETCH_BACKOFF = config('EXCHANGE_RATES_FETCH_BACKOFF', default=1.0, cast=float)
+EXCHANGE_RATES_FETCH_TIMEOUT = config('EXCHANGE_RATES_FETCH_TIMEOUT', default=5.0, cast=float)
+
+# Асинхронные представления чтения баланса и истории транзакций (для запуска под ASGI-сервером)
+ASYNC_READ_VIEWS = config('ASYNC_READ_VIEWS', default=False, cast=bool)
+
+# Быстрый путь эндпоинтов зачисления, списания и перевода: проверка данных без сериализатора DRF
+# и разбор/сериализация JSON через orjson; нетипичные запросы обрабатываются представлениями DRF
+TRANSACTION_FAST_PATH = config('TRANSACTION_FAST_PATH', default=False, cast=bool)
+
+# Кэш балансов пользователей, заполняемый после фиксации транзакций
+BALANCE_CACHE_ENABLED = config('BALANCE_CACHE_ENABLED', default=True, cast=bool)
+BALANCE_CACHE_TTL = config('BALANCE_CACHE_TTL', default=60 * 60, cast=int)
+
+# Заголовок Idempotency-Key: время хранения ответа, время резервирования ключа незавершённым запросом,
+# максимальное время ожидания конкурентным дубликатом и интервал опроса при ожидании, в секундах
+IDEMPOTENCY_TTL = config('IDEMPOTENCY_TTL', default=60 * 60 * 24, cast=int)
+IDEMPOTENCY_LOCK_TIMEOUT = config('IDEMPOTENCY_LOCK_TIMEOUT', default=30, cast=int)
+IDEMPOTENCY_WAIT_TIMEOUT = config('IDEMPOTENCY_WAIT_TIMEOUT', default=10, cast=float)
+IDEMPOTENCY_POLL_INTERVAL = config('IDEMPOTENCY_POLL_INTERVAL', default=0.05, cast=float)
+
+# Запись журнала транзакций: 'sync' - записи Transaction сохраняются в транзакции исполнения операции,
+# 'outbox' - сохраняется компактная запись LedgerOutbox, переносимая в Transaction задачей flush_ledger_outbox
+LEDGER_MODE = config('LEDGER_MODE', default='sync')
+# Количество записей outbox, переносимых в одной транзакции, и интервал запуска переноса, в секундах
+LEDGER_OUTBOX_BATCH_SIZE = config('LEDGER_OUTBOX_BATCH_SIZE', default=5000, cast=int)
+LEDGER_FLUSH_INTERVAL = config('LEDGER_FLUSH_INTERVAL', default=1.0, cast=float)
+
+# Количество месяцев после текущего, на которые заранее создаются партиции таблицы транзакций (PostgreSQL)
+TRANSACTION_PARTITIONS_AHEAD = config('TRANSACTION_PARTITIONS_AHEAD', default=3, cast=int)
+
+# Количество строк, читаемых из серверного курсора и отправляемых клиенту за раз при выгрузке транзакций
+TRANSACTIONS_EXPORT_CHUNK_SIZE = config('TRANSACTIONS_EXPORT_CHUNK_SIZE', default=2000, cast=int)
+
 CELERY_BROKER_URL = 'redis://redis:6379/0'
 CELERY_RESULT_BACKEND = 'redis://redis:6379/0'
 CELERY_ACCEPT_CONTENT = ['json']
@@ -150,12 +199,45 @@ CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'Europe/Moscow'
 
 CELERY_BEAT_SCHEDULE = {
-    'update-exchange-rates-every-24-hours': {
+    'refresh-exchange-rates': {
         'task': 'main.tasks.update_exchange_rates',
+        'schedule': EXCHANGE_RATES_CHECK_INTERVAL,
+    },
+    'flush-ledger-outbox': {
+        'task': 'main.tasks.flush_ledger_outbox',
+        'schedule': LEDGER_FLUSH_INTERVAL,
+    },
+    'create-transaction-partitions-every-24-hours': {
+        'task': 'main.tasks.create_transaction_partitions',
         'schedule': 60 * 60 * 24,  # 24 часа
     },
 }
 
+# Максимальное количество операций в одном запросе на /transactions/batch/
+TRANSACTION_BATCH_MAX_SIZE = config('TRANSACTION_BATCH_MAX_SIZE', default=1000, cast=int)
+
+# Движок исполнения зачислений и списаний: 'conditional' - один условный UPDATE/UPSERT без блокировки,
+# 'locking' - блокировка баланса SELECT ... FOR UPDATE и сохранение изменённой строки
+TRANSACTION_ENGINE = config('TRANSACTION_ENGINE', default='conditional')
+
+# Максимальное количество пользователей в одном запросе на /balances/
+BALANCES_LOOKUP_MAX_USERS = config('BALANCES_LOOKUP_MAX_USERS', default=1000, cast=int)
+
+# Повтор транзакций при конфликте сериализации или взаимной блокировке
+TRANSACTION_RETRY_ATTEMPTS = config('TRANSACTION_RETRY_ATTEMPTS', default=3, cast=int)
+TRANSACTION_RETRY_BACKOFF = config('TRANSACTION_RETRY_BACKOFF', default=0.05, cast=float)
+
+# Интервал перечитывания процессом списка шардированных балансов, в секундах
+BALANCE_SHARDS_REFRESH_INTERVAL = config('BALANCE_SHARDS_REFRESH_INTERVAL', default=30, cast=float)
+
+# Профилирование ожидания блокировок балансов: строки блокируются по одной, время ожидания каждой учитывается
+# в top-K счетов процесса (LOCK_PROFILING_TOP_K) и не чаще раза в LOCK_PROFILING_FLUSH_INTERVAL секунд
+# прибавляется к общей статистике в Redis. Ожидания короче LOCK_PROFILING_MIN_WAIT секунд не учитываются
+LOCK_PROFILING = config('LOCK_PROFILING', default=False, cast=bool)
+LOCK_PROFILING_TOP_K = config('LOCK_PROFILING_TOP_K', default=100, cast=int)
+LOCK_PROFILING_FLUSH_INTERVAL = config('LOCK_PROFILING_FLUSH_INTERVAL', default=10.0, cast=float)
+LOCK_PROFILING_MIN_WAIT = config('LOCK_PROFILING_MIN_WAIT', default=0.001, cast=float)
+
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Transaction API',
     'DESCRIPTION': 'Предоставляет функционал обработки транзакций и работы со счетами пользователей',
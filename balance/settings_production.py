@@ -0,0 +1,33 @@
+"""
+Django settings for running the balance project in production.
+
+Extends balance.settings: disables DEBUG (which otherwise keeps every executed SQL query in memory)
+and serves database connections from a psycopg3 connection pool sized from the environment.
+
+Usage: DJANGO_SETTINGS_MODULE=balance.settings_production gunicorn -c gunicorn.conf.py balance.wsgi:application
+"""
+from decouple import Csv, config
+
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES
+
+DEBUG = False
+
+ALLOWED_HOSTS = config('ALLOWED_HOSTS', default='localhost', cast=Csv())
+
+# Connection pooling
+# https://docs.djangoproject.com/en/5.2/ref/databases/#connection-pool
+# Пул открывается отдельно в каждом процессе-воркере; CONN_MAX_AGE с пулом должен быть равен 0.
+
+DATABASES['default'].update({
+    'CONN_MAX_AGE': 0,
+    'CONN_HEALTH_CHECKS': True,
+    'OPTIONS': {
+        'pool': {
+            'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+            'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+            'timeout': config('DB_POOL_TIMEOUT', default=10, cast=float),
+            'max_idle': config('DB_POOL_MAX_IDLE', default=600, cast=float),
+        },
+    },
+})
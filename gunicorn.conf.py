@@ -0,0 +1,25 @@
+import multiprocessing
+
+from decouple import config
+
+# Gunicorn configuration
+# https://docs.gunicorn.org/en/stable/settings.html
+
+bind = config('GUNICORN_BIND', default='0.0.0.0:8000')
+
+# Количество процессов-воркеров; у каждого свой пул соединений с базой данных размером до DB_POOL_MAX_SIZE
+workers = config('WEB_CONCURRENCY', default=multiprocessing.cpu_count() * 2 + 1, cast=int)
+
+# 'gthread' для balance.wsgi:application, 'uvicorn.workers.UvicornWorker' для balance.asgi:application
+worker_class = config('GUNICORN_WORKER_CLASS', default='gthread')
+threads = config('GUNICORN_THREADS', default=4, cast=int)
+
+timeout = config('GUNICORN_TIMEOUT', default=30, cast=int)
+keepalive = config('GUNICORN_KEEPALIVE', default=5, cast=int)
+
+# Периодический перезапуск воркеров ограничивает рост памяти
+max_requests = config('GUNICORN_MAX_REQUESTS', default=10000, cast=int)
+max_requests_jitter = config('GUNICORN_MAX_REQUESTS_JITTER', default=1000, cast=int)
+
+accesslog = '-'
+errorlog = '-'
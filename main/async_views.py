@@ -0,0 +1,178 @@
+from decimal import Decimal
+from functools import wraps
+from typing import Any, Awaitable, Callable
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpRequest, JsonResponse
+from django.views import View
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotFound, ValidationError
+from rest_framework.utils.urls import replace_query_param
+
+from main.models import Balance, Transaction
+from main.pagination import TransactionCursorPagination, apply_keyset, decode_cursor, encode_cursor, \
+    filter_created_range, get_position, merge_pending
+from main.serializers import TransactionsListQuerySerializer
+from main.services.balance_cache import acache_balance, aget_cached_balance
+from main.services.exchange_rates import aget_exchange_rate
+from main.services.historical_rates import convert_rows
+from main.services.ledger import get_pending_transactions
+from main.services.metrics import timed
+from main.services.projection import TRANSACTION_FIELDS, get_columns, project_queryset, project_records, \
+    serialize_rows
+from main.services.sharding import aload_balance
+
+
+def api_errors(handler: Callable[..., Awaitable[JsonResponse]]) -> Callable[..., Awaitable[JsonResponse]]:
+    """
+    Декоратор асинхронного обработчика, преобразующий исключения DRF в JSON-ответы того же вида, что и у APIView.
+
+    Args:
+        handler (Callable[..., Awaitable[JsonResponse]]): Асинхронный обработчик запроса.
+
+    Returns:
+        Callable[..., Awaitable[JsonResponse]]: Обёрнутый обработчик.
+    """
+    @wraps(handler)
+    async def wrapper(*args: Any, **kwargs: Any) -> JsonResponse:
+        try:
+            return await handler(*args, **kwargs)
+        except APIException as exc:
+            return JsonResponse(exc.detail, status=exc.status_code, safe=False)
+
+    return wrapper
+
+
+class AsyncGetUserBalanceView(View):
+    """
+    Асинхронный вариант GetUserBalanceAPIView для запуска под ASGI-сервером.
+
+    Не занимает поток на время ожидания Redis и базы данных: кэш балансов и таблица курсов читаются асинхронным
+    клиентом Redis, баланс - асинхронным ORM.
+    """
+
+    @api_errors
+    async def get(self, request: HttpRequest, user_id: int) -> JsonResponse:
+        """
+        Принимает GET-запрос клиента.
+
+        Args:
+            request (HttpRequest): GET-запрос клиента.
+            user_id (int): ID пользователя, чей баланс необходимо вернуть.
+
+        Returns:
+            JsonResponse: ответ сервера на запрос клиента.
+        """
+        balance = await self.get_balance(user_id)
+        currency = request.GET.get('currency', 'RUB').upper()
+
+        if currency != 'RUB':
+            with timed('exchange_rate', 'balance'):
+                rate = await aget_exchange_rate(currency)
+            converted_balance = balance * rate
+        else:
+            converted_balance = balance
+
+        return JsonResponse(
+            {
+                'user_id': user_id,
+                'balance': f'{converted_balance:.2f}',
+                'currency': currency
+            },
+            status=status.HTTP_200_OK
+        )
+
+    async def get_balance(self, user_id: int) -> Decimal:
+        """
+        Получает баланс пользователя по его ID из кэша балансов, при промахе - из базы данных.
+
+        Args:
+            user_id (int): ID пользователя, чей баланс необходимо вернуть.
+
+        Returns:
+            Decimal: Баланс денежных средств пользователя.
+
+        Raises:
+            NotFound: В случае, если указанному user_id не соответствует ни один объект Balance.
+        """
+        cached_amount = await aget_cached_balance(user_id)
+        if cached_amount is not None:
+            return cached_amount
+
+        try:
+            balance = await aload_balance(user_id)
+        except Balance.DoesNotExist:
+            raise NotFound({'error': 'Баланс пользователя не найден'})
+
+        await acache_balance(user_id, balance.amount, balance.version)
+        return balance.amount
+
+
+class AsyncGetUserTransactionsView(View):
+    """
+    Асинхронный вариант GetUserTransactionsAPIView для запуска под ASGI-сервером.
+
+    Использует ту же курсорную пагинацию по (created_at, id), те же параметры fields и currency и тот же формат ответа.
+    """
+    pagination_class = TransactionCursorPagination
+
+    @api_errors
+    async def get(self, request: HttpRequest, user_id: int) -> JsonResponse:
+        """
+        Принимает GET-запрос клиента.
+
+        Args:
+            request (HttpRequest): GET-запрос клиента.
+            user_id (int): ID пользователя, чьи транзакции необходимо вернуть.
+
+        Returns:
+            JsonResponse: ответ сервера на запрос клиента.
+
+        Raises:
+            ValidationError: В случае, если передан недопустимый параметр 'ordering', 'cursor', 'from', 'to' или 'fields',
+                либо указанному user_id не соответствует ни один объект Transaction.
+        """
+        paginator = self.pagination_class()
+        ordering = request.GET.get(paginator.ordering_query_param, '-created_at')
+        if ordering not in paginator.ORDERINGS:
+            raise ValidationError({'error': f'Недопустимое значение ordering. Допустимые значения: '
+                                            f'{", ".join(paginator.ORDERINGS)}'})
+        cursor = request.GET.get(paginator.cursor_query_param)
+        position = decode_cursor(cursor) if cursor else None
+
+        query_serializer = TransactionsListQuerySerializer(data=request.GET)
+        query_serializer.is_valid(raise_exception=True)
+        date_range = query_serializer.validated_data
+        fields = date_range.get('fields', TRANSACTION_FIELDS)
+        columns = get_columns(fields)
+
+        queryset = filter_created_range(Transaction.objects.filter(user_id=user_id), date_range)
+        pending = filter_created_range(await sync_to_async(get_pending_transactions)(user_id), date_range)
+        pending = project_records(pending, columns)
+        if not pending and not await queryset.aexists():
+            raise ValidationError({'error': 'Транзакции пользователя не найдены'})
+
+        descending = paginator.ORDERINGS[ordering]
+        page = apply_keyset(project_queryset(queryset, columns), position, descending)[:paginator.page_size + 1]
+        rows = [row async for row in page]
+
+        next_link = None
+        if len(rows) > paginator.page_size:
+            rows = rows[:paginator.page_size]
+            next_link = replace_query_param(request.build_absolute_uri(), paginator.cursor_query_param,
+                                            encode_cursor(get_position(rows[-1])))
+        rows = merge_pending(rows, pending, descending, position is None, next_link is None)
+        results = serialize_rows(rows, fields)
+        if date_range['currency'] != 'RUB':
+            with timed('exchange_rate', 'history'):
+                await sync_to_async(convert_rows)(results, rows, date_range['currency'])
+
+        return JsonResponse(
+            {
+                'next': next_link,
+                'results': results
+            },
+            encoder=DjangoJSONEncoder,
+            status=status.HTTP_200_OK
+        )
@@ -0,0 +1,29 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class ConcurrencyConflict(APIException):
+    """
+    Исключение, возникающее, если транзакцию не удалось исполнить из-за конкурентного доступа к балансам.
+    """
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = {'error': 'Операция не выполнена из-за конкурентного доступа, повторите запрос'}
+    default_code = 'concurrency_conflict'
+
+
+class IdempotencyKeyInProgress(APIException):
+    """
+    Исключение, возникающее, если запрос с тем же Idempotency-Key не завершился за отведённое время ожидания.
+    """
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = {'error': 'Запрос с этим Idempotency-Key ещё обрабатывается, повторите запрос позже'}
+    default_code = 'idempotency_key_in_progress'
+
+
+class IdempotencyKeyMismatch(APIException):
+    """
+    Исключение, возникающее, если Idempotency-Key повторно передан с другими параметрами запроса.
+    """
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = {'error': 'Idempotency-Key уже использован с другими параметрами запроса'}
+    default_code = 'idempotency_key_mismatch'
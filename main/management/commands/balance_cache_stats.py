@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from main.services.balance_cache import BalanceCacheStats
+
+
+class Command(BaseCommand):
+    help = 'Выводит общие по всем процессам счётчики попаданий и промахов кэша балансов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Обнулить счётчики после вывода')
+
+    def handle(self, *args, **options):
+        totals = BalanceCacheStats.totals()
+        lookups = totals['hits'] + totals['misses']
+        hit_ratio = totals['hits'] / lookups if lookups else 0.0
+
+        self.stdout.write(f"Попадания: {totals['hits']}")
+        self.stdout.write(f"Промахи: {totals['misses']}")
+        self.stdout.write(f'Доля попаданий: {hit_ratio:.2%}')
+
+        if options['reset']:
+            BalanceCacheStats.reset_totals()
+            self.stdout.write(self.style.SUCCESS('Счётчики обнулены'))
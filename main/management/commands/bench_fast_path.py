@@ -0,0 +1,99 @@
+import json
+import time
+from decimal import Decimal
+from typing import Callable
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from main.models import Balance, Transaction
+from main.serializers import TransactionSerializer
+from main.services.fast_path import dumps, loads, validate_transaction
+from main.views import DepositAPIView, FastTransactionView
+
+RESPONSE = {'detail': 'Операция успешно выполнена', 'balance': '1234.56', 'completed_at': '01.01.2026 00:00:00'}
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает стоимость обработки запроса на зачисление представлением DRF и быстрым путём '
+            '(TRANSACTION_FAST_PATH) в одном потоке текущего процесса: разбор, проверку данных и сериализацию '
+            'ответа без базы данных и полный запрос с исполнением транзакции')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20000,
+                            help='Количество итераций разбора, проверки и сериализации')
+        parser.add_argument('--transactions', type=int, default=2000,
+                            help='Количество полных запросов к каждому представлению')
+        parser.add_argument('--user-id', type=int, default=10_000_000,
+                            help='ID пользователя, на баланс которого выполняются зачисления')
+        parser.add_argument('--output', help='Путь к JSON-файлу с результатами')
+
+    def handle(self, *args, **options):
+        body = json.dumps({'operation': 'deposit', 'to_user_id': options['user_id'], 'amount': '10.50',
+                           'comment': 'нагрузочный тест'}).encode()
+        results = {
+            'codec': {
+                'drf': self.measure(lambda: self.drf_codec(body), options['requests']),
+                'fast': self.measure(lambda: self.fast_codec(body), options['requests']),
+            },
+        }
+
+        if options['transactions']:
+            Balance.objects.get_or_create(user_id=options['user_id'])
+            factory = RequestFactory()
+            views = {'drf': DepositAPIView.as_view(), 'fast': FastTransactionView.as_view(view_class=DepositAPIView)}
+
+            def request(view: Callable) -> Callable[[], None]:
+                def send() -> None:
+                    response = view(factory.post('/api/v1/transactions/deposit/', body,
+                                                 content_type='application/json'))
+                    if hasattr(response, 'render'):
+                        response.render()
+                    assert response.status_code == 200, response.content
+                return send
+
+            try:
+                results['request'] = {name: self.measure(request(view), options['transactions'])
+                                      for name, view in views.items()}
+            finally:
+                Transaction.objects.filter(user_id=options['user_id']).delete()
+                Balance.objects.filter(user_id=options['user_id']).update(amount=Decimal('0.00'))
+
+        for stage, label in (('codec', 'Разбор, проверка и сериализация'), ('request', 'Полный запрос')):
+            if stage not in results:
+                continue
+            drf, fast = results[stage]['drf'], results[stage]['fast']
+            self.stdout.write(f'{label}: DRF {drf["rps"]:.0f} /с ({drf["us"]:.1f} мкс), '
+                              f'быстрый путь {fast["rps"]:.0f} /с ({fast["us"]:.1f} мкс), '
+                              f'ускорение {fast["rps"] / drf["rps"]:.2f}x')
+
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump(results, file, indent=2)
+
+    @staticmethod
+    def measure(function: Callable[[], None], iterations: int) -> dict[str, float]:
+        for _ in range(min(iterations, 100)):  # прогрев
+            function()
+
+        started = time.perf_counter()
+        for _ in range(iterations):
+            function()
+        elapsed = time.perf_counter() - started
+        return {'iterations': iterations, 'rps': iterations / elapsed, 'us': elapsed / iterations * 1e6}
+
+    @staticmethod
+    def drf_codec(body: bytes) -> None:
+        request = Request(RequestFactory().post('/', body, content_type='application/json'), parsers=[JSONParser()])
+        serializer = TransactionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        JSONRenderer().render(RESPONSE)
+
+    @staticmethod
+    def fast_codec(body: bytes) -> None:
+        request = RequestFactory().post('/', body, content_type='application/json')
+        assert validate_transaction(loads(request.body)) is not None
+        dumps(RESPONSE)
@@ -0,0 +1,99 @@
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает пропускную способность эндпоинтов чтения под WSGI- и ASGI-сервером. '
+            'Серверы должны быть запущены заранее, например: '
+            'gunicorn balance.wsgi:application и uvicorn balance.asgi:application (с ASYNC_READ_VIEWS=True)')
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--wsgi-url', default='http://localhost:8000', help='Адрес WSGI-сервера')
+        parser.add_argument('--asgi-url', default='http://localhost:8001', help='Адрес ASGI-сервера')
+        parser.add_argument('--path', action='append', dest='paths',
+                            help='Путь запроса; можно указать несколько раз. '
+                                 'По умолчанию: /api/v1/users/1/balance/?currency=USD')
+        parser.add_argument('--requests', type=int, default=5000, help='Количество запросов к каждому серверу')
+        parser.add_argument('--concurrency', type=int, default=200, help='Количество одновременных запросов')
+        parser.add_argument('--output', help='Путь к JSON-файлу с результатами')
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or ['/api/v1/users/1/balance/?currency=USD']
+        results = {}
+        for server in ('wsgi', 'asgi'):
+            base_url = options[f'{server}_url']
+            try:
+                results[server] = asyncio.run(self.run_load(base_url, paths, options['requests'],
+                                                            options['concurrency']))
+            except httpx.HTTPError as exc:
+                raise CommandError(f'Сервер {base_url} недоступен: {exc}')
+            self.report(server, base_url, results[server])
+
+        if results['wsgi']['rps']:
+            speedup = results['asgi']['rps'] / results['wsgi']['rps']
+            self.stdout.write(self.style.SUCCESS(f'ASGI / WSGI: {speedup:.2f}x'))
+
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump(results, file, indent=2)
+
+    async def run_load(self, base_url: str, paths: list[str], total: int, concurrency: int) -> dict:
+        """
+        Отправляет total запросов к серверу, не более concurrency одновременно.
+
+        Args:
+            base_url (str): Адрес сервера.
+            paths (list[str]): Пути запросов, перебираемые по кругу.
+            total (int): Общее количество запросов.
+            concurrency (int): Количество одновременных запросов.
+
+        Returns:
+            dict: Пропускная способность, перцентили задержки в миллисекундах и количество ошибок.
+        """
+        latencies = []
+        errors = 0
+        counter = iter(range(total))
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+            await client.get(paths[0])  # проверка доступности сервера и прогрев
+
+            async def worker():
+                nonlocal errors
+                for index in counter:
+                    started = time.perf_counter()
+                    try:
+                        response = await client.get(paths[index % len(paths)])
+                        failed = response.status_code >= 500
+                    except httpx.TransportError:
+                        failed = True
+                    latencies.append((time.perf_counter() - started) * 1000)
+                    errors += failed
+
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            elapsed = time.perf_counter() - started
+
+        quantiles = statistics.quantiles(latencies, n=100)
+        return {
+            'requests': total,
+            'concurrency': concurrency,
+            'errors': errors,
+            'rps': total / elapsed,
+            'p50_ms': quantiles[49],
+            'p95_ms': quantiles[94],
+            'p99_ms': quantiles[98],
+        }
+
+    def report(self, server: str, base_url: str, result: dict) -> None:
+        self.stdout.write(
+            f"{server.upper()} ({base_url}): {result['rps']:.0f} запросов/с, "
+            f"p50 {result['p50_ms']:.1f} мс, p95 {result['p95_ms']:.1f} мс, p99 {result['p99_ms']:.1f} мс, "
+            f"ошибок: {result['errors']}"
+        )
@@ -0,0 +1,289 @@
+import json
+import multiprocessing
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.models import F, Q
+from rest_framework.exceptions import APIException, ValidationError
+
+from main.enums import TransactionType
+from main.exceptions import ConcurrencyConflict
+from main.models import Balance, BalanceShard, LedgerOutbox, Transaction, UserPeriodSummary
+from main.services.balance_cache import invalidate_cached_balances
+from main.services.retry import retry_stats
+from main.services.sharding import demote, promote
+from main.services.stats import Counters
+from main.services.transaction_service import lock_stats, process_transaction
+
+
+def run_operations(operations: list[dict[str, Any]]) -> dict[str, Any]:
+    """
+    Последовательно исполняет операции через process_transaction и замеряет задержку каждой из них.
+
+    Выполняется в потоке или процессе пула; по завершении закрывает соединение с базой данных этого потока.
+
+    Args:
+        operations (list[dict[str, Any]]): Входные данные транзакций.
+
+    Returns:
+        dict[str, Any]: Задержки успешных операций по типам (в секундах), количество отклонённых операций,
+            конфликтов и ошибок, а также приращения счётчиков retry_stats и lock_stats.
+    """
+    retry_before, lock_before = retry_stats.snapshot(), lock_stats.snapshot()
+    latencies = {operation_type.value: [] for operation_type in TransactionType}
+    outcome = {'rejected': 0, 'conflicts': 0, 'errors': 0}
+
+    try:
+        for operation in operations:
+            started = time.perf_counter()
+            try:
+                process_transaction(operation)
+            except ConcurrencyConflict:
+                outcome['conflicts'] += 1
+            except (ValidationError, APIException):
+                outcome['rejected'] += 1
+            except Exception:
+                outcome['errors'] += 1
+            else:
+                latencies[operation['operation']].append(time.perf_counter() - started)
+    finally:
+        connection.close()
+
+    return {
+        'latencies': latencies,
+        **outcome,
+        'retry_stats': Counters.diff(retry_stats.snapshot(), retry_before),
+        'lock_stats': Counters.diff(lock_stats.snapshot(), lock_before),
+    }
+
+
+class Command(BaseCommand):
+    help = ('Нагрузочное тестирование движка транзакций: создаёт N балансов и исполняет смесь зачислений, '
+            'списаний и переводов из пула потоков или процессов, сообщает пропускную способность, '
+            'перцентили задержки, количество взаимных блокировок и повторов и время ожидания блокировок')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--accounts', type=int, default=1000, help='Количество создаваемых балансов')
+        parser.add_argument('--operations', type=int, default=10000, help='Общее количество операций')
+        parser.add_argument('--workers', type=int, default=16, help='Размер пула потоков или процессов')
+        parser.add_argument('--executor', choices=('thread', 'process'), default='thread')
+        parser.add_argument('--mix', default='deposit=0.4,withdrawal=0.3,transfer=0.3',
+                            help='Доли типов операций, например deposit=0.4,withdrawal=0.3,transfer=0.3')
+        parser.add_argument('--hot-accounts', type=int, default=10,
+                            help='Количество "горячих" балансов, на которые приходится доля --hot-ratio операций')
+        parser.add_argument('--hot-ratio', type=float, default=0.0,
+                            help='Доля операций, затрагивающих "горячие" балансы (0 - равномерное распределение)')
+        parser.add_argument('--hot-shards', type=int, default=0,
+                            help='Сделать "горячие" балансы шардированными с указанным количеством слотов')
+        parser.add_argument('--initial-balance', type=Decimal, default=Decimal('1000.00'))
+        parser.add_argument('--max-amount', type=Decimal, default=Decimal('50.00'),
+                            help='Максимальная сумма операции')
+        parser.add_argument('--user-id-offset', type=int, default=10_000_000,
+                            help='Первый user_id создаваемых балансов; диапазон не должен пересекаться с реальными')
+        parser.add_argument('--seed', type=int, default=None, help='Начальное значение генератора операций')
+        parser.add_argument('--output', help='Путь к JSON-файлу с результатами')
+        parser.add_argument('--cleanup', action='store_true',
+                            help='Удалить созданные балансы и транзакции после теста')
+
+    def handle(self, *args, **options):
+        mix = self.parse_mix(options['mix'])
+        user_ids = list(range(options['user_id_offset'], options['user_id_offset'] + options['accounts']))
+        if options['accounts'] < 2:
+            raise CommandError('Для переводов необходимо не менее двух балансов')
+
+        self.seed_balances(user_ids, options['initial_balance'])
+        hot_ids = user_ids[:max(2, options['hot_accounts'])]
+        for user_id in hot_ids:
+            if options['hot_shards']:
+                promote(user_id, options['hot_shards'])
+            else:
+                demote(user_id)
+        operations = self.generate_operations(user_ids, mix, options)
+        chunks = [operations[index::options['workers']] for index in range(options['workers'])]
+
+        connections.close_all()
+        retry_before, lock_before = retry_stats.snapshot(), lock_stats.snapshot()
+        started = time.perf_counter()
+        if options['executor'] == 'thread':
+            with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+                results = list(executor.map(run_operations, chunks))
+            # Потоки разделяют счётчики процесса, поэтому берутся общие приращения, а не сумма по потокам
+            retry_delta = Counters.diff(retry_stats.snapshot(), retry_before)
+            lock_delta = Counters.diff(lock_stats.snapshot(), lock_before)
+        else:
+            context = multiprocessing.get_context('fork')
+            with ProcessPoolExecutor(max_workers=options['workers'], mp_context=context) as executor:
+                results = list(executor.map(run_operations, chunks))
+            retry_delta = self.sum_counters(result['retry_stats'] for result in results)
+            lock_delta = self.sum_counters(result['lock_stats'] for result in results)
+        elapsed = time.perf_counter() - started
+
+        report = self.build_report(options, mix, results, elapsed, retry_delta, lock_delta)
+        self.print_report(report)
+
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump(report, file, indent=2)
+            self.stdout.write(f"Результаты сохранены в {options['output']}")
+
+        if options['cleanup']:
+            self.cleanup(user_ids)
+
+    def parse_mix(self, value: str) -> dict[str, float]:
+        try:
+            mix = {name.strip(): float(weight) for name, weight in (item.split('=') for item in value.split(','))}
+        except ValueError:
+            raise CommandError('Некорректный формат --mix')
+
+        unknown = set(mix) - {operation_type.value for operation_type in TransactionType}
+        if unknown or not sum(mix.values()):
+            raise CommandError(f'Некорректные типы операций в --mix: {", ".join(sorted(unknown))}')
+        return mix
+
+    def seed_balances(self, user_ids: list[int], initial_balance: Decimal) -> None:
+        Balance.objects.bulk_create([Balance(user_id=user_id) for user_id in user_ids], ignore_conflicts=True)
+        # Новая версия, чтобы кэш балансов не принял устаревшие значения, записанные до обновления
+        Balance.objects.filter(user_id__in=user_ids).update(amount=initial_balance, version=F('version') + 1)
+        invalidate_cached_balances(user_ids)
+
+    def cleanup(self, user_ids: list[int]) -> None:
+        """
+        Удаляет балансы, созданные тестом, и все связанные с ними данные.
+
+        Записи outbox удаляются первыми, чтобы их перенос не создал транзакции после удаления. Балансы удаляются
+        из кэша: пересозданная строка Balance начнёт с версии 0, и кэш отклонял бы её значения до истечения
+        BALANCE_CACHE_TTL.
+
+        Args:
+            user_ids (list[int]): ID созданных балансов.
+
+        Returns:
+            None
+        """
+        LedgerOutbox.objects.filter(Q(from_user_id__in=user_ids) | Q(to_user_id__in=user_ids)).delete()
+        Transaction.objects.filter(user_id__in=user_ids).delete()
+        UserPeriodSummary.objects.filter(user_id__in=user_ids).delete()
+        BalanceShard.objects.filter(user_id__in=user_ids).delete()
+        Balance.objects.filter(user_id__in=user_ids).delete()
+        invalidate_cached_balances(user_ids)
+
+    def generate_operations(self, user_ids: list[int], mix: dict[str, float], options: dict) -> list[dict]:
+        """
+        Генерирует входные данные операций с заданной смесью типов и перекосом на "горячие" балансы.
+
+        Args:
+            user_ids (list[int]): ID созданных балансов.
+            mix (dict[str, float]): Доли типов операций.
+            options (dict): Параметры команды.
+
+        Returns:
+            list[dict]: Входные данные транзакций.
+        """
+        rng = random.Random(options['seed'])
+        hot_ids = user_ids[:max(2, options['hot_accounts'])]
+        max_cents = int(options['max_amount'] * 100)
+
+        def pick_user() -> int:
+            return rng.choice(hot_ids if rng.random() < options['hot_ratio'] else user_ids)
+
+        operations = []
+        for operation in rng.choices(list(mix), weights=list(mix.values()), k=options['operations']):
+            amount = Decimal(rng.randint(1, max_cents)) / 100
+            data = {'operation': operation, 'amount': amount}
+            if operation == TransactionType.DEPOSIT.value:
+                data['to_user_id'] = pick_user()
+            elif operation == TransactionType.WITHDRAWAL.value:
+                data['from_user_id'] = pick_user()
+            else:
+                data['from_user_id'] = pick_user()
+                data['to_user_id'] = pick_user()
+                while data['to_user_id'] == data['from_user_id']:
+                    data['to_user_id'] = pick_user()
+            operations.append(data)
+
+        return operations
+
+    @staticmethod
+    def sum_counters(snapshots) -> dict[str, float]:
+        total = {}
+        for snapshot in snapshots:
+            for name, value in snapshot.items():
+                total[name] = total.get(name, 0) + value
+        return total
+
+    @staticmethod
+    def percentiles(latencies: list[float]) -> dict[str, float | None]:
+        if len(latencies) < 2:
+            value = latencies[0] * 1000 if latencies else None
+            return {'p50_ms': value, 'p95_ms': value, 'p99_ms': value}
+
+        quantiles = statistics.quantiles(latencies, n=100)
+        return {'p50_ms': quantiles[49] * 1000, 'p95_ms': quantiles[94] * 1000, 'p99_ms': quantiles[98] * 1000}
+
+    def build_report(self, options: dict, mix: dict[str, float], results: list[dict], elapsed: float,
+                     retry_delta: dict[str, float], lock_delta: dict[str, float]) -> dict[str, Any]:
+        by_operation = {}
+        all_latencies = []
+        for operation in mix:
+            latencies = [latency for result in results for latency in result['latencies'][operation]]
+            all_latencies.extend(latencies)
+            by_operation[operation] = {'completed': len(latencies), **self.percentiles(latencies)}
+
+        acquisitions = lock_delta.get('lock_acquisitions', 0)
+        lock_wait = lock_delta.get('lock_wait_seconds', 0.0)
+        return {
+            'started_at': datetime.now(timezone.utc).isoformat(),
+            'config': {
+                'accounts': options['accounts'],
+                'operations': options['operations'],
+                'workers': options['workers'],
+                'executor': options['executor'],
+                'mix': mix,
+                'hot_accounts': options['hot_accounts'],
+                'hot_ratio': options['hot_ratio'],
+                'hot_shards': options['hot_shards'],
+                'seed': options['seed'],
+            },
+            'elapsed_seconds': elapsed,
+            'throughput_ops': len(all_latencies) / elapsed if elapsed else 0.0,
+            'completed': len(all_latencies),
+            'rejected': sum(result['rejected'] for result in results),
+            'conflicts': sum(result['conflicts'] for result in results),
+            'errors': sum(result['errors'] for result in results),
+            'latency': self.percentiles(all_latencies),
+            'by_operation': by_operation,
+            'deadlocks': int(retry_delta.get('deadlocks', 0)),
+            'serialization_failures': int(retry_delta.get('serialization_failures', 0)),
+            'retries': int(retry_delta.get('retries', 0)),
+            'lock_acquisitions': int(acquisitions),
+            'lock_wait_seconds': lock_wait,
+            'lock_wait_mean_ms': lock_wait / acquisitions * 1000 if acquisitions else 0.0,
+        }
+
+    def print_report(self, report: dict[str, Any]) -> None:
+        def ms(value: float | None) -> str:
+            return '-' if value is None else f'{value:.2f} мс'
+
+        latency = report['latency']
+        self.stdout.write(f"Время: {report['elapsed_seconds']:.2f} с, "
+                          f"пропускная способность: {report['throughput_ops']:.1f} оп/с")
+        self.stdout.write(f"Выполнено: {report['completed']}, отклонено: {report['rejected']}, "
+                          f"конфликтов: {report['conflicts']}, ошибок: {report['errors']}")
+        self.stdout.write(f"Задержка: p50 {ms(latency['p50_ms'])}, p95 {ms(latency['p95_ms'])}, "
+                          f"p99 {ms(latency['p99_ms'])}")
+        for operation, stats in report['by_operation'].items():
+            self.stdout.write(f"  {operation}: {stats['completed']} оп, p50 {ms(stats['p50_ms'])}, "
+                              f"p95 {ms(stats['p95_ms'])}, p99 {ms(stats['p99_ms'])}")
+        self.stdout.write(f"Взаимных блокировок: {report['deadlocks']}, "
+                          f"конфликтов сериализации: {report['serialization_failures']}, "
+                          f"повторов: {report['retries']}")
+        self.stdout.write(f"Ожидание блокировок: {report['lock_wait_seconds']:.3f} с "
+                          f"за {report['lock_acquisitions']} захватов "
+                          f"(в среднем {report['lock_wait_mean_ms']:.3f} мс)")
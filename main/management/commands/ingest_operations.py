@@ -0,0 +1,64 @@
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.models import IngestCheckpoint
+from main.services.ingest import IngestErrors, apply_batch, parse_lines, read_batches
+
+
+class Command(BaseCommand):
+    help = ('Загружает операции из файла JSONL (по одной операции в формате API на строку) пакетами через '
+            'сервисный слой. Позиция загрузки сохраняется после каждого пакета: повторный запуск после сбоя '
+            'продолжает загрузку с первой неисполненной строки')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', type=Path, help='Путь к файлу JSONL')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Количество операций в пакете')
+        parser.add_argument('--restart', action='store_true',
+                            help='Начать загрузку с начала файла, отбросив сохранённую позицию')
+        parser.add_argument('--max-errors', type=int, default=20,
+                            help='Количество ошибочных строк, выводимых подробно')
+
+    def handle(self, *args, **options):
+        path = options['path'].resolve()
+        if not path.is_file():
+            raise CommandError(f'Файл {path} не найден')
+        if options['batch_size'] < 1:
+            raise CommandError('Размер пакета должен быть положительным')
+        if options['max_errors'] < 0:
+            raise CommandError('Количество выводимых ошибочных строк не может быть отрицательным')
+
+        checkpoint, created = IngestCheckpoint.objects.get_or_create(source=str(path))
+        if options['restart'] and not created:
+            checkpoint.offset = checkpoint.lines = checkpoint.applied = checkpoint.rejected = 0
+            checkpoint.save()
+        if checkpoint.offset:
+            self.stdout.write(f'Продолжение загрузки со строки {checkpoint.lines + 1}')
+
+        errors = IngestErrors(options['max_errors'])
+        lines = applied = 0
+        started = time.perf_counter()
+
+        with path.open('rb') as file:
+            for batch in read_batches(parse_lines(file, checkpoint.offset, checkpoint.lines + 1),
+                                      options['batch_size'], errors):
+                applied += apply_batch(checkpoint, batch, errors)
+                lines += batch.lines
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'Строка {checkpoint.lines}: {self.rate(lines, started)} строк/с')
+
+        for number, line_errors in errors.first():
+            self.stderr.write(f'Строка {number}: {line_errors}')
+        if len(errors) > options['max_errors']:
+            self.stderr.write(f'... и ещё {len(errors) - options["max_errors"]} ошибочных строк')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано строк: {lines} за {time.perf_counter() - started:.1f} с ({self.rate(lines, started)} строк/с), '
+            f'исполнено операций: {applied}, отклонено: {len(errors)}. '
+            f'Всего по файлу: исполнено {checkpoint.applied}, отклонено {checkpoint.rejected}'
+        ))
+
+    @staticmethod
+    def rate(lines, started):
+        return f'{lines / max(time.perf_counter() - started, 1e-9):.0f}'
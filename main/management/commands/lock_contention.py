@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from main.services.contention import contention_profiler
+
+
+class Command(BaseCommand):
+    help = ('Выводит счета с наибольшим суммарным временем ожидания блокировок балансов по всем процессам '
+            '(собирается при LOCK_PROFILING = True)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=20, help='Количество счетов')
+        parser.add_argument('--reset', action='store_true', help='Сбросить статистику после вывода')
+
+    def handle(self, *args, **options):
+        if not 1 <= options['limit'] <= settings.LOCK_PROFILING_TOP_K:
+            raise CommandError(f'Количество счетов должно быть от 1 до {settings.LOCK_PROFILING_TOP_K}')
+        if not settings.LOCK_PROFILING:
+            self.stderr.write('LOCK_PROFILING выключен: новые ожидания блокировок не учитываются')
+
+        scope, accounts = contention_profiler.top(options['limit'])
+        if scope == 'process':
+            self.stderr.write('Redis недоступен: выведена статистика только текущего процесса')
+
+        for position, account in enumerate(accounts, start=1):
+            self.stdout.write(f"{position}. {account['user_id']}: ожидание {account['wait_seconds']:.3f} с, "
+                              f"ожиданий {account['waits']}")
+        if not accounts:
+            self.stdout.write('Ожиданий блокировок не зафиксировано')
+
+        if options['reset']:
+            contention_profiler.reset()
+            self.stdout.write(self.style.SUCCESS('Статистика сброшена'))
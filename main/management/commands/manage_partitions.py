@@ -0,0 +1,81 @@
+import datetime
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.timezone import now
+
+from main.services.partitions import (add_months, archive_partition, count_rows, create_partitions, drop_table,
+                                      is_partitioned, list_partitions, month_start)
+
+
+class Command(BaseCommand):
+    help = ('Управляет партициями таблицы транзакций: выводит их список, создаёт месячные партиции наперёд, '
+            'отсоединяет старые партиции и выгружает их в сжатые файлы')
+
+    def add_arguments(self, parser):
+        subparsers = parser.add_subparsers(dest='action', required=True)
+
+        subparsers.add_parser('status', help='Вывести партиции и количество строк в них')
+
+        create = subparsers.add_parser('create', help='Создать месячные партиции наперёд')
+        create.add_argument('--months', type=int, default=3,
+                            help='Количество месяцев после текущего, на которые должны существовать партиции')
+
+        archive = subparsers.add_parser('archive', help='Выгрузить и отсоединить партиции старше указанного месяца')
+        archive.add_argument('--before', required=True,
+                             help='Месяц в формате YYYY-MM: отсоединяются партиции, целиком лежащие до его начала')
+        archive.add_argument('--output-dir', type=Path,
+                             help='Каталог, в который партиции выгружаются в файлы <партиция>.csv.gz')
+        archive.add_argument('--drop', action='store_true',
+                             help='Удалить отсоединённые партиции (требует --output-dir)')
+        archive.add_argument('--dry-run', action='store_true', help='Только вывести партиции, которые будут отсоединены')
+
+    def handle(self, *args, **options):
+        if not is_partitioned():
+            raise CommandError('Таблица транзакций не секционирована: требуется PostgreSQL и миграция '
+                               '0009_partition_transactions')
+
+        getattr(self, f"handle_{options['action']}")(options)
+
+    def handle_status(self, options):
+        for partition in list_partitions():
+            if partition.is_default:
+                bounds = 'DEFAULT'
+            else:
+                bounds = f"{partition.lower or 'MINVALUE'} - {partition.upper or 'MAXVALUE'}"
+            self.stdout.write(f'{partition.name}: {bounds}, строк: {count_rows(partition)}')
+
+    def handle_create(self, options):
+        created = create_partitions(options['months'])
+        for name in created:
+            self.stdout.write(f'Создана партиция {name}')
+        self.stdout.write(self.style.SUCCESS(f'Партиций создано: {len(created)}'))
+
+    def handle_archive(self, options):
+        try:
+            before = month_start(datetime.date.fromisoformat(f"{options['before']}-01"))
+        except ValueError:
+            raise CommandError('Месяц --before должен быть в формате YYYY-MM')
+        if options['drop'] and not options['output_dir']:
+            raise CommandError('--drop требует --output-dir: удаляются только выгруженные партиции')
+        if before > add_months(month_start(now().date()), -1):
+            raise CommandError('Нельзя отсоединить партиции текущего и предыдущего месяцев')
+
+        boundary = datetime.datetime.combine(before, datetime.time(), tzinfo=datetime.timezone.utc)
+        partitions = [partition for partition in list_partitions()
+                      if not partition.is_default and partition.upper is not None and partition.upper <= boundary]
+
+        for partition in partitions:
+            if options['dry_run']:
+                self.stdout.write(f'{partition.name}: строк {count_rows(partition)}')
+                continue
+
+            path = archive_partition(partition, options['output_dir'])
+            if path is not None:
+                self.stdout.write(f'Партиция {partition.name} выгружена в {path}')
+            self.stdout.write(f'Партиция {partition.name} отсоединена')
+            if options['drop']:
+                drop_table(partition.name)
+                self.stdout.write(f'Партиция {partition.name} удалена')
+
+        self.stdout.write(self.style.SUCCESS(f'Обработано партиций: {len(partitions)}'))
@@ -0,0 +1,31 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils.timezone import localdate
+
+from main.services.summaries import rebuild_summaries
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает дневные и месячные итоги пользователей по журналу транзакций для периодов '
+            'до указанной даты (заполнение итогов за время до их инкрементального обновления)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--before', required=True,
+                            help='Дата в формате YYYY-MM-DD: пересчитываются дни до неё и месяцы до её месяца')
+        parser.add_argument('--user-ids', type=int, nargs='+', help='ID пользователей; по умолчанию - все')
+
+    def handle(self, *args, **options):
+        try:
+            before = datetime.date.fromisoformat(options['before'])
+        except ValueError:
+            raise CommandError('Дата --before должна быть в формате YYYY-MM-DD')
+        # Периоды итогов считаются в часовом поясе проекта (см. record_summaries), а не в локальном поясе сервера
+        if before > localdate():
+            raise CommandError('Нельзя пересчитать итоги текущих периодов: они обновляются при исполнении транзакций')
+
+        with transaction.atomic():
+            created = rebuild_summaries(before, options['user_ids'])
+
+        self.stdout.write(self.style.SUCCESS(f'Строк итогов создано: {created}'))
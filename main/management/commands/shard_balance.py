@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import NotFound
+
+from main.services.balance_cache import refresh_cached_balance
+from main.services.sharding import demote, load_balances, promote
+
+
+class Command(BaseCommand):
+    help = ('Делает баланс пользователя шардированным (зачисления распределяются по нескольким строкам) '
+            'или консолидирует его обратно в одну строку')
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=('promote', 'demote', 'show'))
+        parser.add_argument('user_ids', nargs='+', type=int, help='ID пользователей')
+        parser.add_argument('--shards', type=int, default=8, help='Количество слотов шардированного баланса')
+
+    def handle(self, *args, **options):
+        if options['action'] == 'promote' and not 1 <= options['shards'] <= 1024:
+            raise CommandError('Количество слотов должно быть от 1 до 1024')
+
+        for user_id in options['user_ids']:
+            try:
+                if options['action'] == 'promote':
+                    promote(user_id, options['shards'])
+                elif options['action'] == 'demote':
+                    demote(user_id)
+            except NotFound:
+                raise CommandError(f'Баланс пользователя {user_id} не найден')
+
+            balance = load_balances([user_id]).get(user_id)
+            if balance is None:
+                raise CommandError(f'Баланс пользователя {user_id} не найден')
+            if options['action'] != 'show':
+                refresh_cached_balance(user_id)
+
+            self.stdout.write(f'{user_id}: баланс {balance.amount:.2f}, слотов {balance.shard_count}')
+
+        if options['action'] != 'show':
+            self.stdout.write(self.style.SUCCESS(
+                'Готово. Процессы приложения учтут изменения в течение BALANCE_SHARDS_REFRESH_INTERVAL секунд'
+            ))
@@ -0,0 +1,100 @@
+import time
+from contextvars import ContextVar
+from typing import Any, Callable
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.http import HttpRequest, HttpResponse
+
+from main.services.metrics import request_queries, request_seconds
+
+
+class QueryCounter:
+    """
+    Количество SQL-запросов, исполненных при обработке HTTP-запроса.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+
+
+# Счётчик текущего HTTP-запроса. Контекст переносится sync_to_async в поток, где под ASGI выполняются запросы ORM,
+# поэтому запросы учитываются независимо от того, в каком потоке и соединении они исполнены
+current_query_counter: ContextVar[QueryCounter | None] = ContextVar('current_query_counter', default=None)
+
+
+def count_query(execute: Callable, sql: str, params: Any, many: bool, context: dict[str, Any]) -> Any:
+    """
+    Обёртка исполнения SQL-запросов (execute_wrappers), учитывающая запрос в счётчике текущего HTTP-запроса.
+    """
+    counter = current_query_counter.get()
+    if counter is not None:
+        counter.count += 1
+    return execute(sql, params, many, context)
+
+
+def install_query_counter(connection: BaseDatabaseWrapper, **kwargs: Any) -> None:
+    """
+    Обработчик сигнала connection_created: добавляет count_query в обёртки исполнения запросов соединения.
+
+    Соединения с базой данных принадлежат потокам, поэтому обёртка добавляется каждому из них при подключении.
+    Обёртка ставится первой: connection.execute_wrapper снимает последнюю добавленную обёртку.
+
+    Args:
+        connection (BaseDatabaseWrapper): Соединение с базой данных.
+
+    Returns:
+        None
+    """
+    if connection.alias == 'default' and count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, count_query)
+
+
+class RequestMetricsMiddleware:
+    """
+    Учитывает длительность обработки запроса и количество исполненных в нём SQL-запросов к базе данных default
+    в гистограммах request_seconds и request_queries с метками (имя маршрута, HTTP-метод).
+
+    Поддерживает синхронные и асинхронные представления. Запросы к базе данных считаются обёрткой count_query
+    соединений всех потоков, см. install_query_counter. Для потоковых ответов учитываются время и запросы
+    до начала отправки ответа.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable) -> None:
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if self.is_async:
+            return self.__acall__(request)
+
+        counter, started = QueryCounter(), time.perf_counter()
+        token = current_query_counter.set(counter)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_query_counter.reset(token)
+        self.observe(request, counter, started)
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        counter, started = QueryCounter(), time.perf_counter()
+        token = current_query_counter.set(counter)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_query_counter.reset(token)
+        self.observe(request, counter, started)
+        return response
+
+    @staticmethod
+    def observe(request: HttpRequest, counter: QueryCounter, started: float) -> None:
+        # Имя маршрута, а не путь: путь содержит ID пользователя и дал бы неограниченное число меток
+        match = request.resolver_match
+        labels = (match.url_name or match.view_name if match else 'unmatched', request.method)
+        request_seconds.observe(labels, time.perf_counter() - started)
+        request_queries.observe(labels, counter.count)
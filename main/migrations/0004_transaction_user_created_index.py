@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0003_transaction_user_id'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user_id', '-created_at', '-id'], name='main_txn_user_created_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:07
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0007_balance_shards'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('operation', models.CharField(choices=[('deposit', 'Зачисление'), ('withdrawal', 'Списание'), ('transfer', 'Перевод')], max_length=20)),
+                ('from_user_id', models.IntegerField(blank=True, null=True)),
+                ('to_user_id', models.IntegerField(blank=True, null=True)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('from_balance_before', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('from_balance_after', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('to_balance_before', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('to_balance_after', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('comment', models.TextField(blank=True, max_length=1024)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='transaction',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,129 @@
+import datetime
+
+from django.db import migrations, transaction
+from django.utils import timezone
+
+# Количество месячных партиций, создаваемых миграцией после партиции с существующими строками
+MONTHS_AHEAD = 3
+
+
+def add_months(value, months):
+    index = value.year * 12 + value.month - 1 + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def partition_transactions(apps, schema_editor):
+    """
+    Переводит main_transaction на декларативное секционирование по диапазонам created_at (только PostgreSQL).
+
+    Существующая таблица переименовывается в main_transaction_legacy и присоединяется к новой секционированной
+    таблице как партиция с диапазоном от MINVALUE до начала следующего месяца. Проверка диапазона при присоединении
+    выполняется по заранее добавленному ограничению CHECK. Далее создаются месячные партиции и партиция по умолчанию.
+
+    Первичный ключ партиции должен совпадать с первичным ключом секционированной таблицы (id, created_at), поэтому
+    до блокировки строится уникальный индекс (id, created_at) (CREATE UNIQUE INDEX CONCURRENTLY, без блокировки
+    записи), а под блокировкой первичный ключ (id) заменяется ограничением на этом индексе.
+
+    Остальные шаги выполняются в одной транзакции под блокировкой ACCESS EXCLUSIVE таблицы: запись и чтение журнала
+    недоступны до её завершения. Время блокировки пропорционально размеру таблицы: добавление CHECK сканирует её
+    целиком. Индексы первичного ключа и (user_id, created_at, id) совпадают с индексами секционированной таблицы
+    и присоединяются без перестроения.
+
+    Секционированная таблица не может иметь столбец IDENTITY (до PostgreSQL 17), поэтому id получает значения
+    из отдельной последовательности, продолжающей существующие id. Первичный ключ включает ключ секционирования:
+    (id, created_at); уникальность id обеспечивается последовательностью.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    # Соединение Django с PostgreSQL работает в UTC, поэтому границы партиций - полночь UTC
+    boundary = add_months(timezone.now().date(), 1)
+    execute = schema_editor.execute
+
+    # Недостроенный индекс, оставшийся от прерванного запуска миграции, помечен INVALID и строится заново
+    execute('DROP INDEX CONCURRENTLY IF EXISTS main_transaction_legacy_pkey')
+    execute('CREATE UNIQUE INDEX CONCURRENTLY main_transaction_legacy_pkey ON main_transaction (id, created_at)')
+
+    with transaction.atomic(using=schema_editor.connection.alias):
+        lock_and_partition(execute, schema_editor.connection, boundary)
+
+
+def lock_and_partition(execute, connection, boundary):
+    execute('LOCK TABLE main_transaction IN ACCESS EXCLUSIVE MODE')
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT COALESCE(MAX(id), 0) + 1 FROM main_transaction')
+        next_id = cursor.fetchone()[0]
+
+    execute('ALTER TABLE main_transaction ALTER COLUMN id DROP IDENTITY IF EXISTS')
+    execute('ALTER TABLE main_transaction ALTER COLUMN id DROP DEFAULT')
+    execute('DROP SEQUENCE IF EXISTS main_transaction_id_seq')
+    execute('ALTER TABLE main_transaction RENAME TO main_transaction_legacy')
+    execute('ALTER TABLE main_transaction_legacy DROP CONSTRAINT main_transaction_pkey')
+    execute('ALTER TABLE main_transaction_legacy ADD CONSTRAINT main_transaction_legacy_pkey '
+            'PRIMARY KEY USING INDEX main_transaction_legacy_pkey')
+    execute('ALTER INDEX main_txn_user_created_idx RENAME TO main_transaction_legacy_user_created_idx')
+
+    execute(f'CREATE SEQUENCE main_transaction_id_seq START WITH {int(next_id)}')
+    execute('CREATE TABLE main_transaction (LIKE main_transaction_legacy INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+            'PARTITION BY RANGE (created_at)')
+    execute("ALTER TABLE main_transaction ALTER COLUMN id SET DEFAULT nextval('main_transaction_id_seq')")
+    execute('ALTER SEQUENCE main_transaction_id_seq OWNED BY main_transaction.id')
+    execute('ALTER TABLE main_transaction ADD CONSTRAINT main_transaction_pkey PRIMARY KEY (id, created_at)')
+    execute('CREATE INDEX main_txn_user_created_idx ON main_transaction (user_id, created_at DESC, id DESC)')
+
+    execute(f"ALTER TABLE main_transaction_legacy ADD CONSTRAINT main_transaction_legacy_range "
+            f"CHECK (created_at IS NOT NULL AND created_at < '{boundary}')")
+    execute(f"ALTER TABLE main_transaction ATTACH PARTITION main_transaction_legacy "
+            f"FOR VALUES FROM (MINVALUE) TO ('{boundary}')")
+    execute('ALTER TABLE main_transaction_legacy DROP CONSTRAINT main_transaction_legacy_range')
+
+    for offset in range(MONTHS_AHEAD):
+        month = add_months(boundary, offset)
+        execute(f"CREATE TABLE main_transaction_p{month:%Y%m} PARTITION OF main_transaction "
+                f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')")
+    execute('CREATE TABLE main_transaction_default PARTITION OF main_transaction DEFAULT')
+
+
+def unpartition_transactions(apps, schema_editor):
+    """
+    Возвращает main_transaction к обычной таблице с id IDENTITY (только PostgreSQL).
+
+    Строки всех присоединённых партиций копируются в новую таблицу под блокировкой ACCESS EXCLUSIVE в одной
+    транзакции, после чего секционированная таблица удаляется вместе с партициями, в том числе с бывшей
+    main_transaction_legacy и её первичным ключом (id, created_at); новая таблица получает первичный ключ (id).
+    Партиции, отсоединённые командой manage_partitions archive, не затрагиваются: их строки при необходимости
+    загружаются вручную (INSERT INTO main_transaction SELECT ... или COPY из архива) после отката.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    with transaction.atomic(using=schema_editor.connection.alias):
+        lock_and_unpartition(schema_editor.execute)
+
+
+def lock_and_unpartition(execute):
+    execute('LOCK TABLE main_transaction IN ACCESS EXCLUSIVE MODE')
+    execute('CREATE TABLE main_transaction_unpartitioned (LIKE main_transaction INCLUDING CONSTRAINTS)')
+    execute('INSERT INTO main_transaction_unpartitioned SELECT * FROM main_transaction')
+    # Удаляет и партиции, и принадлежащую столбцу id последовательность
+    execute('DROP TABLE main_transaction')
+    execute('ALTER TABLE main_transaction_unpartitioned RENAME TO main_transaction')
+    execute('ALTER TABLE main_transaction ADD CONSTRAINT main_transaction_pkey PRIMARY KEY (id)')
+    execute('ALTER TABLE main_transaction ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY')
+    execute("SELECT setval(pg_get_serial_sequence('main_transaction', 'id'), COALESCE(MAX(id), 0) + 1, false) "
+            "FROM main_transaction")
+    execute('CREATE INDEX main_txn_user_created_idx ON main_transaction (user_id, created_at DESC, id DESC)')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0008_ledger_outbox'),
+    ]
+
+    # CREATE INDEX CONCURRENTLY не выполняется внутри транзакции; шаги под блокировкой выполняются в transaction.atomic
+    atomic = False
+
+    operations = [
+        migrations.RunPython(partition_transactions, unpartition_transactions, elidable=False),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:11
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0009_partition_transactions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserPeriodSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.IntegerField()),
+                ('period', models.CharField(choices=[('day', 'День'), ('month', 'Месяц')], max_length=5)),
+                ('period_start', models.DateField()),
+                ('slot', models.PositiveSmallIntegerField(default=0)),
+                ('deposited', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=18)),
+                ('withdrawn', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=18)),
+                ('transferred_in', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=18)),
+                ('transferred_out', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=18)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user_id', 'period', 'period_start', 'slot'), name='main_period_summary_uniq')],
+            },
+        ),
+    ]
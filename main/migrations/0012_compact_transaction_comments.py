@@ -0,0 +1,85 @@
+import re
+
+from django.db import migrations
+
+# Количество записей журнала, обрабатываемых в одной транзакции
+BATCH_SIZE = 10000
+LABELS = {'deposit': 'Зачисление', 'withdrawal': 'Списание', 'transfer': 'Перевод'}
+MARKER = '; Комментарий: '
+# Технический комментарий, который ранее сохранялся в Transaction.comment; составляющие, кроме комментария
+# пользователя, не содержат ';'
+PREFIX = r'^(?:Зачисление|Списание|Перевод) на сумму [^;]*; Баланс: [^;]*; Время исполнения: [^;]*'
+GENERATED_RE = re.compile(PREFIX + r'(?:; Комментарий: (.*))?$', re.DOTALL)
+
+
+def id_batches(cursor):
+    cursor.execute('SELECT MIN(id), MAX(id) FROM main_transaction')
+    low, high = cursor.fetchone()
+    if low is None:
+        return
+    for start in range(low, high + 1, BATCH_SIZE):
+        yield start, start + BATCH_SIZE
+
+
+def compact_comments(apps, schema_editor):
+    """
+    Оставляет в Transaction.comment только комментарий пользователя.
+
+    Технический комментарий теперь формируется при чтении из остальных полей записи. Записи обрабатываются
+    пакетами по BATCH_SIZE id, каждый пакет фиксируется отдельно. В PostgreSQL пакет обновляется одним запросом
+    UPDATE; место, освобождённое в таблице, возвращается после VACUUM.
+    """
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        batches = list(id_batches(cursor))
+
+    if connection.vendor == 'postgresql':
+        for start, end in batches:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'UPDATE main_transaction SET comment = COALESCE(substring(comment FROM %s), %s) '
+                    'WHERE id >= %s AND id < %s AND comment ~ %s',
+                    [PREFIX + '; Комментарий: (.*)$', '', start, end, PREFIX + '(; Комментарий: |$)'],
+                )
+        return
+
+    Transaction = apps.get_model('main', 'Transaction')
+    for start, end in batches:
+        records = []
+        for record in Transaction.objects.filter(id__gte=start, id__lt=end).exclude(comment='').only('comment'):
+            match = GENERATED_RE.match(record.comment)
+            if match is not None:
+                record.comment = match.group(1) or ''
+                records.append(record)
+        Transaction.objects.bulk_update(records, ['comment'])
+
+
+def expand_comments(apps, schema_editor):
+    """
+    Восстанавливает в Transaction.comment технический комментарий (обратная миграция).
+    """
+    Transaction = apps.get_model('main', 'Transaction')
+    with schema_editor.connection.cursor() as cursor:
+        batches = list(id_batches(cursor))
+
+    for start, end in batches:
+        records = list(Transaction.objects.filter(id__gte=start, id__lt=end)
+                       .only('operation', 'amount', 'balance_after', 'created_at', 'comment'))
+        for record in records:
+            comment = (f'{LABELS[record.operation]} на сумму {record.amount}; Баланс: {record.balance_after:.2f}; '
+                       f'Время исполнения: {record.created_at:%d.%m.%Y %H:%M:%S}')
+            record.comment = comment + MARKER + record.comment if record.comment else comment
+        Transaction.objects.bulk_update(records, ['comment'])
+
+
+class Migration(migrations.Migration):
+    # Каждый пакет фиксируется отдельно, чтобы не удерживать блокировки всей таблицы до конца миграции
+    atomic = False
+
+    dependencies = [
+        ('main', '0011_ingest_checkpoint'),
+    ]
+
+    operations = [
+        migrations.RunPython(compact_comments, expand_comments, elidable=False),
+    ]
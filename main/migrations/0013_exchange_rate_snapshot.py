@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0012_compact_transaction_comments'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExchangeRateSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('base', models.CharField(max_length=3, unique=True)),
+                ('rates', models.JSONField()),
+                ('fetched_at', models.DateTimeField()),
+                ('fresh_until', models.DateTimeField()),
+                ('stale_until', models.DateTimeField()),
+            ],
+        ),
+    ]
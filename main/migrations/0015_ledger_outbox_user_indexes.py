@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0014_exchange_rate'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ledgeroutbox',
+            index=models.Index(fields=['from_user_id'], name='main_outbox_from_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ledgeroutbox',
+            index=models.Index(fields=['to_user_id'], name='main_outbox_to_user_idx'),
+        ),
+    ]
@@ -2,6 +2,7 @@ from decimal import Decimal
 
 from django.core.validators import MinValueValidator
 from django.db import models
+from django.utils.timezone import now
 
 from main.enums import TransactionType
 
@@ -14,6 +15,33 @@ class Balance(models.Model):
         default=Decimal('0.00'),
         validators=[MinValueValidator(Decimal('0.00'))]
     )
+    # Увеличивается при каждом изменении баланса, защищает кэш балансов от записи устаревших значений
+    version = models.PositiveBigIntegerField(default=0)
+    # Количество слотов BalanceShard "горячего" баланса; 0 - баланс не шардирован
+    shard_count = models.PositiveSmallIntegerField(default=0)
+
+
+class BalanceShard(models.Model):
+    """
+    Слот шардированного баланса пользователя.
+
+    Баланс пользователя с shard_count > 0 равен сумме Balance.amount и amount всех его слотов.
+    Зачисления распределяются по случайным слотам, чтобы не конкурировать за блокировку одной строки Balance.
+    """
+    user_id = models.IntegerField()
+    slot = models.PositiveSmallIntegerField()
+    amount = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        validators=[MinValueValidator(Decimal('0.00'))]
+    )
+    version = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user_id', 'slot'], name='main_balance_shard_user_slot_uniq'),
+        ]
 
 
 class Transaction(models.Model):
@@ -39,5 +67,127 @@ class Transaction(models.Model):
         validators=[MinValueValidator(Decimal('0.00'))]
     )
     operation = models.CharField(max_length=20, choices=[(t.value, t.label) for t in TransactionType])
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Не auto_now_add: при LEDGER_MODE = 'outbox' запись создаётся позже исполнения операции с её временем
+    created_at = models.DateTimeField(default=now)
+    # Только комментарий пользователя: технический комментарий формируется при чтении, см. render_comment
+    comment = models.TextField(blank=True, max_length=1024)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user_id', '-created_at', '-id'], name='main_txn_user_created_idx'),
+        ]
+
+
+class LedgerOutbox(models.Model):
+    """
+    Запись транзакционного outbox: итоговые данные об исполненной операции, ожидающие переноса в Transaction.
+
+    Создаётся при LEDGER_MODE = 'outbox' в той же транзакции базы данных, что и изменение балансов, и переносится
+    в Transaction задачей flush_ledger_outbox. Хранит одну запись на операцию: записи Transaction сторон операции
+    формируются при переносе.
+    """
+    operation = models.CharField(max_length=20, choices=[(t.value, t.label) for t in TransactionType])
+    from_user_id = models.IntegerField(null=True, blank=True)
+    to_user_id = models.IntegerField(null=True, blank=True)
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    from_balance_before = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    from_balance_after = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    to_balance_before = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    to_balance_after = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
     comment = models.TextField(blank=True, max_length=1024)
+    created_at = models.DateTimeField(default=now)
+
+    class Meta:
+        # Для поиска ещё не перенесённых транзакций пользователя, см. get_pending_transactions
+        indexes = [
+            models.Index(fields=['from_user_id'], name='main_outbox_from_user_idx'),
+            models.Index(fields=['to_user_id'], name='main_outbox_to_user_idx'),
+        ]
+
+
+class UserPeriodSummary(models.Model):
+    """
+    Итоги операций пользователя за день или месяц.
+
+    Обновляется аддитивным INSERT ... ON CONFLICT DO UPDATE в транзакции исполнения операций. Итоги шардированного
+    баланса (см. BalanceShard) распределяются по нескольким строкам с разным slot; итог периода - их сумма.
+    """
+    DAY = 'day'
+    MONTH = 'month'
+    PERIODS = [(DAY, 'День'), (MONTH, 'Месяц')]
+
+    user_id = models.IntegerField()
+    period = models.CharField(max_length=5, choices=PERIODS)
+    period_start = models.DateField()
+    slot = models.PositiveSmallIntegerField(default=0)
+    deposited = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0.00'))
+    withdrawn = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0.00'))
+    transferred_in = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0.00'))
+    transferred_out = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0.00'))
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user_id', 'period', 'period_start', 'slot'],
+                                    name='main_period_summary_uniq'),
+        ]
+
+
+class IdempotencyRecord(models.Model):
+    """
+    Запись об обработанном запросе с заголовком Idempotency-Key.
+
+    Используется, только если Redis недоступен; в штатном режиме записи хранятся в кэше.
+    """
+    key = models.CharField(max_length=300, unique=True)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+
+class IngestCheckpoint(models.Model):
+    """
+    Позиция загрузки файла операций командой ingest_operations.
+
+    Обновляется в той же транзакции базы данных, что и исполнение очередного пакета операций, поэтому после сбоя
+    загрузка продолжается с первой неисполненной строки.
+    """
+    source = models.CharField(max_length=500, unique=True)
+    offset = models.PositiveBigIntegerField(default=0)
+    lines = models.PositiveBigIntegerField(default=0)
+    applied = models.PositiveBigIntegerField(default=0)
+    rejected = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+class ExchangeRateSnapshot(models.Model):
+    """
+    Последняя успешно полученная таблица курсов валют по отношению к базовой валюте.
+
+    Сохраняется при каждом обновлении курсов и используется для восстановления таблицы в Redis,
+    если она отсутствует в кэше (например, после перезапуска Redis), пока не истёк срок stale_until.
+    """
+    base = models.CharField(max_length=3, unique=True)
+    rates = models.JSONField()
+    fetched_at = models.DateTimeField()
+    # До fresh_until курсы считаются актуальными, до stale_until - допустимыми при недоступности стороннего API
+    fresh_until = models.DateTimeField()
+    stale_until = models.DateTimeField()
+
+
+class ExchangeRate(models.Model):
+    """
+    Курс валюты по отношению к российскому рублю на дату.
+
+    Заполняется при каждом обновлении курсов (последнее обновление за день перезаписывает курс этого дня)
+    и используется для пересчёта истории транзакций по курсу на день их исполнения.
+    """
+    currency = models.CharField(max_length=3)
+    date = models.DateField()
+    rate = models.DecimalField(max_digits=20, decimal_places=10)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['currency', 'date'], name='main_exchange_rate_currency_date_uniq'),
+        ]
@@ -0,0 +1,225 @@
+import base64
+import binascii
+from datetime import datetime
+from typing import Any
+
+from django.db.models import Q, QuerySet
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+Position = tuple[datetime, int]
+
+
+def encode_cursor(position: Position) -> str:
+    """
+    Кодирует позицию последней записи страницы в непрозрачную строку курсора.
+
+    Args:
+        position (Position): Пара (created_at, id) последней записи страницы.
+
+    Returns:
+        str: Строка курсора.
+    """
+    created_at, pk = position
+    return base64.urlsafe_b64encode(f'{created_at.isoformat()}|{pk}'.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Position:
+    """
+    Декодирует строку курсора в позицию (created_at, id).
+
+    Args:
+        cursor (str): Строка курсора, полученная в ссылке 'next'.
+
+    Returns:
+        Position: Пара (created_at, id).
+
+    Raises:
+        ValidationError: В случае, если курсор повреждён.
+    """
+    try:
+        created_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValidationError({'error': 'Некорректный курсор'})
+
+
+def apply_keyset(queryset: QuerySet, position: Position | None, descending: bool) -> QuerySet:
+    """
+    Упорядочивает кверисет по (created_at, id) и оставляет в нём только записи после указанной позиции.
+
+    Условие created_at <= / >= позиции дублируется отдельно, чтобы PostgreSQL мог использовать его
+    как границу диапазона при сканировании индекса (user_id, created_at, id).
+
+    Args:
+        queryset (QuerySet): Кверисет экземпляров класса модели Transaction.
+        position (Position | None): Позиция последней записи предыдущей страницы.
+        descending (bool): Направление сортировки.
+
+    Returns:
+        QuerySet: Упорядоченный и отфильтрованный кверисет.
+    """
+    if descending:
+        queryset = queryset.order_by('-created_at', '-id')
+    else:
+        queryset = queryset.order_by('created_at', 'id')
+
+    if position is None:
+        return queryset
+
+    created_at, pk = position
+    if descending:
+        return queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk),
+                               created_at__lte=created_at)
+    return queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk),
+                           created_at__gte=created_at)
+
+
+def filter_created_range(rows: QuerySet | list[Any], date_range: dict[str, datetime]) -> QuerySet | list[Any]:
+    """
+    Оставляет записи с created_at в диапазоне [date_range['from'], date_range['to']).
+
+    Args:
+        rows (QuerySet | list[Any]): Кверисет или список экземпляров класса модели Transaction.
+        date_range (dict[str, datetime]): Необязательные границы 'from' и 'to'.
+
+    Returns:
+        QuerySet | list[Any]: Отфильтрованный кверисет или список.
+    """
+    lower, upper = date_range.get('from'), date_range.get('to')
+    if isinstance(rows, QuerySet):
+        if lower is not None:
+            rows = rows.filter(created_at__gte=lower)
+        if upper is not None:
+            rows = rows.filter(created_at__lt=upper)
+        return rows
+
+    return [row for row in rows
+            if (lower is None or row.created_at >= lower) and (upper is None or row.created_at < upper)]
+
+
+def get_position(row: Any) -> Position:
+    """
+    Возвращает позицию (created_at, id) записи.
+
+    Args:
+        row (Any): Экземпляр класса модели Transaction.
+
+    Returns:
+        Position: Пара (created_at, id).
+    """
+    return row.created_at, row.id
+
+
+def merge_pending(rows: list[Any], pending: list[Any], descending: bool, first_page: bool, last_page: bool) -> list[Any]:
+    """
+    Добавляет к странице транзакции, ещё не перенесённые из outbox в журнал (см. get_pending_transactions).
+
+    Такие транзакции новее записей журнала, поэтому при сортировке по убыванию выводятся в начале первой страницы,
+    а по возрастанию - в конце последней. Курсор следующей страницы от них не зависит; размер страницы
+    может превышать page_size на количество таких транзакций.
+
+    Args:
+        rows (list[Any]): Записи страницы из журнала.
+        pending (list[Any]): Не перенесённые транзакции в порядке исполнения.
+        descending (bool): Направление сортировки.
+        first_page (bool): True, если страница запрошена без курсора.
+        last_page (bool): True, если следующей страницы нет.
+
+    Returns:
+        list[Any]: Записи страницы.
+    """
+    if descending and first_page:
+        return [*reversed(pending), *rows]
+    if not descending and last_page:
+        return [*rows, *pending]
+    return rows
+
+
+class TransactionCursorPagination(BasePagination):
+    """
+    Курсорная (keyset) пагинация списка транзакций по паре (created_at, id).
+
+    В отличие от PageNumberPagination не выполняет COUNT(*) и не пропускает записи через OFFSET:
+    каждая страница читается из индекса (user_id, created_at, id), начиная с позиции из курсора.
+
+    Attributes:
+        ORDERINGS (dict[str, bool]): Допустимые значения параметра 'ordering' и соответствующие им направления сортировки.
+    """
+    ORDERINGS = {'-created_at': True, 'created_at': False}
+    cursor_query_param = 'cursor'
+    ordering_query_param = 'ordering'
+    page_size = api_settings.PAGE_SIZE
+
+    def paginate_queryset(self, queryset: QuerySet, request: Request, view: Any = None) -> list[Any]:
+        """
+        Возвращает записи текущей страницы.
+
+        Args:
+            queryset (QuerySet): Кверисет экземпляров класса модели Transaction.
+            request (Request): GET-запрос клиента.
+            view (Any): Представление, выполняющее пагинацию.
+
+        Returns:
+            list[Any]: Записи текущей страницы.
+        """
+        self.request = request
+        self.descending = self.get_descending(request)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        self.position = decode_cursor(cursor) if cursor else None
+
+        rows = list(apply_keyset(queryset, self.position, self.descending)[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.next_position = get_position(rows[-1]) if self.has_next else None
+
+        return rows
+
+    def get_descending(self, request: Request) -> bool:
+        """
+        Возвращает направление сортировки по параметру запроса 'ordering'.
+
+        Args:
+            request (Request): GET-запрос клиента.
+
+        Returns:
+            bool: True для сортировки по убыванию даты.
+
+        Raises:
+            ValidationError: В случае, если передано недопустимое значение 'ordering'.
+        """
+        ordering = request.query_params.get(self.ordering_query_param, '-created_at')
+        if ordering not in self.ORDERINGS:
+            raise ValidationError({'error': f'Недопустимое значение ordering. Допустимые значения: '
+                                            f'{", ".join(self.ORDERINGS)}'})
+        return self.ORDERINGS[ordering]
+
+    def get_next_link(self) -> str | None:
+        """
+        Возвращает ссылку на следующую страницу.
+
+        Returns:
+            str | None: Абсолютная ссылка на следующую страницу или None, если страница последняя.
+        """
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encode_cursor(self.next_position))
+
+    def get_paginated_response(self, data: list[Any]) -> Response:
+        return Response({'next': self.get_next_link(), 'results': data})
+
+    def get_paginated_response_schema(self, schema: dict[str, Any]) -> dict[str, Any]:
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
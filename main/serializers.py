@@ -1,10 +1,13 @@
 from decimal import Decimal
 from typing import Any
 
+from django.conf import settings
 from rest_framework import serializers
 
 from main.enums import TransactionType
-from main.models import Transaction
+from main.models import Transaction, UserPeriodSummary
+from main.services.projection import TRANSACTION_FIELDS
+from main.services.transaction_service import render_comment
 
 
 class TransactionSerializer(serializers.Serializer):
@@ -44,11 +47,137 @@ class TransactionSerializer(serializers.Serializer):
         return data
 
 
+class BatchTransactionSerializer(serializers.Serializer):
+    """
+    Сериализатор, обрабатывающий входные данные пакета транзакций.
+
+    Операции пакета валидируются по отдельности сериализатором TransactionSerializer.
+    """
+    operations = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        max_length=settings.TRANSACTION_BATCH_MAX_SIZE
+    )
+    atomic = serializers.BooleanField(default=True)
+
+
+class BalancesQuerySerializer(serializers.Serializer):
+    """
+    Сериализатор, обрабатывающий параметры запроса балансов нескольких пользователей.
+
+    Параметры передаются строками через запятую: ?user_ids=1,2,3&currencies=RUB,USD,EUR.
+    """
+    user_ids = serializers.CharField()
+    currencies = serializers.CharField(required=False, default='RUB')
+
+    def validate_user_ids(self, value: str) -> list[int]:
+        try:
+            user_ids = list(dict.fromkeys(int(user_id) for user_id in value.split(',') if user_id.strip()))
+        except ValueError:
+            raise serializers.ValidationError('Ожидается список целых чисел через запятую')
+
+        if not user_ids:
+            raise serializers.ValidationError('Необходимо указать хотя бы один ID пользователя')
+        if len(user_ids) > settings.BALANCES_LOOKUP_MAX_USERS:
+            raise serializers.ValidationError(
+                f'Можно запросить не более {settings.BALANCES_LOOKUP_MAX_USERS} пользователей')
+        return user_ids
+
+    def validate_currencies(self, value: str) -> list[str]:
+        currencies = list(dict.fromkeys(currency.strip().upper() for currency in value.split(',')
+                                        if currency.strip()))
+        if not currencies:
+            raise serializers.ValidationError('Необходимо указать хотя бы одну валюту')
+        return currencies
+
+
+class TransactionsRangeSerializer(serializers.Serializer):
+    """
+    Сериализатор, обрабатывающий параметры диапазона дат списка транзакций пользователя.
+
+    Параметры ?from= (включительно) и ?to= (не включительно) принимают дату или дату и время в формате ISO 8601.
+    Ограничение диапазона позволяет PostgreSQL читать только партиции таблицы транзакций, пересекающиеся с ним.
+    """
+
+    def get_fields(self) -> dict[str, serializers.Field]:
+        # 'from' - зарезервированное слово Python и не может быть именем атрибута класса
+        return {
+            'from': serializers.DateTimeField(required=False),
+            'to': serializers.DateTimeField(required=False),
+        }
+
+    def validate(self, data: dict[str, Any]) -> dict[str, Any]:
+        if 'from' in data and 'to' in data and data['from'] >= data['to']:
+            raise serializers.ValidationError({'error': 'Начало диапазона должно быть раньше его конца'})
+        return data
+
+
+class TransactionsListQuerySerializer(TransactionsRangeSerializer):
+    """
+    Сериализатор, обрабатывающий параметры запроса списка транзакций пользователя.
+
+    Помимо диапазона дат (см. TransactionsRangeSerializer) принимает параметр ?fields= - перечень выводимых полей
+    транзакции через запятую, например ?fields=id,amount,created_at (по умолчанию выводятся все поля),
+    и параметр ?currency= - валюту, в которую пересчитываются суммы (по умолчанию RUB).
+    """
+
+    def get_fields(self) -> dict[str, serializers.Field]:
+        return {
+            **super().get_fields(),
+            'fields': serializers.CharField(required=False),
+            'currency': serializers.RegexField(r'^[A-Za-z]{3}$', required=False, default='RUB',
+                                               error_messages={'invalid': 'Ожидается трёхбуквенный код валюты'}),
+        }
+
+    def validate_currency(self, value: str) -> str:
+        return value.upper()
+
+    def validate_fields(self, value: str) -> tuple[str, ...]:
+        fields = tuple(dict.fromkeys(field.strip() for field in value.split(',') if field.strip()))
+        if not fields:
+            raise serializers.ValidationError('Необходимо указать хотя бы одно поле')
+
+        unknown = [field for field in fields if field not in TRANSACTION_FIELDS]
+        if unknown:
+            raise serializers.ValidationError(f'Недопустимые поля: {", ".join(unknown)}. '
+                                              f'Допустимые поля: {", ".join(TRANSACTION_FIELDS)}')
+        return fields
+
+
+class PeriodSummaryQuerySerializer(serializers.Serializer):
+    """
+    Сериализатор, обрабатывающий параметры запроса итогов пользователя по периодам.
+
+    Параметр ?period= принимает 'day' (по умолчанию) или 'month'; ?from= и ?to= - даты начала первого
+    и последнего периодов (включительно) в формате ISO 8601.
+    """
+
+    def get_fields(self) -> dict[str, serializers.Field]:
+        # 'from' - зарезервированное слово Python и не может быть именем атрибута класса
+        return {
+            'period': serializers.ChoiceField(choices=UserPeriodSummary.PERIODS, required=False,
+                                              default=UserPeriodSummary.DAY),
+            'from': serializers.DateField(required=False),
+            'to': serializers.DateField(required=False),
+        }
+
+    def validate(self, data: dict[str, Any]) -> dict[str, Any]:
+        if 'from' in data and 'to' in data and data['from'] > data['to']:
+            raise serializers.ValidationError({'error': 'Начало диапазона не должно быть позже его конца'})
+        return data
+
+
 class UserTransactionsListSerializer(serializers.ModelSerializer):
     """
     Сериализатор, применяемый при отображении списка транзакций пользователя.
+
+    Поле comment содержит технический комментарий, формируемый из полей записи, см. render_comment.
     """
+    comment = serializers.SerializerMethodField()
 
     class Meta:
         model = Transaction
         fields = '__all__'
+
+    def get_comment(self, transaction: Transaction) -> str:
+        return render_comment(transaction)
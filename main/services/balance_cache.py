@@ -0,0 +1,294 @@
+import logging
+import threading
+from decimal import Decimal
+from functools import partial
+from typing import Iterable
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from main.models import Balance
+from main.services.redis_client import CACHE_ERRORS, get_async_redis, get_redis
+from main.services.sharding import load_balances
+
+logger = logging.getLogger(__name__)
+
+# Записывает значение, только если его версия больше версии уже закэшированного значения
+SET_IF_NEWER_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if current then
+    local version = tonumber(string.match(current, '^(%d+):'))
+    if version and version >= tonumber(ARGV[1]) then
+        return 0
+    end
+end
+redis.call('SET', KEYS[1], ARGV[1] .. ':' .. ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+
+class BalanceCacheStats:
+    """
+    Счётчики попаданий и промахов кэша балансов.
+
+    Счётчики копятся в памяти процесса и каждые FLUSH_EVERY событий прибавляются к общим счётчикам в кэше,
+    чтобы их можно было посмотреть по всем процессам командой manage.py balance_cache_stats.
+
+    Attributes:
+        FLUSH_EVERY (int): Количество событий, после которого локальные счётчики сбрасываются в кэш.
+    """
+    FLUSH_EVERY = 100
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.pending = {'hits': 0, 'misses': 0}
+        self.lock = threading.Lock()
+
+    def record(self, hit: bool) -> dict[str, int] | None:
+        """
+        Учитывает попадание или промах.
+
+        Args:
+            hit (bool): True для попадания, False для промаха.
+
+        Returns:
+            dict[str, int] | None: Накопленные приращения счётчиков, которые вызывающий код должен передать в flush,
+                или None, если сбрасывать их ещё рано.
+        """
+        counter = 'hits' if hit else 'misses'
+        with self.lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+            self.pending[counter] += 1
+            if self.pending['hits'] + self.pending['misses'] < self.FLUSH_EVERY:
+                return None
+            pending, self.pending = self.pending, {'hits': 0, 'misses': 0}
+
+        return pending
+
+    def flush(self, pending: dict[str, int]) -> None:
+        try:
+            for counter, delta in pending.items():
+                key = f'balance_cache:stats:{counter}'
+                cache.add(key, 0, timeout=None)
+                cache.incr(key, delta)
+        except (*CACHE_ERRORS, ValueError):
+            logger.warning('Не удалось сохранить счётчики кэша балансов', exc_info=True)
+
+    def snapshot(self) -> dict[str, int]:
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+    @staticmethod
+    def totals() -> dict[str, int]:
+        """
+        Возвращает общие по всем процессам счётчики попаданий и промахов.
+
+        Returns:
+            dict[str, int]: Словарь с ключами 'hits' и 'misses'.
+        """
+        return {counter: cache.get(f'balance_cache:stats:{counter}', 0) for counter in ('hits', 'misses')}
+
+    @staticmethod
+    def reset_totals() -> None:
+        cache.delete_many([f'balance_cache:stats:{counter}' for counter in ('hits', 'misses')])
+
+
+stats = BalanceCacheStats()
+_fallback_lock = threading.Lock()
+
+
+def make_key(user_id: int) -> str:
+    return f'balance:{user_id}'
+
+
+def get_cached_balance(user_id: int) -> Decimal | None:
+    """
+    Возвращает баланс пользователя из кэша балансов.
+
+    Args:
+        user_id (int): ID пользователя.
+
+    Returns:
+        Decimal | None: Закэшированный баланс или None при промахе, недоступности Redis или выключенном кэше.
+    """
+    if not settings.BALANCE_CACHE_ENABLED:
+        return None
+
+    try:
+        redis = get_redis()
+        value = redis.get(make_key(user_id)) if redis is not None else cache.get(make_key(user_id))
+    except CACHE_ERRORS:
+        logger.warning('Кэш балансов недоступен', exc_info=True)
+        value = None
+
+    pending = stats.record(hit=value is not None)
+    if pending:
+        stats.flush(pending)
+    return parse_cached_value(value)
+
+
+async def aget_cached_balance(user_id: int) -> Decimal | None:
+    """
+    Асинхронный вариант get_cached_balance, читающий Redis асинхронным клиентом.
+
+    Args:
+        user_id (int): ID пользователя.
+
+    Returns:
+        Decimal | None: Закэшированный баланс или None при промахе, недоступности Redis или выключенном кэше.
+    """
+    if not settings.BALANCE_CACHE_ENABLED:
+        return None
+
+    try:
+        redis = get_async_redis()
+        value = await redis.get(make_key(user_id)) if redis is not None else await cache.aget(make_key(user_id))
+    except CACHE_ERRORS:
+        logger.warning('Кэш балансов недоступен', exc_info=True)
+        value = None
+
+    pending = stats.record(hit=value is not None)
+    if pending:
+        await sync_to_async(stats.flush)(pending)
+    return parse_cached_value(value)
+
+
+def parse_cached_value(value: bytes | str | None) -> Decimal | None:
+    """
+    Извлекает баланс из значения кэша вида '<версия>:<баланс>'.
+
+    Args:
+        value (bytes | str | None): Значение кэша.
+
+    Returns:
+        Decimal | None: Баланс или None, если значение отсутствует.
+    """
+    if value is None:
+        return None
+    if isinstance(value, bytes):
+        value = value.decode()
+    return Decimal(value.split(':', 1)[1])
+
+
+def cache_balance(user_id: int, amount: Decimal, version: int) -> None:
+    """
+    Записывает баланс пользователя в кэш, если в кэше нет значения с той же или более новой версией.
+
+    Args:
+        user_id (int): ID пользователя.
+        amount (Decimal): Баланс пользователя.
+        version (int): Версия баланса (Balance.version), соответствующая значению amount.
+
+    Returns:
+        None
+    """
+    if not settings.BALANCE_CACHE_ENABLED:
+        return
+
+    key = make_key(user_id)
+    timeout = settings.BALANCE_CACHE_TTL
+    try:
+        redis = get_redis()
+        if redis is not None:
+            redis.eval(SET_IF_NEWER_SCRIPT, 1, key, version, f'{amount:.2f}', timeout)
+            return
+
+        with _fallback_lock:
+            current = cache.get(key)
+            if current is None or int(current.split(':', 1)[0]) < version:
+                cache.set(key, f'{version}:{amount:.2f}', timeout=timeout)
+    except CACHE_ERRORS:
+        logger.warning('Кэш балансов недоступен', exc_info=True)
+
+
+async def acache_balance(user_id: int, amount: Decimal, version: int) -> None:
+    """
+    Асинхронный вариант cache_balance.
+
+    Args:
+        user_id (int): ID пользователя.
+        amount (Decimal): Баланс пользователя.
+        version (int): Версия баланса (Balance.version), соответствующая значению amount.
+
+    Returns:
+        None
+    """
+    if not settings.BALANCE_CACHE_ENABLED:
+        return
+
+    redis = get_async_redis()
+    if redis is None:
+        await sync_to_async(cache_balance)(user_id, amount, version)
+        return
+
+    try:
+        await redis.eval(SET_IF_NEWER_SCRIPT, 1, make_key(user_id), version, f'{amount:.2f}',
+                         settings.BALANCE_CACHE_TTL)
+    except CACHE_ERRORS:
+        logger.warning('Кэш балансов недоступен', exc_info=True)
+
+
+def cache_balances_on_commit(balances: Iterable[Balance]) -> None:
+    """
+    Откладывает запись новых балансов в кэш до фиксации текущей транзакции базы данных.
+
+    Шардированные балансы после фиксации перечитываются из базы данных (см. refresh_cached_balance): сумма их строк,
+    прочитанная внутри транзакции, может не учитывать конкурентные зачисления в другие слоты.
+
+    Args:
+        balances (Iterable[Balance]): Объекты Balance с балансами и версиями после исполнения транзакции.
+
+    Returns:
+        None
+    """
+    if not settings.BALANCE_CACHE_ENABLED:
+        return
+
+    for balance in balances:
+        if balance.shard_count:
+            transaction.on_commit(partial(refresh_cached_balance, balance.user_id))
+        else:
+            transaction.on_commit(partial(cache_balance, balance.user_id, balance.amount, balance.version))
+
+
+def refresh_cached_balance(user_id: int) -> None:
+    """
+    Перечитывает баланс пользователя из базы данных и записывает его в кэш.
+
+    Args:
+        user_id (int): ID пользователя.
+
+    Returns:
+        None
+    """
+    balance = load_balances([user_id]).get(user_id)
+    if balance is not None:
+        cache_balance(user_id, balance.amount, balance.version)
+
+
+def invalidate_cached_balances(user_ids: Iterable[int]) -> None:
+    """
+    Удаляет балансы пользователей из кэша балансов.
+
+    Нужно после изменения балансов в обход process_transaction (например, массовым UPDATE или удалением строк
+    Balance): значения в кэше не перезаписываются записями с той же или меньшей версией.
+
+    Args:
+        user_ids (Iterable[int]): ID пользователей.
+
+    Returns:
+        None
+    """
+    keys = [make_key(user_id) for user_id in user_ids]
+    try:
+        redis = get_redis()
+        for start in range(0, len(keys), 1000):
+            if redis is not None:
+                redis.delete(*keys[start:start + 1000])
+            else:
+                cache.delete_many(keys[start:start + 1000])
+    except CACHE_ERRORS:
+        logger.warning('Кэш балансов недоступен', exc_info=True)
@@ -0,0 +1,190 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from redis import Redis
+
+from main.services.redis_client import CACHE_ERRORS, get_redis
+
+logger = logging.getLogger(__name__)
+
+SECONDS_KEY = 'lock_contention:wait_seconds'
+WAITS_KEY = 'lock_contention:waits'
+
+
+class SpaceSaving:
+    """
+    Приближённый top-K по весу (алгоритм Space-Saving) с ограниченной памятью.
+
+    Хранит не более capacity ключей. Новый ключ при заполненной таблице вытесняет ключ с наименьшим весом
+    и наследует его вес как погрешность: вес любого ключа из таблицы завышен не более чем на его погрешность,
+    а любой ключ с весом больше минимального в таблице гарантированно в ней присутствует.
+
+    Attributes:
+        capacity (int): Максимальное количество отслеживаемых ключей.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        # Ключ -> [вес, количество событий, погрешность веса]
+        self.items: dict[int, list[float]] = {}
+
+    def add(self, key: int, weight: float) -> None:
+        item = self.items.get(key)
+        if item is not None:
+            item[0] += weight
+            item[1] += 1
+            return
+
+        if len(self.items) < self.capacity:
+            self.items[key] = [weight, 1, 0.0]
+            return
+
+        # Поиск минимума - O(capacity); capacity - порядка сотни, а событие - ожидание блокировки
+        evicted = min(self.items, key=lambda candidate: self.items[candidate][0])
+        floor = self.items.pop(evicted)[0]
+        self.items[key] = [floor + weight, 1, floor]
+
+    def top(self, limit: int) -> list[tuple[int, float, int, float]]:
+        """
+        Возвращает ключи с наибольшим весом.
+
+        Args:
+            limit (int): Количество ключей.
+
+        Returns:
+            list[tuple[int, float, int, float]]: Кортежи (ключ, вес, количество событий, погрешность веса)
+                в порядке убывания веса.
+        """
+        ranked = sorted(self.items.items(), key=lambda item: item[1][0], reverse=True)[:limit]
+        return [(key, weight, int(events), error) for key, (weight, events, error) in ranked]
+
+    def drain(self) -> dict[int, list[float]]:
+        items, self.items = self.items, {}
+        return items
+
+
+class ContentionProfiler:
+    """
+    Профилировщик ожидания блокировок строк Balance.
+
+    Длительности ожидания копятся в памяти процесса в SpaceSaving на LOCK_PROFILING_TOP_K счетов и не чаще
+    раза в LOCK_PROFILING_FLUSH_INTERVAL секунд прибавляются к общим для всех процессов сортированным множествам
+    Redis. Общие множества ограничены 10 * LOCK_PROFILING_TOP_K счетами с наибольшим временем ожидания.
+    Если кэш по умолчанию работает не через django-redis, данные остаются в памяти процесса.
+    """
+
+    def __init__(self) -> None:
+        self.sketch = None
+        self.flushed_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def get_sketch(self) -> SpaceSaving:
+        if self.sketch is None or self.sketch.capacity != settings.LOCK_PROFILING_TOP_K:
+            self.sketch = SpaceSaving(settings.LOCK_PROFILING_TOP_K)
+        return self.sketch
+
+    def record(self, user_id: int, seconds: float) -> None:
+        """
+        Учитывает ожидание блокировки баланса пользователя.
+
+        Ожидания короче LOCK_PROFILING_MIN_WAIT секунд не учитываются: это время исполнения запроса,
+        а не ожидание конкурирующей транзакции.
+
+        Args:
+            user_id (int): ID пользователя.
+            seconds (float): Длительность запроса блокировки, в секундах.
+
+        Returns:
+            None
+        """
+        if seconds < settings.LOCK_PROFILING_MIN_WAIT:
+            return
+
+        with self.lock:
+            self.get_sketch().add(user_id, seconds)
+            if time.monotonic() - self.flushed_at < settings.LOCK_PROFILING_FLUSH_INTERVAL:
+                return
+            self.flushed_at = time.monotonic()
+            client = get_redis()
+            if client is None:
+                return
+            pending = self.sketch.drain()
+
+        self.flush(client, pending)
+
+    @staticmethod
+    def flush(client: Redis, pending: dict[int, list[float]]) -> None:
+        limit = settings.LOCK_PROFILING_TOP_K * 10
+        try:
+            pipeline = client.pipeline(transaction=False)
+            for user_id, (weight, events, _) in pending.items():
+                pipeline.zincrby(SECONDS_KEY, weight, user_id)
+                pipeline.zincrby(WAITS_KEY, events, user_id)
+            pipeline.execute()
+
+            excess = client.zrange(SECONDS_KEY, 0, -(limit + 1))
+            if excess:
+                client.pipeline(transaction=False).zrem(SECONDS_KEY, *excess).zrem(WAITS_KEY, *excess).execute()
+        except CACHE_ERRORS:
+            logger.warning('Не удалось сохранить статистику ожидания блокировок', exc_info=True)
+
+    def local_top(self, limit: int) -> list[dict[str, float | int]]:
+        """
+        Возвращает счета с наибольшим временем ожидания блокировок, ещё не сохранённым в Redis, в текущем процессе.
+
+        Args:
+            limit (int): Количество счетов.
+
+        Returns:
+            list[dict[str, float | int]]: Словари с ключами user_id, wait_seconds и waits.
+        """
+        with self.lock:
+            ranked = self.get_sketch().top(limit)
+
+        return [{'user_id': user_id, 'wait_seconds': round(weight, 6), 'waits': events}
+                for user_id, weight, events, _ in ranked]
+
+    def top(self, limit: int) -> tuple[str, list[dict[str, float | int]]]:
+        """
+        Возвращает счета с наибольшим временем ожидания блокировок по всем процессам.
+
+        Если Redis недоступен или кэш по умолчанию работает не через django-redis, возвращаются данные
+        текущего процесса.
+
+        Args:
+            limit (int): Количество счетов.
+
+        Returns:
+            tuple[str, list[dict[str, float | int]]]: Область данных ('cluster' или 'process') и словари
+                с ключами user_id, wait_seconds и waits в порядке убывания времени ожидания.
+        """
+        client = get_redis()
+        if client is not None:
+            try:
+                ranked = client.zrevrange(SECONDS_KEY, 0, limit - 1, withscores=True)
+                waits = client.zmscore(WAITS_KEY, [user_id for user_id, _ in ranked]) if ranked else []
+                return 'cluster', [
+                    {'user_id': int(user_id), 'wait_seconds': round(seconds, 6), 'waits': int(events or 0)}
+                    for (user_id, seconds), events in zip(ranked, waits)
+                ]
+            except CACHE_ERRORS:
+                logger.warning('Не удалось прочитать статистику ожидания блокировок', exc_info=True)
+
+        return 'process', self.local_top(limit)
+
+    def reset(self) -> None:
+        with self.lock:
+            self.sketch = None
+            self.flushed_at = time.monotonic()
+
+        client = get_redis()
+        if client is not None:
+            try:
+                client.delete(SECONDS_KEY, WAITS_KEY)
+            except CACHE_ERRORS:
+                logger.warning('Не удалось сбросить статистику ожидания блокировок', exc_info=True)
+
+
+contention_profiler = ContentionProfiler()
@@ -0,0 +1,213 @@
+import threading
+import time
+from decimal import Decimal
+from typing import Any
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.exceptions import APIException, ValidationError
+
+from main.services.redis_client import acache_get
+
+RATES_TABLE_KEY = 'exchange_rates:table'
+RATES_VERSION_KEY = 'exchange_rates:version'
+RATES_FRESH_UNTIL_KEY = 'exchange_rates:fresh_until'
+
+
+class LocalRateTable:
+    """
+    Локальная (в памяти процесса) копия таблицы курсов валют, хранящейся в Redis.
+
+    Таблица считается актуальной в течение EXCHANGE_RATES_L1_TTL секунд. По истечении этого времени из Redis
+    читается только номер версии таблицы, а сама таблица перечитывается лишь при его изменении.
+    Если таблицы нет в Redis, она восстанавливается из последнего снимка в базе данных, см. restore_exchange_rates.
+
+    Attributes:
+        rates (dict[str, Decimal] | None): Курсы валют по отношению к российскому рублю.
+        version (int | None): Версия таблицы, из которой получены курсы.
+        checked_at (float): Время последней сверки версии с Redis по монотонным часам.
+    """
+
+    def __init__(self) -> None:
+        self.rates = None
+        self.version = None
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+
+    def get_rates(self) -> dict[str, Decimal]:
+        """
+        Возвращает актуальную таблицу курсов валют.
+
+        Returns:
+            dict[str, Decimal]: Курсы валют по отношению к российскому рублю.
+
+        Raises:
+            APIException: В случае, если таблица курсов валют отсутствует в кэше.
+        """
+        if self.is_fresh():
+            return self.rates
+
+        with self.lock:
+            if not self.is_fresh():
+                self.refresh()
+
+        return self.rates
+
+    def is_fresh(self) -> bool:
+        return self.rates is not None and time.monotonic() - self.checked_at < settings.EXCHANGE_RATES_L1_TTL
+
+    async def aget_rates(self) -> dict[str, Decimal]:
+        """
+        Асинхронный вариант get_rates, читающий Redis асинхронным клиентом.
+
+        Returns:
+            dict[str, Decimal]: Курсы валют по отношению к российскому рублю.
+
+        Raises:
+            APIException: В случае, если таблица курсов валют отсутствует в кэше.
+        """
+        if self.is_fresh():
+            return self.rates
+
+        version = await acache_get(RATES_VERSION_KEY)
+        if version is None and await sync_to_async(restore_rates)():
+            version = await acache_get(RATES_VERSION_KEY)
+        table = await acache_get(RATES_TABLE_KEY) if version is not None and version != self.version else None
+        self.apply(version, table)
+        return self.rates
+
+    def refresh(self) -> None:
+        """
+        Сверяет версию локальной таблицы с Redis и при её изменении перечитывает таблицу.
+
+        Raises:
+            APIException: В случае, если таблица курсов валют отсутствует в кэше.
+        """
+        version = cache.get(RATES_VERSION_KEY)
+        if version is None and restore_rates():
+            version = cache.get(RATES_VERSION_KEY)
+        table = cache.get(RATES_TABLE_KEY) if version is not None and version != self.version else None
+        self.apply(version, table)
+
+    def apply(self, version: int | None, table: dict[str, str] | None) -> None:
+        """
+        Обновляет локальную таблицу по прочитанным из Redis версии и таблице курсов.
+
+        Args:
+            version (int | None): Версия таблицы в Redis.
+            table (dict[str, str] | None): Таблица курсов, если она перечитывалась.
+
+        Raises:
+            APIException: В случае, если таблица курсов валют отсутствует в кэше.
+        """
+        if version is None or (version != self.version and table is None):
+            self.rates = None
+            raise APIException({'error': 'Данные о курсах валют временно недоступны'})
+
+        if version != self.version:
+            self.rates = {currency: Decimal(rate) for currency, rate in table.items()}
+            self.version = version
+
+        self.checked_at = time.monotonic()
+
+    def clear(self) -> None:
+        with self.lock:
+            self.rates = None
+            self.version = None
+            self.checked_at = 0.0
+
+
+local_rates = LocalRateTable()
+
+
+def restore_rates() -> bool:
+    # Импорт внутри функции: rates_refresh импортирует модели и этот модуль, а этот модуль импортируется
+    # в main.tasks до загрузки приложений Django
+    from main.services.rates_refresh import restore_exchange_rates
+
+    return restore_exchange_rates()
+
+
+def get_exchange_rate(currency: str) -> Decimal:
+    """
+    Возвращает курс валюты по отношению к российскому рублю из локальной таблицы курсов.
+
+    Args:
+        currency (str): Наименование валюты. Например, 'USD', 'CNY', 'JPY'.
+
+    Returns:
+        Decimal: Курс обмена.
+
+    Raises:
+        APIException: В случае, если не удалось получить кэшированные данные о курсах валют.
+        ValidationError: В случае, если переданное наименование валюты не было найдено в таблице курсов.
+    """
+    try:
+        return local_rates.get_rates()[currency]
+    except KeyError:
+        raise ValidationError({'error': f'Валюта {currency} не найдена в ответе API'})
+
+
+async def aget_exchange_rate(currency: str) -> Decimal:
+    """
+    Асинхронный вариант get_exchange_rate.
+
+    Args:
+        currency (str): Наименование валюты. Например, 'USD', 'CNY', 'JPY'.
+
+    Returns:
+        Decimal: Курс обмена.
+
+    Raises:
+        APIException: В случае, если не удалось получить кэшированные данные о курсах валют.
+        ValidationError: В случае, если переданное наименование валюты не было найдено в таблице курсов.
+    """
+    try:
+        return (await local_rates.aget_rates())[currency]
+    except KeyError:
+        raise ValidationError({'error': f'Валюта {currency} не найдена в ответе API'})
+
+
+def get_exchange_rates(currencies: list[str]) -> dict[str, Decimal]:
+    """
+    Возвращает курсы нескольких валют из одного снимка локальной таблицы курсов.
+
+    Для российского рубля возвращается курс 1, таблица курсов для него не читается.
+
+    Args:
+        currencies (list[str]): Наименования валют. Например, ['RUB', 'USD', 'EUR'].
+
+    Returns:
+        dict[str, Decimal]: Курсы обмена по наименованиям валют.
+
+    Raises:
+        APIException: В случае, если не удалось получить кэшированные данные о курсах валют.
+        ValidationError: В случае, если какая-либо из валют не была найдена в таблице курсов.
+    """
+    foreign = [currency for currency in currencies if currency != 'RUB']
+    table = local_rates.get_rates() if foreign else {}
+
+    unknown = [currency for currency in foreign if currency not in table]
+    if unknown:
+        raise ValidationError({'error': f'Валюты {", ".join(unknown)} не найдены в ответе API'})
+
+    return {currency: Decimal(1) if currency == 'RUB' else table[currency] for currency in currencies}
+
+
+def store_exchange_rates(data: dict[str, Any], timeout: int) -> None:
+    """
+    Сохраняет в кэше компактную таблицу курсов валют из ответа стороннего API и увеличивает её версию.
+
+    Таблица записывается раньше версии, поэтому процесс, увидевший новую версию, прочитает и новую таблицу.
+
+    Args:
+        data (dict[str, Any]): Ответ стороннего API, содержащий ключ 'conversion_rates'.
+        timeout (int): Время жизни таблицы в кэше, в секундах.
+
+    Returns:
+        None
+    """
+    table = {currency: str(rate) for currency, rate in data['conversion_rates'].items()}
+    cache.set(RATES_TABLE_KEY, table, timeout=timeout)
+    cache.set(RATES_VERSION_KEY, time.time_ns(), timeout=timeout)
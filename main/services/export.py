@@ -0,0 +1,148 @@
+import csv
+import datetime
+import json
+from decimal import Decimal
+from itertools import islice
+from typing import Any, AsyncIterator, Iterable, Iterator
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from main.models import Transaction
+from main.pagination import filter_created_range
+from main.services.ledger import get_pending_transactions
+from main.services.transaction_service import render_comment
+
+EXPORT_FIELDS = [field.attname for field in Transaction._meta.concrete_fields]
+COMMENT_INDEX = EXPORT_FIELDS.index('comment')
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+class Echo:
+    """
+    Псевдофайл для csv.writer: возвращает записанную строку вместо её буферизации.
+    """
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def to_export_value(value: Any) -> Any:
+    """
+    Приводит значение поля транзакции к виду, в котором его отдаёт UserTransactionsListSerializer.
+
+    Args:
+        value (Any): Значение поля.
+
+    Returns:
+        Any: Строка для Decimal и datetime (ISO 8601, UTC - с суффиксом 'Z'), иначе исходное значение.
+    """
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime.datetime):
+        value = value.isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return value
+
+
+def iter_transaction_rows(user_id: int, date_range: dict[str, datetime.datetime]) -> Iterator[tuple]:
+    """
+    Возвращает итератор по всем транзакциям пользователя в порядке возрастания (created_at, id).
+
+    Строки читаются кортежами значений EXPORT_FIELDS через серверный курсор (QuerySet.iterator) порциями
+    по TRANSACTIONS_EXPORT_CHUNK_SIZE, поэтому потребление памяти не зависит от количества транзакций.
+    Вместо комментария пользователя в строке выдаётся технический комментарий, см. render_comment.
+    При LEDGER_MODE = 'outbox' в конце выдаются ещё не перенесённые в журнал транзакции.
+
+    Args:
+        user_id (int): ID пользователя.
+        date_range (dict[str, datetime.datetime]): Необязательные границы 'from' и 'to', см. filter_created_range.
+
+    Returns:
+        Iterator[tuple]: Итератор по кортежам значений полей EXPORT_FIELDS.
+    """
+    queryset = filter_created_range(Transaction.objects.filter(user_id=user_id), date_range)
+    rows = (queryset.order_by('created_at', 'id').values_list(*EXPORT_FIELDS, named=True)
+            .iterator(chunk_size=settings.TRANSACTIONS_EXPORT_CHUNK_SIZE))
+    for row in rows:
+        yield *row[:COMMENT_INDEX], render_comment(row), *row[COMMENT_INDEX + 1:]
+
+    for record in filter_created_range(get_pending_transactions(user_id), date_range):
+        yield tuple(render_comment(record) if field == 'comment' else getattr(record, field)
+                    for field in EXPORT_FIELDS)
+
+
+def chunked(rows: Iterable[tuple], size: int) -> Iterator[list[tuple]]:
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def stream_ndjson(rows: Iterable[tuple]) -> Iterator[str]:
+    """
+    Сериализует строки транзакций в NDJSON: по одному JSON-объекту на строку.
+
+    Строки объединяются порциями по TRANSACTIONS_EXPORT_CHUNK_SIZE, чтобы не отправлять клиенту
+    отдельный фрагмент ответа на каждую транзакцию.
+
+    Args:
+        rows (Iterable[tuple]): Кортежи значений полей EXPORT_FIELDS.
+
+    Returns:
+        Iterator[str]: Фрагменты ответа.
+    """
+    for chunk in chunked(rows, settings.TRANSACTIONS_EXPORT_CHUNK_SIZE):
+        yield ''.join(
+            json.dumps(dict(zip(EXPORT_FIELDS, map(to_export_value, row))), ensure_ascii=False) + '\n'
+            for row in chunk
+        )
+
+
+def stream_csv(rows: Iterable[tuple]) -> Iterator[str]:
+    """
+    Сериализует строки транзакций в CSV с заголовком из имён полей EXPORT_FIELDS.
+
+    Заголовок выдаётся до первого запроса к базе данных, строки - порциями по TRANSACTIONS_EXPORT_CHUNK_SIZE.
+
+    Args:
+        rows (Iterable[tuple]): Кортежи значений полей EXPORT_FIELDS.
+
+    Returns:
+        Iterator[str]: Фрагменты ответа.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for chunk in chunked(rows, settings.TRANSACTIONS_EXPORT_CHUNK_SIZE):
+        yield ''.join(writer.writerow(map(to_export_value, row)) for row in chunk)
+
+
+async def aiter_chunks(chunks: Iterator[str]) -> AsyncIterator[str]:
+    """
+    Асинхронно выдаёт фрагменты синхронного потока выгрузки для отдачи под ASGI-сервером.
+
+    Синхронный итератор StreamingHttpResponse под ASGI вычитывается в память целиком до отправки ответа.
+    Здесь каждый следующий фрагмент вычисляется отдельным вызовом sync_to_async в потоке запроса,
+    поэтому серверный курсор остаётся в одном соединении с базой данных, а клиент получает фрагменты по мере чтения.
+
+    Args:
+        chunks (Iterator[str]): Фрагменты ответа, см. STREAMERS.
+
+    Returns:
+        AsyncIterator[str]: Те же фрагменты ответа.
+    """
+    next_chunk = sync_to_async(next)
+    try:
+        while (chunk := await next_chunk(chunks, None)) is not None:
+            yield chunk
+    finally:
+        # Закрывает серверный курсор, если клиент отключился до конца выгрузки
+        await sync_to_async(chunks.close)()
+
+
+STREAMERS = {
+    'ndjson': stream_ndjson,
+    'csv': stream_csv,
+}
@@ -0,0 +1,121 @@
+import json
+import re
+from decimal import Decimal
+from typing import Any
+
+from main.enums import TransactionType
+
+try:
+    import orjson
+except ImportError:  # orjson необязателен: без него используется стандартный json
+    orjson = None
+
+CENTS = Decimal('0.01')
+OPERATIONS = frozenset(transaction_type.value for transaction_type in TransactionType)
+# Сумма, которую DecimalField(max_digits=12, decimal_places=2) принимает без изменений: до 10 цифр целой части
+AMOUNT_RE = re.compile(r'[0-9]{1,10}(?:\.[0-9]{1,2})?')
+MAX_COMMENT_LENGTH = 1024
+# Длина строкового ID, заведомо помещающегося в IntegerField без проверок DRF
+MAX_ID_DIGITS = 18
+
+
+def loads(body: bytes) -> Any:
+    """
+    Разбирает JSON-тело запроса через orjson, если он установлен, иначе через стандартный json.
+
+    Raises:
+        ValueError: В случае некорректного JSON.
+    """
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def dumps(data: Any) -> bytes:
+    """
+    Сериализует ответ в JSON так же, как JSONRenderer DRF: без пробелов и без экранирования не-ASCII символов.
+    """
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def parse_id(value: Any) -> int | None:
+    if type(value) is int:
+        return value
+    if type(value) is str and value.isascii() and value.isdigit() and len(value) <= MAX_ID_DIGITS:
+        return int(value)
+    return None
+
+
+def parse_amount(value: Any) -> Decimal | None:
+    # DecimalField разбирает str(value), поэтому число с плавающей точкой проверяется по его строковому виду
+    if type(value) is float:
+        value = repr(value)
+    elif type(value) is int:
+        value = str(value)
+    elif type(value) is not str:
+        return None
+
+    if AMOUNT_RE.fullmatch(value) is None:
+        return None
+    amount = Decimal(value).quantize(CENTS)
+    return amount if amount >= CENTS else None
+
+
+def parse_comment(value: Any) -> str | None:
+    if type(value) is not str:
+        return None
+    value = value.strip()
+    if len(value) > MAX_COMMENT_LENGTH or '\x00' in value:
+        return None
+    try:
+        value.encode()
+    except UnicodeEncodeError:  # одиночные суррогаты, которые CharField отклоняет
+        return None
+    return value
+
+
+def validate_transaction(data: Any) -> dict[str, Any] | None:
+    """
+    Проверяет входные данные транзакции по правилам TransactionSerializer без создания сериализатора.
+
+    Принимает только заведомо корректные данные в распространённых представлениях и возвращает те же
+    validated_data, что и TransactionSerializer. Во всех остальных случаях, в том числе для некорректных данных,
+    возвращает None: такие данные следует передать TransactionSerializer, который сформирует ответ с ошибками.
+
+    Args:
+        data (Any): Разобранное тело запроса.
+
+    Returns:
+        dict[str, Any] | None: Валидированные данные или None, если решение должен принять TransactionSerializer.
+    """
+    if type(data) is not dict:
+        return None
+
+    operation = data.get('operation')
+    if operation not in OPERATIONS:
+        return None
+    amount = parse_amount(data.get('amount'))
+    if amount is None:
+        return None
+
+    validated = {'operation': operation, 'amount': amount}
+    for key in ('from_user_id', 'to_user_id'):
+        if key in data:
+            validated[key] = parse_id(data[key])
+            if validated[key] is None:
+                return None
+    if 'comment' in data:
+        validated['comment'] = parse_comment(data['comment'])
+        if validated['comment'] is None:
+            return None
+
+    if operation != TransactionType.WITHDRAWAL.value and 'to_user_id' not in validated:
+        return None
+    if operation != TransactionType.DEPOSIT.value and 'from_user_id' not in validated:
+        return None
+    if operation == TransactionType.TRANSFER.value and validated['from_user_id'] == validated['to_user_id']:
+        return None
+
+    return validated
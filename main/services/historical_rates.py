@@ -0,0 +1,109 @@
+import datetime
+from bisect import bisect_right
+from decimal import Decimal
+from typing import Any, Iterable
+
+from django.db.models import DateField, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils.timezone import localdate
+from rest_framework.exceptions import ValidationError
+
+from main.models import ExchangeRate
+from main.services.export import to_export_value
+
+CENTS = Decimal('0.01')
+RATE_PLACES = Decimal('1e-10')
+# Денежные поля транзакции, пересчитываемые в другую валюту
+MONEY_FIELDS = ('amount', 'balance_before', 'balance_after')
+
+
+def record_daily_rates(table: dict[str, str], day: datetime.date) -> None:
+    """
+    Сохраняет курсы валют на дату; курсы, уже сохранённые на эту дату, перезаписываются.
+
+    Args:
+        table (dict[str, str]): Курсы валют по отношению к российскому рублю.
+        day (datetime.date): Дата курсов.
+
+    Returns:
+        None
+    """
+    ExchangeRate.objects.bulk_create(
+        [ExchangeRate(currency=currency, date=day, rate=Decimal(rate).quantize(RATE_PLACES))
+         for currency, rate in sorted(table.items()) if currency != 'RUB'],
+        update_conflicts=True,
+        unique_fields=['currency', 'date'],
+        update_fields=['rate'],
+    )
+
+
+def get_historical_rates(currency: str, dates: Iterable[datetime.date]) -> dict[datetime.date, Decimal]:
+    """
+    Возвращает курсы валюты на каждую из дат одним запросом к базе данных (двумя, если курс не известен
+    ни для одной из дат).
+
+    Курс на дату - последний сохранённый курс не позже этой даты. Даты раньше первого сохранённого курса
+    в результат не включаются: курс на них неизвестен.
+
+    Args:
+        currency (str): Наименование валюты. Например, 'USD'.
+        dates (Iterable[datetime.date]): Даты.
+
+    Returns:
+        dict[datetime.date, Decimal]: Курсы валюты по датам, для которых курс известен.
+
+    Raises:
+        ValidationError: В случае, если курсы валюты не сохранялись.
+    """
+    dates = set(dates)
+    if not dates:
+        return {}
+    first, last = min(dates), max(dates)
+
+    rates = ExchangeRate.objects.filter(currency=currency).order_by('date')
+    floor = rates.filter(date__lte=first).order_by('-date').values('date')[:1]
+    known = list(rates.filter(date__lte=last, date__gte=Coalesce(Subquery(floor), Value(first),
+                                                                 output_field=DateField()))
+                 .values_list('date', 'rate'))
+    # Пустой результат возможен и в случае, если все даты раньше первого сохранённого курса
+    if not known and not rates.exists():
+        raise ValidationError({'error': f'Курсы валюты {currency} не найдены'})
+
+    known_dates = [day for day, _ in known]
+    positions = {day: bisect_right(known_dates, day) for day in dates}
+    return {day: known[position - 1][1] for day, position in positions.items() if position}
+
+
+def convert_rows(items: list[dict[str, Any]], rows: list[Any], currency: str) -> list[dict[str, Any]]:
+    """
+    Пересчитывает денежные поля сериализованных транзакций в валюту по курсу на день исполнения каждой транзакции.
+
+    Курсы для всей страницы читаются одним запросом, см. get_historical_rates. Суммы вычисляются в Decimal
+    от исходных значений и округляются до копеек (центов); к каждой записи добавляются поля currency
+    и exchange_rate. Транзакции, исполненные раньше первого сохранённого курса валюты, не пересчитываются:
+    их суммы остаются в рублях, currency равно 'RUB', а exchange_rate - None.
+
+    Args:
+        items (list[dict[str, Any]]): Сериализованные транзакции, см. serialize_rows.
+        rows (list[Any]): Исходные записи транзакций в том же порядке; должны содержать created_at.
+        currency (str): Наименование валюты.
+
+    Returns:
+        list[dict[str, Any]]: Те же словари items с пересчитанными суммами.
+
+    Raises:
+        ValidationError: В случае, если курсы валюты не сохранялись.
+    """
+    rates = get_historical_rates(currency, (localdate(row.created_at) for row in rows))
+    for item, row in zip(items, rows):
+        rate = rates.get(localdate(row.created_at))
+        if rate is None:
+            item['currency'] = 'RUB'
+            item['exchange_rate'] = None
+            continue
+        for field in MONEY_FIELDS:
+            if field in item:
+                item[field] = to_export_value((getattr(row, field) * rate).quantize(CENTS))
+        item['currency'] = currency
+        item['exchange_rate'] = f'{rate.normalize():f}'
+    return items
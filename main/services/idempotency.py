@@ -0,0 +1,244 @@
+import hashlib
+import json
+import logging
+import time
+from datetime import timedelta
+from typing import Any, Callable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils.timezone import now
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+from rest_framework.views import exception_handler
+
+from main.exceptions import ConcurrencyConflict, IdempotencyKeyInProgress, IdempotencyKeyMismatch
+from main.models import IdempotencyRecord
+from main.services.redis_client import CACHE_ERRORS
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+DONE = 'done'
+
+
+def make_fingerprint(data: Any) -> str:
+    """
+    Возвращает отпечаток тела запроса, по которому повторный запрос сверяется с исходным.
+
+    Args:
+        data (Any): Тело запроса.
+
+    Returns:
+        str: SHA-256 канонического JSON-представления тела запроса.
+    """
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class CacheIdempotencyStore:
+    """
+    Хранилище записей Idempotency-Key в кэше (Redis).
+
+    Незавершённая запись живёт IDEMPOTENCY_LOCK_TIMEOUT секунд, чтобы ключ освободился, если обработчик
+    запроса аварийно завершился; завершённая запись с ответом сервера - IDEMPOTENCY_TTL секунд.
+    """
+
+    def reserve(self, key: str, fingerprint: str) -> bool:
+        record = {'state': PENDING, 'fingerprint': fingerprint}
+        return cache.add(key, record, timeout=settings.IDEMPOTENCY_LOCK_TIMEOUT)
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        return cache.get(key)
+
+    def complete(self, key: str, fingerprint: str, status_code: int, response: Any) -> None:
+        record = {'state': DONE, 'fingerprint': fingerprint, 'status_code': status_code, 'response': response}
+        cache.set(key, record, timeout=settings.IDEMPOTENCY_TTL)
+
+    def release(self, key: str) -> None:
+        cache.delete(key)
+
+
+class DatabaseIdempotencyStore:
+    """
+    Резервное хранилище записей Idempotency-Key в базе данных, используемое при недоступности Redis.
+
+    Устаревшие записи не удаляются фоново: запись считается отсутствующей, если срок её жизни истёк.
+    Завершённая запись создаётся и в случае, если ключ был зарезервирован в Redis, но Redis стал недоступен
+    до сохранения ответа.
+    """
+
+    def reserve(self, key: str, fingerprint: str) -> bool:
+        self.purge_expired(key)
+        try:
+            with transaction.atomic():
+                IdempotencyRecord.objects.create(key=key, fingerprint=fingerprint)
+        except IntegrityError:
+            return False
+        return True
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        current_time = now()
+        record = IdempotencyRecord.objects.filter(
+            Q(status_code__isnull=True, created_at__gte=current_time - timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT))
+            | Q(status_code__isnull=False, created_at__gte=current_time - timedelta(seconds=settings.IDEMPOTENCY_TTL)),
+            key=key,
+        ).first()
+        if record is None:
+            return None
+        return {
+            'state': PENDING if record.status_code is None else DONE,
+            'fingerprint': record.fingerprint,
+            'status_code': record.status_code,
+            'response': record.response,
+        }
+
+    def complete(self, key: str, fingerprint: str, status_code: int, response: Any) -> None:
+        IdempotencyRecord.objects.update_or_create(
+            key=key,
+            defaults={'fingerprint': fingerprint, 'status_code': status_code, 'response': response, 'created_at': now()},
+        )
+
+    def release(self, key: str) -> None:
+        IdempotencyRecord.objects.filter(key=key).delete()
+
+    def purge_expired(self, key: str) -> None:
+        current_time = now()
+        IdempotencyRecord.objects.filter(key=key, status_code__isnull=True, created_at__lt=current_time - timedelta(
+            seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT)).delete()
+        IdempotencyRecord.objects.filter(key=key, created_at__lt=current_time - timedelta(
+            seconds=settings.IDEMPOTENCY_TTL)).delete()
+
+
+cache_store = CacheIdempotencyStore()
+database_store = DatabaseIdempotencyStore()
+
+
+def call(operation: str, *args: Any) -> Any:
+    """
+    Выполняет операцию хранилища в Redis, а при его недоступности - в базе данных.
+
+    Args:
+        operation (str): Название метода хранилища.
+        *args (Any): Аргументы метода.
+
+    Returns:
+        Any: Результат метода хранилища.
+    """
+    try:
+        return getattr(cache_store, operation)(*args)
+    except CACHE_ERRORS:
+        logger.warning('Хранилище Idempotency-Key в Redis недоступно, используется база данных', exc_info=True)
+        return getattr(database_store, operation)(*args)
+
+
+def reserve(key: str, fingerprint: str) -> CacheIdempotencyStore | DatabaseIdempotencyStore | None:
+    """
+    Резервирует ключ в Redis, а при его недоступности - в базе данных.
+
+    Ключ, зарезервированный в Redis, считается занятым, если в базе данных есть действующая запись с тем же ключом:
+    она остаётся от запроса, исполненного при недоступности Redis, или от запроса, ответ которого не удалось
+    сохранить в Redis. Завершённая запись копируется в Redis, чтобы повторный запрос получил сохранённый ответ.
+
+    Args:
+        key (str): Ключ хранилища.
+        fingerprint (str): Отпечаток тела запроса.
+
+    Returns:
+        CacheIdempotencyStore | DatabaseIdempotencyStore | None: Хранилище, в котором зарезервирован ключ,
+            или None, если ключ уже занят.
+    """
+    try:
+        if not cache_store.reserve(key, fingerprint):
+            return None
+    except CACHE_ERRORS:
+        logger.warning('Хранилище Idempotency-Key в Redis недоступно, используется база данных', exc_info=True)
+        return database_store if database_store.reserve(key, fingerprint) else None
+
+    record = database_store.get(key)
+    if record is None:
+        return cache_store
+
+    try:
+        if record['state'] == DONE:
+            cache_store.complete(key, record['fingerprint'], record['status_code'], record['response'])
+        else:
+            cache_store.release(key)
+    except CACHE_ERRORS:
+        logger.warning('Хранилище Idempotency-Key в Redis недоступно', exc_info=True)
+    return None
+
+
+def is_retryable(exc: APIException) -> bool:
+    # Конфликт конкурентного доступа и ошибки сервера не являются итогом запроса: его можно повторить с тем же ключом
+    return isinstance(exc, ConcurrencyConflict) or exc.status_code >= 500
+
+
+def idempotent_response(scope: str, key: str, data: Any, handler: Callable[[], Response]) -> Response:
+    """
+    Исполняет обработчик запроса не более одного раза для пары (scope, Idempotency-Key).
+
+    Первый запрос резервирует ключ и сохраняет итоговый ответ обработчика, в том числе ответ с ошибкой
+    (например, 400 при недостатке средств или 404). Повторные запросы в пределах IDEMPOTENCY_TTL получают
+    сохранённый ответ без обращения к балансам. Конкурентный дубликат ожидает завершения первого запроса
+    не дольше IDEMPOTENCY_WAIT_TIMEOUT секунд. Ответ сохраняется в хранилище, в котором зарезервирован ключ;
+    если Redis стал недоступен после резервирования - в базе данных, см. reserve. Если обработчик завершился
+    непредвиденным исключением, конфликтом конкурентного доступа или ошибкой сервера, ключ освобождается
+    и запрос можно повторить.
+
+    Args:
+        scope (str): Область действия ключа, например тип операции.
+        key (str): Значение заголовка Idempotency-Key.
+        data (Any): Тело запроса.
+        handler (Callable[[], Response]): Обработчик запроса.
+
+    Returns:
+        Response: Ответ обработчика или сохранённый ответ на исходный запрос.
+
+    Raises:
+        IdempotencyKeyMismatch: Если ключ уже использован с другим телом запроса.
+        IdempotencyKeyInProgress: Если исходный запрос не завершился за время ожидания.
+    """
+    store_key = f'idempotency:{scope}:{key}'
+    fingerprint = make_fingerprint(data)
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+
+    while (store := reserve(store_key, fingerprint)) is None:
+        record = call('get', store_key)
+        if record is not None:
+            if record['fingerprint'] != fingerprint:
+                raise IdempotencyKeyMismatch()
+            if record['state'] == DONE:
+                response = Response(record['response'], status=record['status_code'])
+                response['Idempotent-Replayed'] = 'true'
+                return response
+        if time.monotonic() >= deadline:
+            raise IdempotencyKeyInProgress()
+        time.sleep(settings.IDEMPOTENCY_POLL_INTERVAL)
+
+    try:
+        response = handler()
+    except APIException as exc:
+        if is_retryable(exc):
+            release(store, store_key)
+            raise
+        response = exception_handler(exc, {})
+    except BaseException:
+        release(store, store_key)
+        raise
+
+    try:
+        store.complete(store_key, fingerprint, response.status_code, response.data)
+    except CACHE_ERRORS:
+        logger.warning('Хранилище Idempotency-Key в Redis недоступно, ответ сохраняется в базе данных', exc_info=True)
+        database_store.complete(store_key, fingerprint, response.status_code, response.data)
+    return response
+
+
+def release(store: CacheIdempotencyStore | DatabaseIdempotencyStore, key: str) -> None:
+    try:
+        store.release(key)
+    except CACHE_ERRORS:
+        # Незавершённая запись в Redis освободится через IDEMPOTENCY_LOCK_TIMEOUT секунд
+        logger.warning('Хранилище Idempotency-Key в Redis недоступно', exc_info=True)
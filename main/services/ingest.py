@@ -0,0 +1,202 @@
+import heapq
+import json
+from dataclasses import dataclass, field
+from typing import Any, BinaryIO, Iterable, Iterator
+
+from django.db import transaction
+from django.db.models import F
+from django.utils.timezone import now
+from rest_framework.exceptions import ValidationError
+
+from main.models import IngestCheckpoint
+from main.serializers import TransactionSerializer
+from main.services.retry import retry_on_conflict
+from main.services.transaction_service import process_batch
+
+
+@dataclass
+class ParsedLine:
+    """
+    Строка файла операций.
+
+    Attributes:
+        number (int): Номер строки в файле, начиная с 1.
+        end_offset (int): Смещение в байтах сразу после строки.
+        operation (dict[str, Any] | None): Валидированные данные операции или None для пустой и ошибочной строки.
+        errors (Any): Ошибки разбора или валидации; None для корректной строки.
+    """
+    number: int
+    end_offset: int
+    operation: dict[str, Any] | None = None
+    errors: Any = None
+
+
+@dataclass
+class IngestBatch:
+    """
+    Пакет операций, исполняемый и фиксируемый в позиции загрузки одной транзакцией базы данных.
+
+    Attributes:
+        operations (list[dict[str, Any]]): Валидированные операции в порядке строк файла.
+        line_numbers (list[int]): Номера строк операций.
+        end_offset (int): Смещение в байтах после последней строки пакета.
+        lines (int): Количество строк пакета, включая пустые и ошибочные.
+        rejected (int): Количество ошибочных строк пакета.
+    """
+    operations: list[dict[str, Any]] = field(default_factory=list)
+    line_numbers: list[int] = field(default_factory=list)
+    end_offset: int = 0
+    lines: int = 0
+    rejected: int = 0
+
+
+class IngestErrors:
+    """
+    Ошибочные строки загрузки: подробно хранятся только limit строк с наименьшими номерами, остальные - подсчитываются.
+
+    Память не растёт с количеством ошибок в файле.
+
+    Attributes:
+        limit (int): Количество строк, ошибки которых хранятся подробно.
+        count (int): Общее количество ошибочных строк.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.count = 0
+        # Куча с обратными номерами строк: в её вершине - строка с наибольшим номером из сохранённых
+        self.heap = []
+
+    def append(self, error: tuple[int, Any]) -> None:
+        self.count += 1
+        number, detail = error
+        if len(self.heap) < self.limit:
+            heapq.heappush(self.heap, (-number, detail))
+        elif self.heap and -self.heap[0][0] > number:
+            heapq.heapreplace(self.heap, (-number, detail))
+
+    def extend(self, errors: Iterable[tuple[int, Any]]) -> None:
+        for error in errors:
+            self.append(error)
+
+    def first(self) -> list[tuple[int, Any]]:
+        """
+        Возвращает сохранённые ошибочные строки по возрастанию номеров.
+
+        Returns:
+            list[tuple[int, Any]]: Номера строк и их ошибки.
+        """
+        return sorted(((-number, detail) for number, detail in self.heap), key=lambda item: item[0])
+
+    def __len__(self) -> int:
+        return self.count
+
+
+def parse_lines(file: BinaryIO, offset: int = 0, first_line: int = 1) -> Iterator[ParsedLine]:
+    """
+    Потоково читает файл JSONL с операциями начиная со смещения offset и валидирует каждую строку
+    по правилам TransactionSerializer.
+
+    Args:
+        file (BinaryIO): Файл, открытый в двоичном режиме.
+        offset (int): Смещение в байтах, с которого начинается чтение (начало строки).
+        first_line (int): Номер строки, находящейся по смещению offset.
+
+    Returns:
+        Iterator[ParsedLine]: Итератор по строкам файла.
+    """
+    # Один экземпляр сериализатора на весь файл: DRF копирует поля при создании каждого экземпляра
+    validator = TransactionSerializer()
+    file.seek(offset)
+    for number, raw in enumerate(iter(file.readline, b''), start=first_line):
+        offset += len(raw)
+        if not raw.strip():
+            yield ParsedLine(number, offset)
+            continue
+
+        try:
+            data = json.loads(raw)
+        except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+            yield ParsedLine(number, offset, errors={'error': f'Некорректный JSON: {exc}'})
+            continue
+        if not isinstance(data, dict):
+            yield ParsedLine(number, offset, errors={'error': 'Ожидается JSON-объект'})
+            continue
+
+        try:
+            operation = validator.run_validation(data)
+        except ValidationError as exc:
+            yield ParsedLine(number, offset, errors=exc.detail)
+            continue
+        yield ParsedLine(number, offset, operation=operation)
+
+
+def read_batches(lines: Iterator[ParsedLine],
+                 batch_size: int,
+                 errors: IngestErrors
+                 ) -> Iterator[IngestBatch]:
+    """
+    Группирует строки файла в пакеты по batch_size операций.
+
+    Args:
+        lines (Iterator[ParsedLine]): Строки файла, см. parse_lines.
+        batch_size (int): Количество операций в пакете.
+        errors (IngestErrors): Ошибочные строки, в которые добавляются номера строк и их ошибки.
+
+    Returns:
+        Iterator[IngestBatch]: Итератор по пакетам; последний пакет может быть неполным или не содержать операций.
+    """
+    batch = IngestBatch()
+    for line in lines:
+        batch.lines += 1
+        batch.end_offset = line.end_offset
+        if line.errors is not None:
+            batch.rejected += 1
+            errors.append((line.number, line.errors))
+        elif line.operation is not None:
+            batch.operations.append(line.operation)
+            batch.line_numbers.append(line.number)
+
+        if len(batch.operations) >= batch_size:
+            yield batch
+            batch = IngestBatch()
+
+    if batch.lines:
+        yield batch
+
+
+@retry_on_conflict
+def apply_batch(checkpoint: IngestCheckpoint, batch: IngestBatch, errors: IngestErrors) -> int:
+    """
+    Исполняет пакет операций через process_batch и сдвигает позицию загрузки в одной транзакции базы данных.
+
+    Операции исполняются в порядке строк файла в режиме atomic=False: операции, которые нельзя исполнить
+    (например, из-за недостатка средств), пропускаются. Записи журнала сохраняются запросом COPY.
+
+    Args:
+        checkpoint (IngestCheckpoint): Позиция загрузки файла; обновляется и сохраняется.
+        batch (IngestBatch): Пакет операций.
+        errors (IngestErrors): Ошибочные строки, в которые добавляются номера неисполненных строк и их ошибки.
+
+    Returns:
+        int: Количество исполненных операций.
+    """
+    with transaction.atomic():
+        results = process_batch(batch.operations, atomic=False, copy_ledger=True) if batch.operations else []
+        failed = [(number, result['errors']) for number, result in zip(batch.line_numbers, results)
+                  if result['status'] != 'ok']
+        changes = {
+            'lines': batch.lines,
+            'applied': len(results) - len(failed),
+            'rejected': batch.rejected + len(failed),
+        }
+        IngestCheckpoint.objects.filter(pk=checkpoint.pk).update(
+            offset=batch.end_offset, updated_at=now(), **{name: F(name) + value for name, value in changes.items()}
+        )
+
+    # Объект обновляется только после фиксации: при повторе транзакции счётчики не должны учитываться дважды
+    checkpoint.offset = batch.end_offset
+    for name, value in changes.items():
+        setattr(checkpoint, name, getattr(checkpoint, name) + value)
+    errors.extend(failed)
+    return changes['applied']
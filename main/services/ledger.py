@@ -0,0 +1,121 @@
+from typing import Any
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min, Q
+from django.utils.timezone import now
+
+from main.models import LedgerOutbox, Transaction
+from main.services.stats import Counters
+from main.services.transaction_service import build_transactions
+
+# Счётчики переноса outbox: flushed_entries, flushed_transactions и flush_batches
+ledger_stats = Counters()
+
+
+def outbox_entry_data(entry: LedgerOutbox) -> dict[str, Any]:
+    """
+    Восстанавливает итоговые данные о транзакции по записи LedgerOutbox.
+
+    Args:
+        entry (LedgerOutbox): Запись outbox.
+
+    Returns:
+        dict[str, Any]: Итоговые данные о транзакции в формате process_transaction.
+    """
+    data = {
+        'from_user_id': entry.from_user_id,
+        'to_user_id': entry.to_user_id,
+        'amount': entry.amount,
+        'operation': entry.operation,
+        'completed_at': entry.created_at.strftime('%d.%m.%Y %H:%M:%S'),
+    }
+    for side in ('from', 'to'):
+        if getattr(entry, f'{side}_balance_before') is not None:
+            data[f'{side}_balance_before'] = getattr(entry, f'{side}_balance_before')
+            data[f'{side}_balance_after'] = getattr(entry, f'{side}_balance_after')
+
+    return data
+
+
+def flush_outbox(batch_size: int | None = None) -> int:
+    """
+    Переносит записи LedgerOutbox в Transaction пакетами по batch_size записей.
+
+    Каждый пакет обрабатывается в отдельной транзакции базы данных: записи outbox блокируются
+    SELECT ... FOR UPDATE SKIP LOCKED, по ним одним запросом создаются записи Transaction, после чего записи outbox
+    удаляются. Вставка и удаление фиксируются вместе, а заблокированные записи пропускаются конкурентными
+    воркерами, поэтому каждая запись outbox переносится ровно один раз.
+
+    Args:
+        batch_size (int | None): Размер пакета; по умолчанию - LEDGER_OUTBOX_BATCH_SIZE.
+
+    Returns:
+        int: Количество перенесённых записей outbox.
+    """
+    batch_size = batch_size or settings.LEDGER_OUTBOX_BATCH_SIZE
+    flushed = 0
+
+    while True:
+        with transaction.atomic():
+            entries = list(LedgerOutbox.objects.select_for_update(skip_locked=True).order_by('id')[:batch_size])
+            if not entries:
+                break
+
+            records = [
+                record for entry in entries
+                for record in build_transactions(outbox_entry_data(entry), entry.comment, entry.created_at)
+            ]
+            Transaction.objects.bulk_create(records)
+            LedgerOutbox.objects.filter(pk__in=[entry.pk for entry in entries]).delete()
+
+        flushed += len(entries)
+        ledger_stats.add('flushed_entries', len(entries))
+        ledger_stats.add('flushed_transactions', len(records))
+        ledger_stats.add('flush_batches')
+
+        if len(entries) < batch_size:
+            break
+
+    return flushed
+
+
+def get_outbox_stats() -> dict[str, Any]:
+    """
+    Возвращает размер очереди outbox и отставание журнала транзакций.
+
+    Returns:
+        dict[str, Any]: Словарь с ключами 'pending' (количество записей outbox), 'oldest_created_at'
+            (время исполнения самой старой из них) и 'lag_seconds' (отставание журнала от текущего времени).
+    """
+    stats = LedgerOutbox.objects.aggregate(oldest_created_at=Min('created_at'), pending=Count('id'))
+    oldest = stats['oldest_created_at']
+    return {
+        'pending': stats['pending'],
+        'oldest_created_at': oldest,
+        'lag_seconds': (now() - oldest).total_seconds() if oldest else 0.0,
+    }
+
+
+def get_pending_transactions(user_id: int) -> list[Transaction]:
+    """
+    Возвращает ещё не перенесённые из outbox транзакции пользователя.
+
+    Записи Transaction не сохраняются и не имеют id. Используется списком транзакций пользователя,
+    чтобы пользователь видел свои операции сразу после их исполнения.
+
+    Args:
+        user_id (int): ID пользователя.
+
+    Returns:
+        list[Transaction]: Несохранённые записи Transaction пользователя в порядке исполнения операций.
+    """
+    if settings.LEDGER_MODE != 'outbox':
+        return []
+
+    entries = LedgerOutbox.objects.filter(Q(from_user_id=user_id) | Q(to_user_id=user_id)).order_by('created_at', 'id')
+    return [
+        record for entry in entries
+        for record in build_transactions(outbox_entry_data(entry), entry.comment, entry.created_at)
+        if record.user_id == user_id
+    ]
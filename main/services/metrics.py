@@ -0,0 +1,111 @@
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from main.services.stats import Histogram
+
+# Длительность фаз обработки транзакций и запросов: метки (phase, operation)
+phase_seconds = Histogram()
+# Длительность обработки HTTP-запросов и количество SQL-запросов в них: метки (view, method)
+request_seconds = Histogram()
+request_queries = Histogram(buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55, 89))
+
+HISTOGRAMS = [
+    ('balance_phase_seconds', 'Длительность фаз обработки транзакций', ('phase', 'operation'), phase_seconds),
+    ('balance_request_seconds', 'Длительность обработки HTTP-запросов', ('view', 'method'), request_seconds),
+    ('balance_request_queries', 'Количество SQL-запросов на HTTP-запрос', ('view', 'method'), request_queries),
+]
+
+
+@contextmanager
+def timed(phase: str, operation: str) -> Iterator[None]:
+    """
+    Учитывает длительность блока кода в гистограмме phase_seconds.
+
+    Длительность учитывается и при выходе из блока по исключению.
+
+    Args:
+        phase (str): Фаза, например 'lock' или 'record'.
+        operation (str): Тип операции, например 'deposit' или 'batch'.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        phase_seconds.observe((phase, operation), time.perf_counter() - started)
+
+
+def escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(names: tuple[str, ...], values: tuple[str, ...], le: str | None = None) -> str:
+    pairs = [f'{name}="{escape_label(str(value))}"' for name, value in zip(names, values)]
+    if le is not None:
+        pairs.append(f'le="{le}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def render_histogram(name: str, help_text: str, label_names: tuple[str, ...], histogram: Histogram) -> list[str]:
+    """
+    Выводит гистограмму в текстовом формате Prometheus с накопительными значениями корзин.
+
+    Args:
+        name (str): Имя метрики.
+        help_text (str): Описание метрики.
+        label_names (tuple[str, ...]): Имена меток.
+        histogram (Histogram): Гистограмма.
+
+    Returns:
+        list[str]: Строки метрики.
+    """
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+    bounds = [f'{bound:g}' for bound in histogram.buckets] + ['+Inf']
+    for labels, (counts, total, count) in sorted(histogram.snapshot().items()):
+        cumulative = 0
+        for bound, bucket_count in zip(bounds, counts):
+            cumulative += bucket_count
+            lines.append(f'{name}_bucket{format_labels(label_names, labels, bound)} {cumulative}')
+        lines.append(f'{name}_sum{format_labels(label_names, labels)} {total:.6f}')
+        lines.append(f'{name}_count{format_labels(label_names, labels)} {count}')
+    return lines
+
+
+def render_counters(prefix: str, help_text: str, values: dict[str, float]) -> list[str]:
+    lines = []
+    for counter, value in sorted(values.items()):
+        name = f'{prefix}_{counter}_total'
+        lines.extend([f'# HELP {name} {help_text}: {counter}', f'# TYPE {name} counter', f'{name} {value:g}'])
+    return lines
+
+
+def render_metrics() -> str:
+    """
+    Выводит метрики процесса в текстовом формате Prometheus (version 0.0.4).
+
+    Гистограммы фаз и запросов, а также счётчики retry_stats, lock_stats, ledger_stats и счётчики кэша балансов
+    ведутся в памяти процесса: при нескольких воркерах каждый из них отдаёт собственные значения.
+
+    Returns:
+        str: Текст метрик.
+    """
+    # Импорт внутри функции: transaction_service (и импортирующий его ledger) импортирует этот модуль
+    from main.services.balance_cache import stats as balance_cache_stats
+    from main.services.ledger import ledger_stats
+    from main.services.retry import retry_stats
+    from main.services.transaction_service import lock_stats
+
+    lines = []
+    for name, help_text, label_names, histogram in HISTOGRAMS:
+        lines.extend(render_histogram(name, help_text, label_names, histogram))
+
+    counters = [
+        ('balance_retry', 'Конфликты и повторы транзакций', retry_stats.snapshot()),
+        ('balance_lock', 'Блокировки балансов', lock_stats.snapshot()),
+        ('balance_ledger', 'Перенос записей outbox в журнал', ledger_stats.snapshot()),
+        ('balance_cache', 'Обращения к кэшу балансов', balance_cache_stats.snapshot()),
+    ]
+    for prefix, help_text, values in counters:
+        lines.extend(render_counters(prefix, help_text, values))
+
+    return '\n'.join(lines) + '\n'
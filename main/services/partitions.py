@@ -0,0 +1,232 @@
+import datetime
+import gzip
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.db import connection, transaction
+from django.utils.timezone import now
+
+from main.models import Transaction
+
+PARENT_TABLE = Transaction._meta.db_table
+BOUND_RE = re.compile(r"FOR VALUES FROM \((?P<lower>[^)]+)\) TO \((?P<upper>[^)]+)\)")
+
+
+@dataclass
+class Partition:
+    """
+    Партиция таблицы транзакций.
+
+    Attributes:
+        name (str): Имя таблицы партиции.
+        lower (datetime.datetime | None): Нижняя граница created_at (включительно); None - MINVALUE.
+        upper (datetime.datetime | None): Верхняя граница created_at (не включительно); None - MAXVALUE.
+        is_default (bool): True для партиции по умолчанию, в которую попадают строки вне диапазонов остальных.
+    """
+    name: str
+    lower: datetime.datetime | None = None
+    upper: datetime.datetime | None = None
+    is_default: bool = False
+
+
+def month_start(value: datetime.date) -> datetime.date:
+    return value.replace(day=1)
+
+
+def add_months(value: datetime.date, months: int) -> datetime.date:
+    """
+    Возвращает первое число месяца, отстоящего от месяца value на months месяцев.
+
+    Args:
+        value (datetime.date): Дата.
+        months (int): Количество месяцев, может быть отрицательным.
+
+    Returns:
+        datetime.date: Первое число месяца.
+    """
+    index = value.year * 12 + value.month - 1 + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: datetime.date) -> str:
+    return f'{PARENT_TABLE}_p{month:%Y%m}'
+
+
+def parse_bound(value: str) -> datetime.datetime | None:
+    """
+    Разбирает границу диапазона партиции в формате pg_get_expr.
+
+    Args:
+        value (str): Граница, например "'2026-01-01 00:00:00+00'" или 'MINVALUE'.
+
+    Returns:
+        datetime.datetime | None: Граница или None для MINVALUE/MAXVALUE.
+    """
+    value = value.strip()
+    if value in ('MINVALUE', 'MAXVALUE'):
+        return None
+    return datetime.datetime.fromisoformat(value.strip("'"))
+
+
+def parse_partition(name: str, bound: str) -> Partition:
+    """
+    Создаёт описание партиции по её имени и выражению границ (pg_get_expr(relpartbound)).
+
+    Args:
+        name (str): Имя таблицы партиции.
+        bound (str): Выражение границ, например "FOR VALUES FROM (MINVALUE) TO ('2026-01-01 00:00:00+00')".
+
+    Returns:
+        Partition: Описание партиции.
+    """
+    if bound == 'DEFAULT':
+        return Partition(name, is_default=True)
+
+    match = BOUND_RE.search(bound)
+    return Partition(name, parse_bound(match['lower']), parse_bound(match['upper']))
+
+
+def is_partitioned() -> bool:
+    """
+    Возвращает True, если таблица транзакций секционирована (PostgreSQL, миграция 0009 применена).
+    """
+    if connection.vendor != 'postgresql':
+        return False
+
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)', [PARENT_TABLE])
+        return cursor.fetchone() is not None
+
+
+def list_partitions() -> list[Partition]:
+    """
+    Возвращает партиции таблицы транзакций в порядке возрастания нижней границы; партиция по умолчанию - последняя.
+
+    Returns:
+        list[Partition]: Партиции таблицы транзакций.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i '
+            'JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = to_regclass(%s)',
+            [PARENT_TABLE]
+        )
+        partitions = [parse_partition(name, bound) for name, bound in cursor.fetchall()]
+
+    return sorted(partitions, key=lambda partition: (
+        partition.is_default, partition.lower or datetime.datetime.min.replace(tzinfo=datetime.timezone.utc)
+    ))
+
+
+def create_partitions(months_ahead: int, today: datetime.date | None = None) -> list[str]:
+    """
+    Создаёт месячные партиции таблицы транзакций вплоть до месяца, отстоящего от текущего на months_ahead месяцев.
+
+    Новые партиции продолжают диапазон от верхней границы последней из существующих, поэтому диапазоны не пересекаются.
+
+    Args:
+        months_ahead (int): Количество месяцев вперёд, на которые должны существовать партиции.
+        today (datetime.date | None): Текущая дата; по умолчанию - сегодняшняя по UTC, как и границы партиций.
+
+    Returns:
+        list[str]: Имена созданных партиций.
+    """
+    today = today or now().date()
+    upper_bounds = [partition.upper for partition in list_partitions() if partition.upper is not None]
+    month = month_start(max(upper_bounds).date()) if upper_bounds else month_start(today)
+    last_month = add_months(month_start(today), months_ahead)
+
+    created = []
+    with connection.cursor() as cursor:
+        while month <= last_month:
+            name = partition_name(month)
+            # Границы партиции - литералы DDL, их нельзя передать параметрами запроса
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS {connection.ops.quote_name(name)} '
+                f"PARTITION OF {connection.ops.quote_name(PARENT_TABLE)} "
+                f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+            )
+            created.append(name)
+            month = add_months(month, 1)
+
+    return created
+
+
+def count_rows(partition: Partition) -> int:
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT COUNT(*) FROM {connection.ops.quote_name(partition.name)}')
+        return cursor.fetchone()[0]
+
+
+def detach_partition(partition: Partition) -> None:
+    """
+    Отсоединяет партицию от таблицы транзакций; её строки перестают попадать в запросы к журналу.
+
+    Args:
+        partition (Partition): Партиция.
+
+    Returns:
+        None
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE {connection.ops.quote_name(PARENT_TABLE)} '
+                       f'DETACH PARTITION {connection.ops.quote_name(partition.name)}')
+
+
+def archive_table(table: str, output_dir: Path) -> Path:
+    """
+    Выгружает таблицу в сжатый gzip CSV-файл с заголовком потоково, через COPY ... TO STDOUT.
+
+    Args:
+        table (str): Имя таблицы.
+        output_dir (Path): Каталог для архива.
+
+    Returns:
+        Path: Путь к файлу архива.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    path = output_dir / f'{table}.csv.gz'
+
+    try:
+        with connection.cursor() as cursor, gzip.open(path, 'wb') as file:
+            with cursor.cursor.copy(f'COPY {connection.ops.quote_name(table)} TO STDOUT WITH (FORMAT csv, HEADER)') as copy:
+                for data in copy:
+                    file.write(data)
+    except BaseException:
+        # Неполный архив не должен приниматься за выгрузку партиции
+        path.unlink(missing_ok=True)
+        raise
+
+    return path
+
+
+def archive_partition(partition: Partition, output_dir: Path | None = None) -> Path | None:
+    """
+    Выгружает партицию в архив (если задан output_dir) и отсоединяет её от таблицы транзакций.
+
+    Выгрузка и отсоединение выполняются в одной транзакции базы данных, а партиция на время выгрузки блокируется
+    от изменений (SHARE): при ошибке выгрузки партиция остаётся присоединённой, а архив содержит в точности
+    отсоединённые строки.
+
+    Args:
+        partition (Partition): Партиция.
+        output_dir (Path | None): Каталог для архива; None - отсоединить без выгрузки.
+
+    Returns:
+        Path | None: Путь к файлу архива или None, если партиция не выгружалась.
+    """
+    path = None
+    with transaction.atomic():
+        if output_dir is not None:
+            with connection.cursor() as cursor:
+                cursor.execute(f'LOCK TABLE {connection.ops.quote_name(partition.name)} IN SHARE MODE')
+            path = archive_table(partition.name, output_dir)
+        detach_partition(partition)
+
+    return path
+
+
+def drop_table(table: str) -> None:
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE {connection.ops.quote_name(table)}')
@@ -0,0 +1,94 @@
+from collections import namedtuple
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any, Callable, Iterable
+
+from django.db.models import QuerySet
+
+from main.models import Transaction
+from main.services.export import EXPORT_FIELDS, to_export_value
+from main.services.transaction_service import render_comment
+
+TRANSACTION_FIELDS = EXPORT_FIELDS
+# Поля, по которым курсорная пагинация определяет позицию записи, см. get_position
+POSITION_FIELDS = ('created_at', 'id')
+# Поля, значения которых формируются при чтении, и столбцы, необходимые для их формирования
+RENDERED_FIELDS: dict[str, tuple[Callable[[Any], str], tuple[str, ...]]] = {
+    'comment': (render_comment, ('operation', 'amount', 'balance_after', 'created_at')),
+}
+
+
+def get_columns(fields: Iterable[str]) -> tuple[str, ...]:
+    """
+    Возвращает столбцы, читаемые из базы данных для вывода полей fields.
+
+    Args:
+        fields (Iterable[str]): Выводимые поля транзакции.
+
+    Returns:
+        tuple[str, ...]: Поля fields, столбцы, необходимые для формирования полей RENDERED_FIELDS,
+            и поля позиции записи для пагинации без повторов.
+    """
+    columns = [*fields, *POSITION_FIELDS]
+    for field in fields:
+        if field in RENDERED_FIELDS:
+            columns.extend(RENDERED_FIELDS[field][1])
+    return tuple(dict.fromkeys(columns))
+
+
+@lru_cache(maxsize=128)
+def get_row_class(columns: tuple[str, ...]) -> type:
+    return namedtuple('Row', columns)
+
+
+def project_queryset(queryset: QuerySet, columns: tuple[str, ...]) -> QuerySet:
+    """
+    Ограничивает SELECT кверисета транзакций столбцами columns.
+
+    Записи читаются именованными кортежами без создания экземпляров Transaction; атрибуты created_at и id
+    доступны пагинации так же, как у экземпляров модели.
+
+    Args:
+        queryset (QuerySet): Кверисет экземпляров класса модели Transaction.
+        columns (tuple[str, ...]): Столбцы, см. get_columns.
+
+    Returns:
+        QuerySet: Кверисет именованных кортежей.
+    """
+    return queryset.values_list(*columns, named=True)
+
+
+def project_records(records: Iterable[Transaction], columns: tuple[str, ...]) -> list[tuple]:
+    """
+    Преобразует экземпляры Transaction (например, не перенесённые из outbox) в те же именованные кортежи,
+    что и project_queryset.
+
+    Args:
+        records (Iterable[Transaction]): Экземпляры класса модели Transaction.
+        columns (tuple[str, ...]): Столбцы, см. get_columns.
+
+    Returns:
+        list[tuple]: Именованные кортежи.
+    """
+    row_class = get_row_class(columns)
+    return [row_class._make(getattr(record, column) for column in columns) for record in records]
+
+
+def serialize_rows(rows: Iterable[Any], fields: tuple[str, ...]) -> list[dict[str, Any]]:
+    """
+    Сериализует записи транзакций в словари с полями fields.
+
+    Значения приводятся к тому же виду, что и в UserTransactionsListSerializer (см. to_export_value,
+    RENDERED_FIELDS), но без полей DRF: для каждой записи выполняется только чтение атрибутов
+    и приведение Decimal и datetime.
+
+    Args:
+        rows (Iterable[Any]): Именованные кортежи или экземпляры Transaction.
+        fields (tuple[str, ...]): Выводимые поля в порядке вывода.
+
+    Returns:
+        list[dict[str, Any]]: Сериализованные записи.
+    """
+    getters = [(field, RENDERED_FIELDS[field][0] if field in RENDERED_FIELDS else attrgetter(field))
+               for field in fields]
+    return [{field: to_export_value(getter(row)) for field, getter in getters} for row in rows]
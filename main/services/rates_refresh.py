@@ -0,0 +1,232 @@
+import asyncio
+import datetime
+import logging
+import random
+import time
+import uuid
+from decimal import Decimal, InvalidOperation
+from typing import Any
+
+import httpx
+from decouple import config
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, transaction
+from django.utils.timezone import localdate, now
+
+from main.models import ExchangeRateSnapshot
+from main.services.exchange_rates import RATES_FRESH_UNTIL_KEY, RATES_VERSION_KEY, store_exchange_rates
+from main.services.historical_rates import record_daily_rates
+
+logger = logging.getLogger(__name__)
+
+BASE_CURRENCY = 'RUB'
+REFRESH_LOCK_KEY = 'exchange_rates:refresh_lock'
+# Статусы ответа API, после которых запрос повторяется
+RETRY_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+class RatesResponseError(ValueError):
+    """
+    Ответ API курсов валют не содержит корректной таблицы курсов.
+    """
+
+
+def get_rates_url() -> str:
+    return settings.EXCHANGE_API_URL.format(key=config('EXCHANGE_API_KEY', default=''))
+
+
+def parse_rates(data: Any) -> dict[str, str]:
+    """
+    Проверяет ответ API и возвращает таблицу курсов.
+
+    Args:
+        data (Any): Разобранное тело ответа API.
+
+    Returns:
+        dict[str, str]: Курсы валют по отношению к базовой валюте в виде строк.
+
+    Raises:
+        RatesResponseError: В случае, если ответ не содержит непустой таблицы положительных курсов.
+    """
+    if not isinstance(data, dict) or data.get('result', 'success') != 'success':
+        raise RatesResponseError('API вернул ответ с ошибкой')
+
+    rates = data.get('conversion_rates')
+    if not isinstance(rates, dict) or not rates:
+        raise RatesResponseError('Ответ API не содержит курсов валют')
+
+    table = {}
+    for currency, rate in rates.items():
+        try:
+            value = Decimal(str(rate))
+        except InvalidOperation:
+            raise RatesResponseError(f'Некорректный курс валюты {currency}: {rate}')
+        if not value.is_finite() or value <= 0:
+            raise RatesResponseError(f'Некорректный курс валюты {currency}: {rate}')
+        table[str(currency).upper()] = str(value)
+    return table
+
+
+async def fetch_rates(url: str, transport: httpx.AsyncBaseTransport | None = None) -> dict[str, str]:
+    """
+    Запрашивает таблицу курсов у API с повторами при сетевых ошибках и временных ошибках сервера.
+
+    Делается до EXCHANGE_RATES_FETCH_ATTEMPTS попыток; задержка перед повтором - EXCHANGE_RATES_FETCH_BACKOFF секунд,
+    удваиваемая после каждой попытки, со случайным разбросом до 50%. Ответ 4xx (кроме 408, 425 и 429)
+    и некорректный ответ не повторяются.
+
+    Args:
+        url (str): Адрес API.
+        transport (httpx.AsyncBaseTransport | None): Транспорт httpx; в тестах - заглушка API.
+
+    Returns:
+        dict[str, str]: Курсы валют по отношению к базовой валюте.
+
+    Raises:
+        httpx.HTTPError: В случае, если API недоступен после всех попыток.
+        RatesResponseError: В случае некорректного ответа API.
+    """
+    attempts = max(1, settings.EXCHANGE_RATES_FETCH_ATTEMPTS)
+    async with httpx.AsyncClient(transport=transport, timeout=settings.EXCHANGE_RATES_FETCH_TIMEOUT) as client:
+        for attempt in range(attempts):
+            try:
+                response = await client.get(url)
+                response.raise_for_status()
+                return parse_rates(response.json())
+            except httpx.HTTPStatusError as exc:
+                if exc.response.status_code not in RETRY_STATUSES or attempt == attempts - 1:
+                    raise
+            except httpx.TransportError:
+                if attempt == attempts - 1:
+                    raise
+            except ValueError as exc:
+                # Тело ответа - не JSON
+                raise RatesResponseError(str(exc)) from exc
+
+            delay = settings.EXCHANGE_RATES_FETCH_BACKOFF * 2 ** attempt
+            logger.info('Повтор запроса курсов валют через %.2f с (попытка %s из %s)', delay, attempt + 2, attempts)
+            await asyncio.sleep(delay * random.uniform(1.0, 1.5))
+
+
+def publish_rates(table: dict[str, str], fetched_at: datetime.datetime) -> ExchangeRateSnapshot:
+    """
+    Сохраняет таблицу курсов в базе данных как последний успешный снимок и как курсы на дату получения
+    (см. record_daily_rates) и публикует её в Redis.
+
+    В Redis таблица хранится до stale_until, а время окончания актуальности - в отдельном ключе.
+
+    Args:
+        table (dict[str, str]): Курсы валют по отношению к базовой валюте.
+        fetched_at (datetime.datetime): Время получения курсов.
+
+    Returns:
+        ExchangeRateSnapshot: Сохранённый снимок.
+    """
+    with transaction.atomic():
+        snapshot, _ = ExchangeRateSnapshot.objects.update_or_create(
+            base=BASE_CURRENCY,
+            defaults={
+                'rates': table,
+                'fetched_at': fetched_at,
+                'fresh_until': fetched_at + datetime.timedelta(seconds=settings.EXCHANGE_RATES_FRESH_TTL),
+                'stale_until': fetched_at + datetime.timedelta(seconds=settings.EXCHANGE_RATES_STALE_TTL),
+            },
+        )
+        record_daily_rates(table, localdate(fetched_at))
+    store_snapshot(snapshot)
+    return snapshot
+
+
+def store_snapshot(snapshot: ExchangeRateSnapshot) -> bool:
+    """
+    Публикует снимок курсов в Redis на оставшееся до stale_until время.
+
+    Args:
+        snapshot (ExchangeRateSnapshot): Снимок курсов.
+
+    Returns:
+        bool: False, если срок допустимости снимка истёк и он не опубликован.
+    """
+    timeout = int((snapshot.stale_until - now()).total_seconds())
+    if timeout <= 0:
+        return False
+
+    store_exchange_rates({'conversion_rates': snapshot.rates}, timeout=timeout)
+    cache.set(RATES_FRESH_UNTIL_KEY, snapshot.fresh_until.timestamp(), timeout=timeout)
+    return True
+
+
+def restore_exchange_rates() -> bool:
+    """
+    Восстанавливает таблицу курсов в Redis из последнего снимка в базе данных, если её нет в кэше.
+
+    Вызывается при отсутствии таблицы в кэше (например, после перезапуска Redis) процессом, первым обратившимся
+    к курсам, и задачей обновления курсов.
+
+    Returns:
+        bool: True, если таблица есть в кэше или восстановлена из снимка.
+    """
+    if cache.get(RATES_VERSION_KEY) is not None:
+        return True
+
+    try:
+        snapshot = ExchangeRateSnapshot.objects.filter(base=BASE_CURRENCY).first()
+    except DatabaseError:
+        logger.warning('Не удалось прочитать снимок курсов валют', exc_info=True)
+        return False
+
+    if snapshot is None or not store_snapshot(snapshot):
+        return False
+    logger.info('Таблица курсов валют восстановлена из снимка от %s', snapshot.fetched_at.isoformat())
+    return True
+
+
+def get_lock_timeout() -> int:
+    # Максимальная длительность всех попыток запроса с задержками между ними и запасом на сохранение
+    attempts = max(1, settings.EXCHANGE_RATES_FETCH_ATTEMPTS)
+    backoff = settings.EXCHANGE_RATES_FETCH_BACKOFF * (2 ** (attempts - 1) - 1) * 1.5
+    return int(attempts * settings.EXCHANGE_RATES_FETCH_TIMEOUT + backoff) + 60
+
+
+def needs_refresh() -> bool:
+    fresh_until = cache.get(RATES_FRESH_UNTIL_KEY)
+    return fresh_until is None or fresh_until - time.time() <= settings.EXCHANGE_RATES_REFRESH_AHEAD
+
+
+def refresh_exchange_rates(force: bool = False, transport: httpx.AsyncBaseTransport | None = None) -> bool:
+    """
+    Обновляет курсы валют, если до окончания их актуальности осталось не более EXCHANGE_RATES_REFRESH_AHEAD секунд.
+
+    Запрос к API выполняет только один процесс - захвативший блокировку в Redis; остальные пропускают обновление.
+    При недоступности API или некорректном ответе курсы не меняются и отдаются до stale_until, а следующая
+    попытка будет сделана при следующем запуске задачи.
+
+    Args:
+        force (bool): Обновить курсы независимо от срока их актуальности.
+        transport (httpx.AsyncBaseTransport | None): Транспорт httpx; в тестах - заглушка API.
+
+    Returns:
+        bool: True, если курсы обновлены.
+    """
+    restore_exchange_rates()
+    if not force and not needs_refresh():
+        return False
+
+    token = uuid.uuid4().hex
+    if not cache.add(REFRESH_LOCK_KEY, token, timeout=get_lock_timeout()):
+        return False
+
+    try:
+        fetched_at = now()
+        try:
+            table = asyncio.run(fetch_rates(get_rates_url(), transport))
+        except (httpx.HTTPError, RatesResponseError):
+            logger.warning('Не удалось обновить курсы валют', exc_info=True)
+            return False
+
+        publish_rates(table, fetched_at)
+        return True
+    finally:
+        if cache.get(REFRESH_LOCK_KEY) == token:
+            cache.delete(REFRESH_LOCK_KEY)
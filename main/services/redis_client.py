@@ -0,0 +1,90 @@
+import asyncio
+import weakref
+from typing import Any
+
+import redis.asyncio
+from django.conf import settings
+from django.core.cache import cache
+from django_redis.exceptions import ConnectionInterrupted
+from redis import Redis
+from redis.exceptions import RedisError
+
+# Ошибки недоступности Redis: клиента redis-py и обёртки django-redis над ним
+CACHE_ERRORS = (RedisError, ConnectionInterrupted)
+
+
+def get_redis() -> Redis | None:
+    """
+    Возвращает клиент Redis, используемый кэшем по умолчанию.
+
+    Нужен для атомарных операций, недоступных через API кэша Django (Lua-скрипты, сортированные множества).
+
+    Returns:
+        Redis | None: Клиент Redis или None, если кэш по умолчанию работает не через django-redis.
+    """
+    if not settings.CACHES['default']['BACKEND'].startswith('django_redis.'):
+        return None
+
+    from django_redis import get_redis_connection
+    return get_redis_connection('default')
+
+
+# Клиенты по циклам событий; клиенты собранных сборщиком мусора и закрытых циклов удаляются
+_async_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, redis.asyncio.Redis] = weakref.WeakKeyDictionary()
+
+
+def prune_async_clients() -> None:
+    """
+    Удаляет клиенты закрытых циклов событий вместе с их пулами соединений.
+
+    Закрыть соединения через aclose в закрытом цикле нельзя, поэтому их сокеты закрываются при удалении клиента.
+
+    Returns:
+        None
+    """
+    for loop in [loop for loop in list(_async_clients) if loop.is_closed()]:
+        _async_clients.pop(loop, None)
+
+
+def get_async_redis() -> redis.asyncio.Redis | None:
+    """
+    Возвращает асинхронный клиент Redis для текущего цикла событий.
+
+    Клиент создаётся по адресу кэша по умолчанию, один на цикл событий, так как соединения
+    асинхронного клиента привязаны к циклу, в котором они открыты.
+
+    Returns:
+        redis.asyncio.Redis | None: Асинхронный клиент Redis или None, если кэш по умолчанию работает не через django-redis.
+    """
+    if not settings.CACHES['default']['BACKEND'].startswith('django_redis.'):
+        return None
+
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        prune_async_clients()
+        location = settings.CACHES['default']['LOCATION']
+        client = redis.asyncio.from_url(location[0] if isinstance(location, (list, tuple)) else location)
+        _async_clients[loop] = client
+    return client
+
+
+async def acache_get(key: str) -> Any:
+    """
+    Асинхронно читает значение, записанное через API кэша Django.
+
+    Для django-redis запрос выполняется асинхронным клиентом Redis с тем же форматом ключа и сериализацией,
+    что и у синхронного клиента; для остальных бэкендов - через cache.aget.
+
+    Args:
+        key (str): Ключ кэша.
+
+    Returns:
+        Any: Значение или None, если ключ отсутствует.
+    """
+    client = get_async_redis()
+    if client is None:
+        return await cache.aget(key)
+
+    value = await client.get(cache.client.make_key(key))
+    return None if value is None else cache.client.decode(value)
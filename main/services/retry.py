@@ -0,0 +1,68 @@
+import random
+import time
+from functools import wraps
+from typing import Any, Callable
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+
+from main.exceptions import ConcurrencyConflict
+from main.services.stats import Counters
+
+# SQLSTATE-коды PostgreSQL: serialization_failure и deadlock_detected
+RETRYABLE_SQLSTATES = frozenset({'40001', '40P01'})
+SQLSTATE_COUNTERS = {'40001': 'serialization_failures', '40P01': 'deadlocks'}
+
+# Счётчики конфликтов: serialization_failures, deadlocks, retries и conflicts (исчерпаны все попытки)
+retry_stats = Counters()
+
+
+def is_retryable_error(exc: DatabaseError) -> bool:
+    """
+    Проверяет, вызвана ли ошибка базы данных конфликтом сериализации или взаимной блокировкой.
+
+    Args:
+        exc (DatabaseError): Ошибка базы данных.
+
+    Returns:
+        bool: True, если транзакцию можно безопасно повторить.
+    """
+    return getattr(exc.__cause__, 'sqlstate', None) in RETRYABLE_SQLSTATES
+
+
+def retry_on_conflict(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Декоратор, повторяющий транзакцию при конфликте сериализации или взаимной блокировке.
+
+    Количество попыток и базовая задержка между ними задаются настройками TRANSACTION_RETRY_ATTEMPTS и
+    TRANSACTION_RETRY_BACKOFF. Задержка растёт экспоненциально и содержит случайную составляющую.
+    Внутри внешнего transaction.atomic() повтор невозможен, поэтому ошибка пробрасывается сразу.
+
+    Args:
+        func (Callable[..., Any]): Функция, открывающая собственную транзакцию базы данных.
+
+    Returns:
+        Callable[..., Any]: Обёрнутая функция.
+
+    Raises:
+        ConcurrencyConflict: Если все попытки исполнить транзакцию завершились конфликтом.
+    """
+    @wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        attempts = settings.TRANSACTION_RETRY_ATTEMPTS
+        for attempt in range(1, attempts + 1):
+            try:
+                return func(*args, **kwargs)
+            except DatabaseError as exc:
+                if not is_retryable_error(exc):
+                    raise
+                retry_stats.add(SQLSTATE_COUNTERS[exc.__cause__.sqlstate])
+                if connection.in_atomic_block:
+                    raise
+                if attempt == attempts:
+                    retry_stats.add('conflicts')
+                    raise ConcurrencyConflict() from exc
+                retry_stats.add('retries')
+                time.sleep(settings.TRANSACTION_RETRY_BACKOFF * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+
+    return wrapper
@@ -0,0 +1,262 @@
+import random
+import threading
+import time
+from decimal import Decimal
+from typing import Iterable
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Sum
+from rest_framework.exceptions import NotFound, ValidationError
+
+from main.models import Balance, BalanceShard
+
+
+class ShardedAccounts:
+    """
+    Локальная (в памяти процесса) копия списка шардированных балансов.
+
+    Список перечитывается из базы данных не чаще раза в BALANCE_SHARDS_REFRESH_INTERVAL секунд. Устаревший список
+    не нарушает корректности: зачисление на баланс, не отмеченный как шардированный, попадает в строку Balance,
+    а зачисление в удалённый слот - см. deposit_shard.
+
+    Attributes:
+        shard_counts (dict[int, int]): Количество слотов шардированных балансов с ключами user_id.
+        loaded_at (float | None): Время последнего чтения списка по монотонным часам.
+    """
+
+    def __init__(self) -> None:
+        self.shard_counts = {}
+        self.loaded_at = None
+        self.lock = threading.Lock()
+
+    def get_shard_count(self, user_id: int | None) -> int:
+        """
+        Возвращает количество слотов баланса пользователя.
+
+        Args:
+            user_id (int | None): ID пользователя.
+
+        Returns:
+            int: Количество слотов или 0, если баланс не шардирован.
+        """
+        if user_id is None:
+            return 0
+
+        if not self.is_fresh():
+            with self.lock:
+                if not self.is_fresh():
+                    self.refresh()
+
+        return self.shard_counts.get(user_id, 0)
+
+    def is_fresh(self) -> bool:
+        return (self.loaded_at is not None
+                and time.monotonic() - self.loaded_at < settings.BALANCE_SHARDS_REFRESH_INTERVAL)
+
+    def refresh(self) -> None:
+        self.shard_counts = dict(Balance.objects.filter(shard_count__gt=0).values_list('user_id', 'shard_count'))
+        self.loaded_at = time.monotonic()
+
+    def clear(self) -> None:
+        self.shard_counts = {}
+        self.loaded_at = None
+
+
+sharded_accounts = ShardedAccounts()
+
+
+def deposit_shard(user_id: int, shard_count: int, amount: Decimal) -> bool:
+    """
+    Зачисляет средства в случайный слот шардированного баланса пользователя.
+
+    Строка Balance при этом не блокируется, поэтому конкурентные зачисления на один баланс
+    блокируют разные строки BalanceShard.
+
+    Args:
+        user_id (int): ID пользователя, на чей баланс зачисляются средства.
+        shard_count (int): Количество слотов баланса.
+        amount (Decimal): Сумма зачисления.
+
+    Returns:
+        bool: False, если слот не найден (баланс перестал быть шардированным) и зачисление не выполнено.
+    """
+    slot = random.randrange(shard_count)
+    updated = BalanceShard.objects.filter(user_id=user_id, slot=slot).update(
+        amount=F('amount') + amount, version=F('version') + 1
+    )
+    return updated == 1
+
+
+def withdraw_sharded(user_id: int, amount: Decimal) -> None:
+    """
+    Списывает средства с шардированного баланса пользователя.
+
+    Средства списываются с основной строки Balance, если на ней их достаточно, иначе - со случайного слота
+    с достаточной суммой, не заблокированного другой транзакцией (SELECT ... FOR UPDATE SKIP LOCKED).
+    Если ни в одном месте средств недостаточно, баланс консолидируется (см. consolidate_shards).
+
+    Args:
+        user_id (int): ID пользователя, с чьего баланса списываются средства.
+        amount (Decimal): Сумма списания.
+
+    Returns:
+        None
+
+    Raises:
+        ValidationError: Если средств для списания недостаточно.
+        NotFound: Если баланс пользователя не найден.
+    """
+    updated = Balance.objects.filter(user_id=user_id, amount__gte=amount).update(
+        amount=F('amount') - amount, version=F('version') + 1
+    )
+    if updated:
+        return
+
+    shard = (BalanceShard.objects.select_for_update(skip_locked=True)
+             .filter(user_id=user_id, amount__gte=amount).order_by('?').first())
+    if shard is not None:
+        BalanceShard.objects.filter(pk=shard.pk).update(amount=F('amount') - amount, version=F('version') + 1)
+        return
+
+    try:
+        balance = Balance.objects.select_for_update().get(user_id=user_id)
+    except Balance.DoesNotExist:
+        raise NotFound({'error': 'Баланс пользователя не найден'})
+
+    consolidate_shards(balance)
+    if balance.amount < amount:
+        raise ValidationError({'error': 'Недостаточно средств'})
+
+    balance.amount -= amount
+    balance.version += 1
+    balance.save(update_fields=['amount', 'version'])
+
+
+def consolidate_shards(balance: Balance) -> None:
+    """
+    Переносит средства всех слотов шардированного баланса в заблокированную строку Balance.
+
+    Слоты блокируются в порядке возрастания slot; их суммы обнуляются, а версии сохраняются, чтобы суммарная версия
+    баланса (см. load_balances) не уменьшилась. Изменённый объект balance сохраняет вызывающий код.
+
+    Args:
+        balance (Balance): Заблокированный SELECT ... FOR UPDATE баланс пользователя.
+
+    Returns:
+        None
+    """
+    if not balance.shard_count:
+        return
+
+    shards = list(BalanceShard.objects.select_for_update().filter(user_id=balance.user_id).order_by('slot'))
+    balance.amount += sum((shard.amount for shard in shards), Decimal('0.00'))
+    BalanceShard.objects.filter(pk__in=[shard.pk for shard in shards], amount__gt=0).update(amount=Decimal('0.00'))
+
+
+def load_balances(user_ids: Iterable[int]) -> dict[int, Balance]:
+    """
+    Возвращает балансы пользователей с учётом слотов шардированных балансов.
+
+    Для шардированного баланса amount равен сумме Balance.amount и amount его слотов, а version - сумме их версий.
+    Каждое изменение баланса увеличивает версию одной из строк, поэтому суммарная версия монотонно растёт
+    и пригодна для кэша балансов. Слоты читаются одним запросом и только для шардированных балансов.
+
+    Args:
+        user_ids (Iterable[int]): ID пользователей.
+
+    Returns:
+        dict[int, Balance]: Несохраняемые объекты Balance с ключами user_id; отсутствующие балансы не включаются.
+    """
+    balances = {balance.user_id: balance for balance in Balance.objects.filter(user_id__in=set(user_ids))}
+    sharded_ids = [user_id for user_id, balance in balances.items() if balance.shard_count]
+    if sharded_ids:
+        totals = (BalanceShard.objects.filter(user_id__in=sharded_ids).values('user_id')
+                  .annotate(shards_amount=Sum('amount'), shards_version=Sum('version')))
+        for total in totals:
+            balance = balances[total['user_id']]
+            balance.amount += total['shards_amount']
+            balance.version += total['shards_version']
+
+    return balances
+
+
+async def aload_balance(user_id: int) -> Balance:
+    """
+    Асинхронный вариант load_balances для баланса одного пользователя.
+
+    Args:
+        user_id (int): ID пользователя.
+
+    Returns:
+        Balance: Несохраняемый объект Balance.
+
+    Raises:
+        Balance.DoesNotExist: Если баланс пользователя не найден.
+    """
+    balance = await Balance.objects.aget(user_id=user_id)
+    if balance.shard_count:
+        total = await BalanceShard.objects.filter(user_id=user_id).aaggregate(shards_amount=Sum('amount'),
+                                                                              shards_version=Sum('version'))
+        balance.amount += total['shards_amount'] or 0
+        balance.version += total['shards_version'] or 0
+
+    return balance
+
+
+@transaction.atomic
+def promote(user_id: int, shard_count: int) -> Balance:
+    """
+    Делает баланс пользователя шардированным с shard_count слотами.
+
+    Средства остаются в строке Balance; новые зачисления распределяются по слотам. Если баланс уже шардирован
+    с другим количеством слотов, он предварительно консолидируется.
+
+    Args:
+        user_id (int): ID пользователя.
+        shard_count (int): Количество слотов.
+
+    Returns:
+        Balance: Обновлённый объект Balance.
+
+    Raises:
+        NotFound: Если баланс пользователя не найден.
+    """
+    balance = demote(user_id)
+    BalanceShard.objects.bulk_create([BalanceShard(user_id=user_id, slot=slot) for slot in range(shard_count)])
+    balance.shard_count = shard_count
+    balance.version += 1
+    balance.save(update_fields=['shard_count', 'version'])
+    return balance
+
+
+@transaction.atomic
+def demote(user_id: int) -> Balance:
+    """
+    Консолидирует шардированный баланс пользователя в строку Balance и удаляет его слоты.
+
+    Версия строки Balance увеличивается на сумму версий слотов, чтобы суммарная версия баланса не уменьшилась.
+
+    Args:
+        user_id (int): ID пользователя.
+
+    Returns:
+        Balance: Обновлённый объект Balance.
+
+    Raises:
+        NotFound: Если баланс пользователя не найден.
+    """
+    try:
+        balance = Balance.objects.select_for_update().get(user_id=user_id)
+    except Balance.DoesNotExist:
+        raise NotFound({'error': 'Баланс пользователя не найден'})
+
+    shards = list(BalanceShard.objects.select_for_update().filter(user_id=user_id).order_by('slot'))
+    if shards:
+        balance.amount += sum(shard.amount for shard in shards)
+        balance.version += sum(shard.version for shard in shards) + 1
+        BalanceShard.objects.filter(user_id=user_id).delete()
+
+    balance.shard_count = 0
+    balance.save(update_fields=['amount', 'version', 'shard_count'])
+    return balance
@@ -0,0 +1,81 @@
+import bisect
+import threading
+from collections import defaultdict
+
+
+class Counters:
+    """
+    Потокобезопасный набор именованных счётчиков в пределах процесса.
+
+    Используется для учёта событий сервисного слоя (повторы транзакций, ожидание блокировок), которые
+    затем считывают команды нагрузочного тестирования и эндпоинты мониторинга.
+    """
+
+    def __init__(self) -> None:
+        self.values = defaultdict(float)
+        self.lock = threading.Lock()
+
+    def add(self, name: str, value: float = 1) -> None:
+        with self.lock:
+            self.values[name] += value
+
+    def snapshot(self) -> dict[str, float]:
+        with self.lock:
+            return dict(self.values)
+
+    @staticmethod
+    def diff(after: dict[str, float], before: dict[str, float]) -> dict[str, float]:
+        """
+        Возвращает приращения счётчиков между двумя снимками.
+
+        Args:
+            after (dict[str, float]): Более поздний снимок.
+            before (dict[str, float]): Более ранний снимок.
+
+        Returns:
+            dict[str, float]: Приращения счётчиков.
+        """
+        return {name: value - before.get(name, 0) for name, value in after.items()}
+
+
+# Границы корзин гистограмм длительности по умолчанию, в секундах
+DURATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class Histogram:
+    """
+    Потокобезопасная гистограмма наблюдений с метками в пределах процесса (в терминах Prometheus).
+
+    Для каждого набора значений меток хранит количество наблюдений в каждой корзине (не накопительно), их сумму
+    и количество. Накопительные значения корзин вычисляются при выводе, см. main.services.metrics.
+
+    Attributes:
+        buckets (tuple[float, ...]): Верхние границы корзин в порядке возрастания.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DURATION_BUCKETS) -> None:
+        self.buckets = buckets
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, labels: tuple[str, ...], value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(labels)
+            if series is None:
+                # Последняя корзина - +Inf
+                series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self) -> dict[tuple[str, ...], tuple[list[int], float, int]]:
+        """
+        Возвращает копию наблюдений.
+
+        Returns:
+            dict[tuple[str, ...], tuple[list[int], float, int]]: Для каждого набора значений меток - количества
+                наблюдений по корзинам (последняя - +Inf), сумма и количество наблюдений.
+        """
+        with self.lock:
+            return {labels: (list(counts), total, count) for labels, (counts, total, count) in self.series.items()}
@@ -0,0 +1,168 @@
+import datetime
+from collections import defaultdict
+from decimal import Decimal
+from typing import Any, Iterable
+
+from django.db import connection
+from django.db.models import Case, Count, DateField, DecimalField, F, Q, Sum, Value, When
+from django.db.models.functions import TruncDate, TruncMonth
+from django.utils.timezone import localdate
+
+from main.enums import TransactionType
+from main.models import Transaction, UserPeriodSummary
+
+TOTALS = ('deposited', 'withdrawn', 'transferred_in', 'transferred_out', 'count')
+SummaryKey = tuple[int, str, datetime.date, int]
+
+
+def period_starts(day: datetime.date) -> dict[str, datetime.date]:
+    return {UserPeriodSummary.DAY: day, UserPeriodSummary.MONTH: day.replace(day=1)}
+
+
+def transaction_deltas(data: dict[str, Any]) -> list[tuple[int, str]]:
+    """
+    Возвращает пары (ID пользователя, итог), которые увеличивает транзакция на сумму операции.
+
+    Args:
+        data (dict[str, Any]): Итоговые данные о транзакции.
+
+    Returns:
+        list[tuple[int, str]]: Пары из ID пользователя и названия итога ('deposited', 'withdrawn',
+            'transferred_in' или 'transferred_out').
+    """
+    operation = data['operation']
+    if operation == TransactionType.DEPOSIT.value:
+        return [(data['to_user_id'], 'deposited')]
+    if operation == TransactionType.WITHDRAWAL.value:
+        return [(data['from_user_id'], 'withdrawn')]
+    return [(data['from_user_id'], 'transferred_out'), (data['to_user_id'], 'transferred_in')]
+
+
+def record_summaries(entries: Iterable[tuple[dict[str, Any], int]], created_at: datetime.datetime) -> None:
+    """
+    Прибавляет транзакции к дневным и месячным итогам их участников одним запросом INSERT ... ON CONFLICT DO UPDATE.
+
+    Приращения транзакций предварительно суммируются по строкам итогов, а строки вставляются в порядке ключа,
+    поэтому конкурентные вызовы блокируют общие строки в одном порядке и не создают взаимных блокировок.
+    Запрос не читает текущие значения итогов: конкурентные обновления одной строки не теряются.
+
+    Args:
+        entries (Iterable[tuple[dict[str, Any], int]]): Пары из итоговых данных о транзакции и номера строки (slot)
+            итогов, которую она обновляет.
+        created_at (datetime.datetime): Время исполнения транзакций.
+
+    Returns:
+        None
+    """
+    deltas: dict[SummaryKey, dict[str, Decimal]] = defaultdict(lambda: dict.fromkeys(TOTALS, Decimal('0.00')))
+    starts = period_starts(localdate(created_at))
+
+    for data, slot in entries:
+        for user_id, total in transaction_deltas(data):
+            for period, period_start in starts.items():
+                delta = deltas[(user_id, period, period_start, slot)]
+                delta[total] += data['amount']
+                delta['count'] += 1
+
+    if not deltas:
+        return
+
+    table = connection.ops.quote_name(UserPeriodSummary._meta.db_table)
+    columns = ('user_id', 'period', 'period_start', 'slot', *TOTALS)
+    rows, params = [], []
+    for key in sorted(deltas):
+        user_id, period, period_start, slot = key
+        rows.append(f"({', '.join(['%s'] * len(columns))})")
+        params.extend([user_id, period, connection.ops.adapt_datefield_value(period_start), slot])
+        params.extend(int(value) if total == 'count' else value for total, value in deltas[key].items())
+
+    updates = ', '.join(f'{total} = {table}.{total} + EXCLUDED.{total}' for total in TOTALS)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES {', '.join(rows)} "
+            f'ON CONFLICT (user_id, period, period_start, slot) DO UPDATE SET {updates}',
+            params
+        )
+
+
+def get_summaries(user_id: int,
+                  period: str,
+                  date_from: datetime.date | None = None,
+                  date_to: datetime.date | None = None
+                  ) -> list[dict[str, Any]]:
+    """
+    Возвращает итоги пользователя по периодам, суммируя строки итогов по slot.
+
+    Args:
+        user_id (int): ID пользователя.
+        period (str): 'day' или 'month'.
+        date_from (datetime.date | None): Начало первого периода (включительно).
+        date_to (datetime.date | None): Начало последнего периода (включительно).
+
+    Returns:
+        list[dict[str, Any]]: Итоги в порядке возрастания period_start.
+    """
+    queryset = UserPeriodSummary.objects.filter(user_id=user_id, period=period)
+    if date_from is not None:
+        queryset = queryset.filter(period_start__gte=date_from)
+    if date_to is not None:
+        queryset = queryset.filter(period_start__lte=date_to)
+
+    return list(queryset.values('period_start').annotate(**{total: Sum(total) for total in TOTALS})
+                .order_by('period_start'))
+
+
+def rebuild_summaries(before: datetime.date, user_ids: Iterable[int] | None = None) -> int:
+    """
+    Пересчитывает итоги периодов, закончившихся до даты before, по журналу транзакций.
+
+    Предназначена для однократного заполнения итогов за время до начала их инкрементального обновления:
+    существующие строки итогов этих периодов заменяются. Читает журнал транзакций целиком.
+
+    Args:
+        before (datetime.date): Дата, до которой пересчитываются итоги; месячные итоги пересчитываются
+            для месяцев, закончившихся до неё.
+        user_ids (Iterable[int] | None): ID пользователей; по умолчанию - все.
+
+    Returns:
+        int: Количество созданных строк итогов.
+    """
+    ledger = Transaction.objects.all()
+    summaries = UserPeriodSummary.objects.all()
+    if user_ids is not None:
+        ledger = ledger.filter(user_id__in=list(user_ids))
+        summaries = summaries.filter(user_id__in=list(user_ids))
+
+    amount = DecimalField(max_digits=18, decimal_places=2)
+    transfer = Q(operation=TransactionType.TRANSFER.value)
+    conditions = {
+        'deposited': Q(operation=TransactionType.DEPOSIT.value),
+        'withdrawn': Q(operation=TransactionType.WITHDRAWAL.value),
+        'transferred_in': transfer & Q(to_user_id=F('user_id')),
+        'transferred_out': transfer & Q(from_user_id=F('user_id')),
+    }
+    sums = {
+        total: Sum(Case(When(condition, then='amount'), default=Value(Decimal('0.00')), output_field=amount))
+        for total, condition in conditions.items()
+    }
+
+    created = 0
+    for period, trunc, cutoff in ((UserPeriodSummary.DAY, TruncDate, before),
+                                  (UserPeriodSummary.MONTH, TruncMonth, before.replace(day=1))):
+        totals = (
+            ledger.filter(created_at__date__lt=cutoff)
+            .annotate(period_start=trunc('created_at', output_field=DateField()))
+            .values('user_id', 'period_start')
+            .annotate(**sums, count=Count('id'))
+            .order_by()
+        )
+        rows = [
+            UserPeriodSummary(user_id=row['user_id'], period=period, period_start=row['period_start'],
+                              **{total: row[total] for total in TOTALS})
+            for row in totals.iterator()
+        ]
+        summaries.filter(period=period, period_start__lt=cutoff).delete()
+        UserPeriodSummary.objects.bulk_create(rows, batch_size=1000)
+        created += len(rows)
+
+    return created
@@ -1,22 +1,48 @@
 import datetime
+import random
+import time
+from contextlib import nullcontext
 from decimal import Decimal
-from typing import Any
+from typing import Any, Iterable
 
-from django.db import transaction
-from django.shortcuts import get_object_or_404
+from django.conf import settings
+from django.db import connection, transaction
 from django.utils.timezone import now
-from rest_framework.exceptions import ValidationError
+from rest_framework.exceptions import ValidationError, NotFound, APIException
 
 from main.enums import TransactionType
-from main.models import Balance, Transaction
+from main.models import Balance, LedgerOutbox, Transaction
+from main.services.balance_cache import cache_balances_on_commit
+from main.services.contention import contention_profiler
+from main.services.metrics import phase_seconds, timed
+from main.services.retry import retry_on_conflict
+from main.services.sharding import (consolidate_shards, deposit_shard, load_balances, sharded_accounts,
+                                    withdraw_sharded)
+from main.services.stats import Counters
+from main.services.summaries import record_summaries
 
+CENTS = Decimal('0.01')
 
+# Счётчики блокировок балансов: lock_acquisitions, locked_rows и lock_wait_seconds
+lock_stats = Counters()
+
+
+@retry_on_conflict
 def process_transaction(data: dict[str, Any]) -> dict[str, Any]:
     """
     Обрабатывает транзакцию пользователей.
 
     Функция-оркестратор: блокирует нужные балансы, проверяет корректность данных,
-    выполняет списание или зачисление средств и возвращает итоговые данные о транзакции.
+    выполняет списание или зачисление средств, записывает объекты Transaction (или запись LedgerOutbox,
+    см. record_transactions) и обновляет итоги периодов (см. record_summaries) в той же транзакции базы данных
+    и возвращает итоговые данные о транзакции.
+
+    При TRANSACTION_ENGINE = 'conditional' зачисления и списания исполняются одним условным запросом
+    без предварительной блокировки (см. execute_conditional_update), переводы - всегда через блокировку балансов.
+    Зачисления и списания шардированных балансов исполняются по слотам (см. execute_sharded_update),
+    а переводы консолидируют затрагиваемые шардированные балансы.
+    После фиксации транзакции новые балансы записываются в кэш балансов.
+    Длительность фаз исполнения учитывается в гистограмме phase_seconds (см. main.services.metrics).
 
     Args:
         data (dict[str, Any]): Входные данные о транзакции.
@@ -29,44 +55,270 @@ def process_transaction(data: dict[str, Any]) -> dict[str, Any]:
     amount = data.get('amount')
     operation = data.get('operation')
 
+    shard_count = 0
+    if operation != TransactionType.TRANSFER.value:
+        shard_count = sharded_accounts.get_shard_count(
+            to_user_id if operation == TransactionType.DEPOSIT.value else from_user_id
+        )
+
     with transaction.atomic():
-        balances = get_balances(from_user_id, to_user_id, operation)
-        balance_changes = execute_transaction(balances, amount, operation)
-        save_balances(balances)
+        if shard_count:
+            with timed('update', operation):
+                balances, balance_changes = execute_sharded_update(from_user_id, to_user_id, amount, operation,
+                                                                   shard_count)
+        elif settings.TRANSACTION_ENGINE == 'conditional' and operation != TransactionType.TRANSFER.value:
+            with timed('update', operation):
+                balances, balance_changes = execute_conditional_update(from_user_id, to_user_id, amount, operation)
+        else:
+            with timed('lock', operation):
+                balances = get_balances(from_user_id, to_user_id, operation)
+                for balance in balances.values():
+                    consolidate_shards(balance)
+            with timed('execute', operation):
+                balance_changes = execute_transaction(balances, amount, operation)
+            with timed('save', operation):
+                save_balances(balances)
+
+        completed_at = now()
+        transaction_data = {
+            'from_user_id': from_user_id,
+            'to_user_id': to_user_id,
+            'amount': amount,
+            'operation': operation,
+            'completed_at': completed_at.strftime('%d.%m.%Y %H:%M:%S'),
+            **balance_changes
+        }
+        with timed('record', operation):
+            record_transaction(transaction_data, data.get('comment'), completed_at)
+            # Итоги шардированного баланса распределяются по слотам, как и сам баланс
+            record_summaries([(transaction_data, random.randrange(shard_count) if shard_count else 0)],
+                             completed_at)
+        cache_balances_on_commit(balances.values())
+        commit_started = time.perf_counter()
+
+    phase_seconds.observe(('commit', operation), time.perf_counter() - commit_started)
+    return transaction_data
+
+
+@retry_on_conflict
+def process_batch(operations: list[dict[str, Any]],
+                  atomic: bool = True,
+                  copy_ledger: bool = False
+                  ) -> list[dict[str, Any]]:
+    """
+    Обрабатывает пакет транзакций в рамках одной транзакции базы данных.
 
-        completed_at = now().strftime('%d.%m.%Y %H:%M:%S')
+    Блокирует все затрагиваемые пакетом балансы одним запросом и консолидирует шардированные из них,
+    последовательно применяет к ним операции через execute_transaction, после чего сохраняет изменённые балансы
+    и записи Transaction (или LedgerOutbox) массовыми запросами и обновляет итоги периодов.
+    После фиксации транзакции новые балансы записываются в кэш балансов.
 
-    return {
-        'from_user_id': from_user_id,
-        'to_user_id': to_user_id,
-        'amount': amount,
-        'operation': operation,
-        'completed_at': completed_at,
-        **balance_changes
-    }
+    Args:
+        operations (list[dict[str, Any]]): Валидированные входные данные транзакций в порядке их исполнения.
+        atomic (bool): Режим "всё или ничего". Если True, ошибка любой операции отменяет весь пакет;
+            если False, ошибочные операции пропускаются, а остальные исполняются. В этом режиме балансы получателей
+            создаются только для успешно исполненных операций.
+        copy_ledger (bool): Сохранить записи журнала запросом COPY (см. copy_objects).
 
+    Returns:
+        list[dict[str, Any]]: Результаты операций в порядке их передачи. Каждый результат содержит ключ 'status'
+            ('ok', 'error', 'rolled_back' или 'skipped'), итоговые данные о транзакции или ключ 'errors'.
+    """
+    from_user_ids = {op['from_user_id'] for op in operations
+                     if op['operation'] in (TransactionType.TRANSFER.value, TransactionType.WITHDRAWAL.value)}
+    to_user_ids = {op['to_user_id'] for op in operations
+                   if op['operation'] in (TransactionType.TRANSFER.value, TransactionType.DEPOSIT.value)}
 
-def get_balances(from_user_id: int, to_user_id: int, operation: str) -> dict[str, Balance]:
+    results = []
+    with transaction.atomic():
+        with timed('lock', 'batch'):
+            # В неатомарном режиме недостающие балансы создаются в точке сохранения операции, см. ниже
+            locked_balances = lock_balances(from_user_ids | to_user_ids, create_missing=to_user_ids if atomic else ())
+        created_at = now()
+        completed_at = created_at.strftime('%d.%m.%Y %H:%M:%S')
+        changed_balances = {}
+        entries = []
+
+        for balance in locked_balances.values():
+            if balance.shard_count:
+                consolidate_shards(balance)
+                changed_balances[balance.user_id] = balance
+
+        with timed('execute', 'batch'):
+            for index, op in enumerate(operations):
+                missing = (op['operation'] in (TransactionType.TRANSFER.value, TransactionType.DEPOSIT.value)
+                           and op['to_user_id'] not in locked_balances)
+                try:
+                    # Баланс получателя создаётся в точке сохранения: при ошибке операции строка не остаётся в базе
+                    with transaction.atomic() if missing else nullcontext():
+                        if missing:
+                            created = lock_balances([op['to_user_id']], create_missing=[op['to_user_id']])
+                            consolidate_shards(created[op['to_user_id']])
+                            locked_balances.update(created)
+                        balances = pick_balances(locked_balances, op.get('from_user_id'), op.get('to_user_id'),
+                                                 op['operation'])
+                        balance_changes = execute_transaction(balances, op['amount'], op['operation'])
+                except APIException as exc:
+                    if missing:
+                        locked_balances.pop(op['to_user_id'], None)
+                    if atomic:
+                        transaction.set_rollback(True)
+                        return [
+                            *({'status': 'rolled_back'} for _ in results),
+                            {'status': 'error', 'errors': exc.detail},
+                            *({'status': 'skipped'} for _ in operations[index + 1:]),
+                        ]
+                    results.append({'status': 'error', 'errors': exc.detail})
+                    continue
+
+                changed_balances.update({balance.user_id: balance for balance in balances.values()})
+                transaction_data = {
+                    'from_user_id': op.get('from_user_id'),
+                    'to_user_id': op.get('to_user_id'),
+                    'amount': op['amount'],
+                    'operation': op['operation'],
+                    'completed_at': completed_at,
+                    **balance_changes
+                }
+                entries.append((transaction_data, op.get('comment')))
+                results.append({'status': 'ok', **transaction_data})
+
+        with timed('save', 'batch'):
+            for balance in changed_balances.values():
+                balance.version += 1
+            Balance.objects.bulk_update(changed_balances.values(), ['amount', 'version'])
+        with timed('record', 'batch'):
+            record_transactions(entries, created_at, copy=copy_ledger)
+            record_summaries(((transaction_data, 0) for transaction_data, _ in entries), created_at)
+        cache_balances_on_commit(changed_balances.values())
+        commit_started = time.perf_counter()
+
+    phase_seconds.observe(('commit', 'batch'), time.perf_counter() - commit_started)
+    return results
+
+
+def lock_balances(user_ids: Iterable[int], create_missing: Iterable[int] = ()) -> dict[int, Balance]:
     """
-    Возвращает заблокированные балансы пользователей.
+    Блокирует балансы пользователей одним запросом SELECT ... FOR UPDATE.
+
+    Строки блокируются в порядке возрастания user_id. Отсутствующие балансы пользователей из create_missing
+    предварительно создаются одним запросом INSERT ... ON CONFLICT DO NOTHING.
+    Время исполнения запроса блокировки учитывается в lock_stats. При LOCK_PROFILING = True строки блокируются
+    по одной, см. lock_balances_profiled.
 
     Args:
-        from_user_id (int): ID пользователя, с чьего баланса списываются средства.
-        to_user_id (int): ID пользователя, на чей баланс зачисляются средства.
+        user_ids (Iterable[int]): ID пользователей, чьи балансы необходимо заблокировать.
+        create_missing (Iterable[int]): ID пользователей, для которых необходимо создать баланс, если его нет.
+
+    Returns:
+        dict[int, Balance]: Словарь заблокированных балансов с ключами user_id.
+    """
+    create_missing = sorted(set(create_missing))
+    if create_missing:
+        Balance.objects.bulk_create([Balance(user_id=user_id) for user_id in create_missing],
+                                    ignore_conflicts=True)
+
+    started = time.perf_counter()
+    if settings.LOCK_PROFILING:
+        locked_balances = lock_balances_profiled(user_ids)
+    else:
+        queryset = Balance.objects.select_for_update().filter(user_id__in=set(user_ids)).order_by('user_id')
+        locked_balances = {balance.user_id: balance for balance in queryset}
+    lock_stats.add('lock_wait_seconds', time.perf_counter() - started)
+    lock_stats.add('lock_acquisitions')
+    lock_stats.add('locked_rows', len(locked_balances))
+
+    return locked_balances
+
+
+def lock_balances_profiled(user_ids: Iterable[int]) -> dict[int, Balance]:
+    """
+    Блокирует балансы пользователей по одному запросу SELECT ... FOR UPDATE на строку в порядке возрастания user_id
+    и учитывает время ожидания блокировки каждой строки в contention_profiler.
+
+    Отдельные запросы нужны, чтобы приписать время ожидания конкретному счёту; порядок блокировки тот же,
+    что и у общего запроса, поэтому взаимные блокировки по-прежнему исключены.
+
+    Args:
+        user_ids (Iterable[int]): ID пользователей, чьи балансы необходимо заблокировать.
+
+    Returns:
+        dict[int, Balance]: Словарь заблокированных балансов с ключами user_id.
+    """
+    locked_balances = {}
+    for user_id in sorted(set(user_ids)):
+        started = time.perf_counter()
+        balance = Balance.objects.select_for_update().filter(user_id=user_id).first()
+        contention_profiler.record(user_id, time.perf_counter() - started)
+        if balance is not None:
+            locked_balances[user_id] = balance
+
+    return locked_balances
+
+
+def pick_balances(locked_balances: dict[int, Balance],
+                  from_user_id: int | None,
+                  to_user_id: int | None,
+                  operation: str
+                  ) -> dict[str, Balance]:
+    """
+    Выбирает из заблокированных балансов те, что затрагивает операция.
+
+    Args:
+        locked_balances (dict[int, Balance]): Словарь заблокированных балансов с ключами user_id.
+        from_user_id (int | None): ID пользователя, с чьего баланса списываются средства.
+        to_user_id (int | None): ID пользователя, на чей баланс зачисляются средства.
         operation (str): Передаваемый другим микросервисом тип исполняемой операции (например, 'transfer', 'deposit' или 'withdrawal').
 
     Returns:
         dict[str, Balance]: Словарь, содержащий ключи 'from' и/или 'to' и соответствующие объекты балансов пользователей Balance.
+
+    Raises:
+        NotFound: В случае, если баланс пользователя, с которого списываются средства, не найден.
     """
     balances = {}
     if operation in (TransactionType.TRANSFER.value, TransactionType.WITHDRAWAL.value):
-        balances['from'] = get_object_or_404(Balance.objects.select_for_update(), user_id=from_user_id)
+        if from_user_id not in locked_balances:
+            raise NotFound({'error': 'Баланс пользователя не найден'})
+        balances['from'] = locked_balances[from_user_id]
     if operation in (TransactionType.TRANSFER.value, TransactionType.DEPOSIT.value):
-        balances['to'], _ = Balance.objects.select_for_update().get_or_create(user_id=to_user_id)
+        balances['to'] = locked_balances[to_user_id]
 
     return balances
 
 
+def get_balances(from_user_id: int, to_user_id: int, operation: str) -> dict[str, Balance]:
+    """
+    Возвращает заблокированные балансы пользователей.
+
+    Все балансы, затрагиваемые операцией, блокируются одним запросом в порядке возрастания user_id,
+    что исключает взаимную блокировку встречных переводов.
+
+    Args:
+        from_user_id (int): ID пользователя, с чьего баланса списываются средства.
+        to_user_id (int): ID пользователя, на чей баланс зачисляются средства.
+        operation (str): Передаваемый другим микросервисом тип исполняемой операции (например, 'transfer', 'deposit' или 'withdrawal').
+
+    Returns:
+        dict[str, Balance]: Словарь, содержащий ключи 'from' и/или 'to' и соответствующие объекты балансов пользователей Balance.
+
+    Raises:
+        NotFound: В случае, если баланс пользователя, с которого списываются средства, не найден.
+    """
+    debit = operation in (TransactionType.TRANSFER.value, TransactionType.WITHDRAWAL.value)
+    credit = operation in (TransactionType.TRANSFER.value, TransactionType.DEPOSIT.value)
+
+    user_ids = [user_id for user_id, needed in ((from_user_id, debit), (to_user_id, credit)) if needed]
+    locked_balances = lock_balances(user_ids)
+
+    if debit and from_user_id not in locked_balances:
+        raise NotFound({'error': 'Баланс пользователя не найден'})
+    if credit and to_user_id not in locked_balances:
+        locked_balances.update(lock_balances([to_user_id], create_missing=[to_user_id]))
+
+    return pick_balances(locked_balances, from_user_id, to_user_id, operation)
+
+
 def execute_transaction(balances: dict[str, Balance], amount: Decimal, operation: str) -> dict[str, Decimal]:
     """
     Проверяет тип транзакции, исполняет соответствующую бизнес-логику и логирует изменения баланса(ов).
@@ -122,9 +374,172 @@ def execute_transaction(balances: dict[str, Balance], amount: Decimal, operation
     return balance_changes
 
 
+def execute_conditional_update(from_user_id: int | None,
+                               to_user_id: int | None,
+                               amount: Decimal,
+                               operation: str
+                               ) -> tuple[dict[str, Balance], dict[str, Decimal]]:
+    """
+    Исполняет зачисление или списание одним запросом к базе данных, без блокировки баланса и его сохранения.
+
+    Значения баланса до и после исполнения транзакции вычисляются по значению, возвращённому запросом.
+
+    Args:
+        from_user_id (int | None): ID пользователя, с чьего баланса списываются средства.
+        to_user_id (int | None): ID пользователя, на чей баланс зачисляются средства.
+        amount (Decimal): Сумма денежных средств, над которой совершается транзакция.
+        operation (str): Тип исполняемой операции ('deposit' или 'withdrawal').
+
+    Returns:
+        tuple[dict[str, Balance], dict[str, Decimal]]: Словарь, содержащий ключ 'from' или 'to' и несохраняемый объект
+            Balance с новым состоянием баланса, и словарь, содержащий ключи 'from_balance_before', 'from_balance_after'
+            или 'to_balance_before', 'to_balance_after' и соответствующие им значения балансов пользователей.
+
+    Raises:
+        ValidationError: Если средств для списания недостаточно или передан тип операции, отличный от зачисления и списания.
+        NotFound: Если баланс пользователя, с которого списываются средства, не найден.
+    """
+    if operation == TransactionType.WITHDRAWAL.value:
+        balance = withdraw_balance(from_user_id, amount)
+        return {'from': balance}, {'from_balance_before': balance.amount + amount, 'from_balance_after': balance.amount}
+
+    if operation == TransactionType.DEPOSIT.value:
+        balance = deposit_balance(to_user_id, amount)
+        return {'to': balance}, {'to_balance_before': balance.amount - amount, 'to_balance_after': balance.amount}
+
+    raise ValidationError({'error': 'Недопустимая операция'})
+
+
+def execute_sharded_update(from_user_id: int | None,
+                           to_user_id: int | None,
+                           amount: Decimal,
+                           operation: str,
+                           shard_count: int
+                           ) -> tuple[dict[str, Balance], dict[str, Decimal]]:
+    """
+    Исполняет зачисление на шардированный баланс или списание с него без блокировки строки Balance.
+
+    Зачисление попадает в случайный слот баланса, списание - см. withdraw_sharded. Значения баланса до и после
+    исполнения транзакции вычисляются по сумме строк баланса, прочитанной сразу после изменения; при конкурентных
+    операциях над тем же балансом в ней не учитываются ещё не зафиксированные изменения других транзакций.
+
+    Args:
+        from_user_id (int | None): ID пользователя, с чьего баланса списываются средства.
+        to_user_id (int | None): ID пользователя, на чей баланс зачисляются средства.
+        amount (Decimal): Сумма денежных средств, над которой совершается транзакция.
+        operation (str): Тип исполняемой операции ('deposit' или 'withdrawal').
+        shard_count (int): Количество слотов баланса по данным ShardedAccounts.
+
+    Returns:
+        tuple[dict[str, Balance], dict[str, Decimal]]: То же, что execute_conditional_update.
+
+    Raises:
+        ValidationError: Если средств для списания недостаточно или передан тип операции, отличный от зачисления и списания.
+        NotFound: Если баланс пользователя, с которого списываются средства, не найден.
+    """
+    if operation == TransactionType.WITHDRAWAL.value:
+        withdraw_sharded(from_user_id, amount)
+        balance = load_balances([from_user_id])[from_user_id]
+        return {'from': balance}, {'from_balance_before': balance.amount + amount, 'from_balance_after': balance.amount}
+
+    if operation == TransactionType.DEPOSIT.value:
+        if not deposit_shard(to_user_id, shard_count, amount):
+            # Баланс перестал быть шардированным после последнего чтения списка ShardedAccounts
+            return execute_conditional_update(from_user_id, to_user_id, amount, operation)
+        balance = load_balances([to_user_id])[to_user_id]
+        return {'to': balance}, {'to_balance_before': balance.amount - amount, 'to_balance_after': balance.amount}
+
+    raise ValidationError({'error': 'Недопустимая операция'})
+
+
+def withdraw_balance(user_id: int, amount: Decimal) -> Balance:
+    """
+    Списывает средства с баланса пользователя условным запросом UPDATE ... WHERE amount >= %s RETURNING amount.
+
+    Args:
+        user_id (int): ID пользователя, с чьего баланса списываются средства.
+        amount (Decimal): Сумма списания.
+
+    Returns:
+        Balance: Несохраняемый объект Balance с балансом и версией баланса после списания.
+
+    Raises:
+        ValidationError: Если средств для списания недостаточно.
+        NotFound: Если баланс пользователя не найден.
+    """
+    table = connection.ops.quote_name(Balance._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {table} SET amount = amount - %s, version = version + 1 '
+            f'WHERE user_id = %s AND amount >= %s RETURNING amount, version',
+            [amount, user_id, amount]
+        )
+        row = cursor.fetchone()
+
+    if row is None:
+        # Запрос не изменил ни одной строки: различаем отсутствие баланса, шардированный баланс,
+        # ещё не известный процессу (см. ShardedAccounts), и нехватку средств
+        shard_count = Balance.objects.filter(user_id=user_id).values_list('shard_count', flat=True).first()
+        if shard_count is None:
+            raise NotFound({'error': 'Баланс пользователя не найден'})
+        if not shard_count:
+            raise ValidationError({'error': 'Недостаточно средств'})
+        withdraw_sharded(user_id, amount)
+        return load_balances([user_id])[user_id]
+
+    return Balance(user_id=user_id, amount=to_amount(row[0]), version=row[1])
+
+
+def deposit_balance(user_id: int, amount: Decimal) -> Balance:
+    """
+    Зачисляет средства на баланс пользователя запросом INSERT ... ON CONFLICT DO UPDATE ... RETURNING amount.
+
+    Если баланса пользователя ещё нет, он создаётся тем же запросом. Зачисление на шардированный баланс,
+    ещё не известный процессу (см. ShardedAccounts), попадает в строку Balance, а баланс после зачисления
+    перечитывается вместе со слотами.
+
+    Args:
+        user_id (int): ID пользователя, на чей баланс зачисляются средства.
+        amount (Decimal): Сумма зачисления.
+
+    Returns:
+        Balance: Несохраняемый объект Balance с балансом и версией баланса после зачисления.
+    """
+    table = connection.ops.quote_name(Balance._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} (user_id, amount, version, shard_count) VALUES (%s, %s, 1, 0) '
+            f'ON CONFLICT (user_id) DO UPDATE SET amount = {table}.amount + EXCLUDED.amount, '
+            f'version = {table}.version + 1 '
+            f'RETURNING amount, version, shard_count',
+            [user_id, amount]
+        )
+        row = cursor.fetchone()
+
+    if row[2]:
+        return load_balances([user_id])[user_id]
+
+    return Balance(user_id=user_id, amount=to_amount(row[0]), version=row[1])
+
+
+def to_amount(value: Any) -> Decimal:
+    """
+    Приводит значение суммы, возвращённое базой данных, к Decimal с точностью до копеек.
+
+    Args:
+        value (Any): Значение суммы, возвращённое драйвером базы данных.
+
+    Returns:
+        Decimal: Сумма с двумя знаками после запятой.
+    """
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value))
+    return value.quantize(CENTS)
+
+
 def save_balances(balances: dict[str, Balance]) -> None:
     """
-    Сохраняет в базе данных изменения, внесённые в балансы пользователей.
+    Сохраняет в базе данных изменения, внесённые в балансы пользователей, и увеличивает их версии.
 
     Args:
         balances (dict[str, Balance]): Словарь, содержащий ключи 'from' и/или 'to' и соответствующие объекты балансов пользователей Balance.
@@ -133,26 +548,145 @@ def save_balances(balances: dict[str, Balance]) -> None:
         None
     """
     for balance in balances.values():
-        balance.save()
+        balance.version += 1
+        balance.save(update_fields=['amount', 'version'])
 
 
-def record_transaction(data: dict[str, Any], comment: str | None = None) -> None:
+def record_transaction(data: dict[str, Any],
+                       comment: str | None = None,
+                       created_at: datetime.datetime | None = None
+                       ) -> None:
     """
     Создаёт объект(ы) Transaction и сохраняет в базе данных итоговые данные об успешно завершённой транзакции.
 
     Args:
         data (dict[str, Any]): Итоговые данные о транзакции.
         comment (str | None): Необязательный комментарий пользователя.
+        created_at (datetime.datetime | None): Время исполнения транзакции; по умолчанию - текущее время.
+
+    Returns:
+        None
+    """
+    record_transactions([(data, comment)], created_at)
+
+
+def record_transactions(entries: list[tuple[dict[str, Any], str | None]],
+                        created_at: datetime.datetime | None = None,
+                        copy: bool = False
+                        ) -> None:
+    """
+    Сохраняет итоговые данные о нескольких успешно завершённых транзакциях одним запросом INSERT.
+
+    При LEDGER_MODE = 'sync' сохраняются записи Transaction всех затронутых сторон транзакций. При LEDGER_MODE = 'outbox'
+    сохраняется по одной компактной записи LedgerOutbox на транзакцию; в Transaction их переносит задача
+    flush_ledger_outbox (см. main.services.ledger).
+
+    Args:
+        entries (list[tuple[dict[str, Any], str | None]]): Пары из итоговых данных о транзакции
+            и необязательного комментария пользователя.
+        created_at (datetime.datetime | None): Время исполнения транзакций; по умолчанию - текущее время.
+        copy (bool): Сохранить записи запросом COPY вместо INSERT (см. copy_objects).
 
     Returns:
         None
     """
+    created_at = created_at or now()
+    save = copy_objects if copy else bulk_create
+
+    if settings.LEDGER_MODE == 'outbox':
+        save([build_outbox_entry(data, comment, created_at) for data, comment in entries])
+        return
+
+    save([record for data, comment in entries for record in build_transactions(data, comment, created_at)])
+
+
+def bulk_create(objects: list[Transaction | LedgerOutbox]) -> None:
+    if objects:
+        type(objects[0]).objects.bulk_create(objects)
+
+
+def copy_objects(objects: list[Transaction | LedgerOutbox]) -> None:
+    """
+    Сохраняет несохранённые объекты одной модели запросом COPY ... FROM STDIN (только PostgreSQL).
+
+    COPY передаёт строки потоком без разбора отдельного запроса INSERT и значительно быстрее bulk_create
+    на больших объёмах. Первичный ключ не передаётся и назначается базой данных; id объектов не заполняются.
+    Для остальных баз данных используется bulk_create.
+
+    Args:
+        objects (list[Transaction | LedgerOutbox]): Объекты одной модели.
+
+    Returns:
+        None
+    """
+    if not objects:
+        return
+    if connection.vendor != 'postgresql':
+        bulk_create(objects)
+        return
+
+    model = type(objects[0])
+    fields = [field for field in model._meta.concrete_fields if not field.primary_key]
+    columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+
+    with connection.cursor() as cursor:
+        with cursor.cursor.copy(f'COPY {connection.ops.quote_name(model._meta.db_table)} ({columns}) FROM STDIN') as copy:
+            for obj in objects:
+                copy.write_row([field.get_db_prep_save(getattr(obj, field.attname), connection) for field in fields])
+
+
+def build_outbox_entry(data: dict[str, Any], comment: str | None, created_at: datetime.datetime) -> LedgerOutbox:
+    """
+    Создаёт несохранённую запись LedgerOutbox по итоговым данным о транзакции.
+
+    Args:
+        data (dict[str, Any]): Итоговые данные о транзакции.
+        comment (str | None): Необязательный комментарий пользователя.
+        created_at (datetime.datetime): Время исполнения транзакции.
+
+    Returns:
+        LedgerOutbox: Запись outbox.
+    """
+    return LedgerOutbox(
+        operation=data['operation'],
+        from_user_id=data.get('from_user_id'),
+        to_user_id=data.get('to_user_id'),
+        amount=data['amount'],
+        from_balance_before=data.get('from_balance_before'),
+        from_balance_after=data.get('from_balance_after'),
+        to_balance_before=data.get('to_balance_before'),
+        to_balance_after=data.get('to_balance_after'),
+        comment=comment or '',
+        created_at=created_at,
+    )
+
+
+def build_transactions(data: dict[str, Any],
+                       comment: str | None = None,
+                       created_at: datetime.datetime | None = None
+                       ) -> list[Transaction]:
+    """
+    Создаёт несохранённые объекты Transaction по итоговым данным об успешно завершённой транзакции.
+
+    В поле comment сохраняется только комментарий пользователя: технический комментарий формируется
+    из остальных полей записи при чтении, см. generate_comment.
+
+    Args:
+        data (dict[str, Any]): Итоговые данные о транзакции.
+        comment (str | None): Необязательный комментарий пользователя.
+        created_at (datetime.datetime | None): Время исполнения транзакции; по умолчанию - текущее время.
+
+    Returns:
+        list[Transaction]: Объекты Transaction для каждой из затронутых сторон транзакции.
+    """
     amount = data['amount']
     operation = data['operation']
-    completed_at = data['completed_at']
+    created_at = created_at or now()
+    comment = comment or ''
+    records = []
 
     if 'from_balance_before' in data:
-        Transaction.objects.create(
+        records.append(Transaction(
             user_id=data['from_user_id'],
             from_user_id=data['from_user_id'],
             to_user_id=data.get('to_user_id'),
@@ -160,12 +694,12 @@ def record_transaction(data: dict[str, Any], comment: str | None = None) -> None
             balance_after=data['from_balance_after'],
             amount=amount,
             operation=operation,
-            comment=generate_comment(operation, amount, data['from_balance_after'],
-                                     completed_at, comment)
-        )
+            comment=comment,
+            created_at=created_at
+        ))
 
     if 'to_balance_before' in data:
-        Transaction.objects.create(
+        records.append(Transaction(
             user_id=data['to_user_id'],
             from_user_id=data.get('from_user_id'),
             to_user_id=data['to_user_id'],
@@ -173,25 +707,30 @@ def record_transaction(data: dict[str, Any], comment: str | None = None) -> None
             balance_after=data['to_balance_after'],
             amount=amount,
             operation=operation,
-            comment=generate_comment(operation, amount, data['to_balance_after'],
-                                     completed_at, comment)
-        )
+            comment=comment,
+            created_at=created_at
+        ))
+
+    return records
 
 
 def generate_comment(operation: str,
                      amount: Decimal,
                      balance_after: Decimal,
-                     completed_at: datetime,
+                     completed_at: datetime.datetime,
                      comment: str | None
                      ) -> str:
     """
     Создаёт технический комментарий к транзакции, дополняет его комментарием пользователя, если таковой передан.
 
+    Вызывается при чтении записей Transaction: все составляющие технического комментария хранятся
+    в отдельных полях записи, а в поле comment - только комментарий пользователя.
+
     Args:
         operation (str): Передаваемый другим микросервисом тип исполняемой операции (например, 'transfer', 'deposit' или 'withdrawal').
         amount (Decimal): Сумма денежных средств, над которой совершается транзакция.
         balance_after (Decimal): Баланс денежных средств пользователя после исполнения транзакции.
-        completed_at (datetime): Время завершения транзакции в формате '%d.%m.%Y %H:%M:%S'.
+        completed_at (datetime.datetime): Время завершения транзакции (created_at записи).
         comment (str | None): Необязательный комментарий пользователя.
 
     Returns:
@@ -199,10 +738,25 @@ def generate_comment(operation: str,
     """
     generated_comment = (
         f'{TransactionType(operation).label} на сумму {amount}; '
-        f'Баланс: {balance_after:.2f}; Время исполнения: {completed_at}'
+        f'Баланс: {balance_after:.2f}; Время исполнения: {completed_at:%d.%m.%Y %H:%M:%S}'
     )
 
     if comment:
         generated_comment += f'; Комментарий: {comment}'
 
     return generated_comment
+
+
+def render_comment(record: Any) -> str:
+    """
+    Возвращает технический комментарий записи транзакции, см. generate_comment.
+
+    Args:
+        record (Any): Экземпляр Transaction или именованный кортеж с полями operation, amount, balance_after,
+            created_at и comment.
+
+    Returns:
+        str: Итоговый комментарий к транзакции.
+    """
+    return generate_comment(record.operation, record.amount, record.balance_after, record.created_at,
+                            record.comment)
@@ -1,19 +1,56 @@
-import httpx
+import logging
+
 from celery import shared_task
-from decouple import config
-from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def update_exchange_rates(force=False):
+    """
+    Обновляет таблицу курсов валют по отношению к российскому рублю, если срок её актуальности подходит к концу.
+
+    Запускается раз в EXCHANGE_RATES_CHECK_INTERVAL секунд; запрос к API выполняет только один воркер,
+    см. refresh_exchange_rates.
+    """
+    from main.services.rates_refresh import refresh_exchange_rates
+
+    if refresh_exchange_rates(force=force):
+        logger.info('Курсы валют обновлены')
+
+
+@shared_task
+def flush_ledger_outbox():
+    """
+    Переносит записи транзакционного outbox в журнал транзакций и логирует отставание журнала.
+
+    Размер очереди и отставание запрашиваются, только если записи были перенесены.
+    """
+    # balance/celery.py импортирует этот модуль до загрузки приложений Django, поэтому модели импортируются здесь
+    from django.conf import settings
+
+    from main.models import LedgerOutbox
+    from main.services.ledger import flush_outbox, get_outbox_stats
+
+    # При LEDGER_MODE = 'sync' outbox пуст, кроме записей, оставшихся после переключения из режима 'outbox'
+    if settings.LEDGER_MODE != 'outbox' and not LedgerOutbox.objects.exists():
+        return
+
+    flushed = flush_outbox()
+    if flushed:
+        stats = get_outbox_stats()
+        logger.info('Перенесено записей outbox: %s, осталось: %s, отставание журнала: %.3f с',
+                    flushed, stats['pending'], stats['lag_seconds'])
 
 
 @shared_task
-def update_exchange_rates():
+def create_transaction_partitions():
     """
-    Автоматически обновляет словарь, содержащий наименования валют и их обменный курс по отношению к российскому рублю.
+    Создаёт месячные партиции таблицы транзакций на TRANSACTION_PARTITIONS_AHEAD месяцев вперёд.
     """
-    url = f"https://v6.exchangerate-api.com/v6/{config('EXCHANGE_API_KEY')}/latest/RUB"
-    try:
-        response = httpx.get(url, timeout=5.0)
-        response.raise_for_status()
-        data = response.json()
-        cache.set('exchange_rates', data, timeout=60 * 60 * 24)
-    except Exception as e:
-        print(f'Ошибка обновления курса валют: {str(e)}')
+    from django.conf import settings
+
+    from main.services.partitions import create_partitions, is_partitioned
+
+    if is_partitioned():
+        create_partitions(settings.TRANSACTION_PARTITIONS_AHEAD)
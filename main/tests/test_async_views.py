@@ -0,0 +1,80 @@
+import asyncio
+import json
+from urllib.parse import parse_qs, urlsplit
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, SimpleTestCase, TestCase, override_settings
+
+from main.async_views import AsyncGetUserBalanceView, AsyncGetUserTransactionsView
+from main.enums import TransactionType
+from main.models import Balance, Transaction
+from main.services.exchange_rates import local_rates, store_exchange_rates
+from main.services.redis_client import _async_clients, get_async_redis
+from main.tests.test_exchange_rates import LOCMEM_CACHES
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class AsyncReadViewsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        local_rates.clear()
+        self.factory = AsyncRequestFactory()
+        Balance.objects.create(user_id=1, amount=Decimal('100.00'))
+        Transaction.objects.bulk_create([
+            Transaction(user_id=1, to_user_id=1, amount=Decimal(index), operation=TransactionType.DEPOSIT.value)
+            for index in range(1, 13)
+        ])
+
+    async def test_balance_in_currency(self):
+        store_exchange_rates({'conversion_rates': {'USD': 0.0125}}, timeout=60)
+        request = self.factory.get('/api/v1/users/1/balance/', {'currency': 'usd'})
+        response = await AsyncGetUserBalanceView.as_view()(request, user_id=1)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content),
+                         {'user_id': 1, 'balance': '1.25', 'currency': 'USD'})
+
+    async def test_balance_not_found(self):
+        request = self.factory.get('/api/v1/users/999/balance/')
+        response = await AsyncGetUserBalanceView.as_view()(request, user_id=999)
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('error', json.loads(response.content))
+
+    async def test_transactions_cursor_pagination(self):
+        view = AsyncGetUserTransactionsView.as_view()
+        response = await view(self.factory.get('/api/v1/users/1/transactions/'), user_id=1)
+        page = json.loads(response.content)
+        self.assertEqual(len(page['results']), 10)
+
+        cursor = parse_qs(urlsplit(page['next']).query)['cursor'][0]
+        response = await view(self.factory.get('/api/v1/users/1/transactions/', {'cursor': cursor}), user_id=1)
+        next_page = json.loads(response.content)
+        self.assertEqual(len(next_page['results']), 2)
+        self.assertIsNone(next_page['next'])
+
+    async def test_transactions_fields(self):
+        request = self.factory.get('/api/v1/users/1/transactions/', {'fields': 'operation,amount'})
+        response = await AsyncGetUserTransactionsView.as_view()(request, user_id=1)
+        self.assertEqual(json.loads(response.content)['results'][0], {'operation': 'deposit', 'amount': '12.00'})
+
+        request = self.factory.get('/api/v1/users/1/transactions/', {'fields': 'secret'})
+        response = await AsyncGetUserTransactionsView.as_view()(request, user_id=1)
+        self.assertEqual(response.status_code, 400)
+
+    async def test_transactions_invalid_ordering(self):
+        request = self.factory.get('/api/v1/users/1/transactions/', {'ordering': 'amount'})
+        response = await AsyncGetUserTransactionsView.as_view()(request, user_id=1)
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django_redis.cache.RedisCache',
+                                       'LOCATION': 'redis://127.0.0.1:6379/15'}})
+class AsyncRedisClientTests(SimpleTestCase):
+    def test_client_per_loop_without_leaks(self):
+        async def get_client():
+            client = get_async_redis()
+            # Клиенты циклов, закрытых предыдущими asyncio.run, удалены
+            return client is get_async_redis() and len(_async_clients) == 1
+
+        for _ in range(3):
+            self.assertTrue(asyncio.run(get_client()))
@@ -0,0 +1,43 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from main.services.balance_cache import cache_balance, get_cached_balance, invalidate_cached_balances, stats
+from main.tests.test_exchange_rates import LOCMEM_CACHES
+
+
+@override_settings(CACHES=LOCMEM_CACHES, BALANCE_CACHE_ENABLED=True)
+class BalanceCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_miss_then_hit(self):
+        before = stats.snapshot()
+        self.assertIsNone(get_cached_balance(1))
+        cache_balance(1, Decimal('10.00'), version=1)
+        self.assertEqual(get_cached_balance(1), Decimal('10.00'))
+        after = stats.snapshot()
+        self.assertEqual(after['misses'] - before['misses'], 1)
+        self.assertEqual(after['hits'] - before['hits'], 1)
+
+    def test_stale_version_does_not_overwrite(self):
+        cache_balance(1, Decimal('30.00'), version=3)
+        cache_balance(1, Decimal('20.00'), version=2)
+        self.assertEqual(get_cached_balance(1), Decimal('30.00'))
+        cache_balance(1, Decimal('40.00'), version=4)
+        self.assertEqual(get_cached_balance(1), Decimal('40.00'))
+
+    def test_invalidate_allows_recreated_balance(self):
+        cache_balance(1, Decimal('30.00'), version=3)
+        cache_balance(2, Decimal('20.00'), version=2)
+        invalidate_cached_balances([1, 2])
+        self.assertIsNone(get_cached_balance(2))
+
+        cache_balance(1, Decimal('0.00'), version=0)
+        self.assertEqual(get_cached_balance(1), Decimal('0.00'))
+
+    @override_settings(BALANCE_CACHE_ENABLED=False)
+    def test_disabled(self):
+        cache_balance(1, Decimal('10.00'), version=1)
+        self.assertIsNone(get_cached_balance(1))
@@ -0,0 +1,99 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from main.enums import TransactionType
+from main.models import Balance
+from main.services.contention import SpaceSaving, contention_profiler
+from main.services.transaction_service import process_transaction
+
+
+class SpaceSavingTests(TestCase):
+    def test_exact_while_under_capacity(self):
+        sketch = SpaceSaving(3)
+        for key, weight in ((1, 1.0), (2, 5.0), (1, 2.0)):
+            sketch.add(key, weight)
+
+        self.assertEqual(sketch.top(2), [(2, 5.0, 1, 0.0), (1, 3.0, 2, 0.0)])
+
+    def test_heavy_key_survives_eviction(self):
+        sketch = SpaceSaving(2)
+        for key in range(100):
+            sketch.add(key, 1.0)
+            sketch.add(1000, 2.0)
+
+        top_key, weight, events, error = sketch.top(1)[0]
+        self.assertEqual((top_key, weight, events, error), (1000, 200.0, 100, 0.0))
+        self.assertEqual(len(sketch.items), 2)
+
+    def test_evicted_weight_becomes_error(self):
+        sketch = SpaceSaving(1)
+        sketch.add(1, 4.0)
+        sketch.add(2, 1.0)
+
+        self.assertEqual(sketch.top(1), [(2, 5.0, 1, 4.0)])
+
+
+@override_settings(LOCK_PROFILING=True, LOCK_PROFILING_MIN_WAIT=0)
+class LockContentionTests(TestCase):
+    def setUp(self):
+        contention_profiler.reset()
+        self.addCleanup(contention_profiler.reset)
+        Balance.objects.create(user_id=1, amount=Decimal('100.00'))
+        Balance.objects.create(user_id=2, amount=Decimal('100.00'))
+
+    def transfer(self, from_user_id, to_user_id):
+        return process_transaction({'operation': TransactionType.TRANSFER.value, 'from_user_id': from_user_id,
+                                    'to_user_id': to_user_id, 'amount': Decimal('1.00')})
+
+    def test_lock_waits_are_recorded_per_account(self):
+        self.transfer(1, 2)
+        self.transfer(2, 1)
+
+        scope, accounts = contention_profiler.top(10)
+        self.assertEqual(scope, 'process')
+        self.assertEqual({account['user_id']: account['waits'] for account in accounts}, {1: 2, 2: 2})
+
+    def test_short_waits_are_ignored(self):
+        with override_settings(LOCK_PROFILING_MIN_WAIT=60):
+            self.transfer(1, 2)
+
+        self.assertEqual(contention_profiler.top(10)[1], [])
+
+    def test_ranked_by_wait_time(self):
+        with override_settings(LOCK_PROFILING_FLUSH_INTERVAL=3600):
+            contention_profiler.record(5, 0.5)
+            contention_profiler.record(6, 0.1)
+            contention_profiler.record(6, 0.1)
+
+        self.assertEqual([account['user_id'] for account in contention_profiler.top(10)[1]], [5, 6])
+
+    def test_admin_endpoint(self):
+        self.transfer(1, 2)
+        url = reverse('lock_contention')
+
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.force_login(User.objects.create_user('admin', is_staff=True))
+        response = self.client.get(url, {'limit': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['enabled'])
+        self.assertEqual(len(response.data['accounts']), 1)
+        self.assertEqual(self.client.get(url, {'limit': 'x'}).status_code, 400)
+
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertEqual(self.client.get(url).data['accounts'], [])
+
+    def test_command(self):
+        self.transfer(1, 2)
+        stdout = StringIO()
+        call_command('lock_contention', '--reset', stdout=stdout, stderr=StringIO())
+
+        # Порядок счетов зависит от фактического времени ожидания блокировок
+        self.assertRegex(stdout.getvalue(), r'1\. [12]:')
+        self.assertRegex(stdout.getvalue(), r'2\. [12]:')
+        self.assertEqual(contention_profiler.top(10)[1], [])
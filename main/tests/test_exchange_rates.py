@@ -0,0 +1,48 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.exceptions import APIException, ValidationError
+
+from main.services.exchange_rates import get_exchange_rate, local_rates, store_exchange_rates
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES, EXCHANGE_RATES_L1_TTL=60)
+class LocalRateTableTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        local_rates.clear()
+
+    def test_rate_lookup(self):
+        store_exchange_rates({'conversion_rates': {'USD': 0.0125, 'RUB': 1}}, timeout=60)
+        self.assertEqual(get_exchange_rate('USD'), Decimal('0.0125'))
+
+    def test_unknown_currency(self):
+        store_exchange_rates({'conversion_rates': {'USD': 0.0125}}, timeout=60)
+        with self.assertRaises(ValidationError):
+            get_exchange_rate('XXX')
+
+    def test_missing_rates(self):
+        with self.assertRaises(APIException):
+            get_exchange_rate('USD')
+
+    def test_fresh_table_skips_cache(self):
+        store_exchange_rates({'conversion_rates': {'USD': 0.0125}}, timeout=60)
+        get_exchange_rate('USD')
+        with mock.patch.object(cache, 'get') as cache_get:
+            get_exchange_rate('USD')
+        cache_get.assert_not_called()
+
+    @override_settings(EXCHANGE_RATES_L1_TTL=0)
+    def test_table_reloaded_only_on_version_change(self):
+        store_exchange_rates({'conversion_rates': {'USD': 0.0125}}, timeout=60)
+        get_exchange_rate('USD')
+        with mock.patch.object(cache, 'get', wraps=cache.get) as cache_get:
+            get_exchange_rate('USD')
+        self.assertEqual(cache_get.call_count, 1)
+
+        store_exchange_rates({'conversion_rates': {'USD': 0.0130}}, timeout=60)
+        self.assertEqual(get_exchange_rate('USD'), Decimal('0.013'))
@@ -0,0 +1,88 @@
+import csv
+import io
+import json
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils.timezone import now
+
+from main.enums import TransactionType
+from main.models import Balance, Transaction
+from main.serializers import UserTransactionsListSerializer
+from main.services.export import EXPORT_FIELDS
+from main.services.transaction_service import process_transaction, render_comment
+
+
+@override_settings(TRANSACTIONS_EXPORT_CHUNK_SIZE=2)
+class ExportUserTransactionsTests(TestCase):
+    def setUp(self):
+        start = now() - timedelta(days=10)
+        self.transactions = [
+            Transaction.objects.create(user_id=1, to_user_id=1, operation=TransactionType.DEPOSIT.value,
+                                       amount=Decimal(f'{index}.50'), balance_after=Decimal(f'{index}.50'),
+                                       created_at=start + timedelta(days=index), comment=f'операция {index}')
+            for index in range(5)
+        ]
+        Transaction.objects.create(user_id=2, to_user_id=2, operation=TransactionType.DEPOSIT.value,
+                                   amount=Decimal('1.00'))
+
+    def export(self, **params):
+        response = self.client.get(reverse('export_user_transactions', kwargs={'user_id': 1}), params)
+        return response, b''.join(response.streaming_content).decode() if response.streaming else None
+
+    async def test_async_iterator_under_asgi(self):
+        response = await self.async_client.get(reverse('export_user_transactions', kwargs={'user_id': 1}),
+                                               {'format': 'csv'})
+
+        self.assertTrue(response.is_async)
+        chunks = [chunk async for chunk in response.streaming_content]
+        # Заголовок и три порции по TRANSACTIONS_EXPORT_CHUNK_SIZE строк
+        self.assertEqual(len(chunks), 4)
+        rows = list(csv.reader(io.StringIO(b''.join(chunks).decode())))
+        self.assertEqual([row[0] for row in rows[1:]], [str(transaction.id) for transaction in self.transactions])
+
+    def test_ndjson_matches_list_serializer(self):
+        response, content = self.export()
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(rows, [dict(row) for row in UserTransactionsListSerializer(self.transactions, many=True).data])
+
+    def test_csv(self):
+        response, content = self.export(format='csv')
+
+        self.assertTrue(response['Content-Type'].startswith('text/csv'))
+        self.assertIn('attachment', response['Content-Disposition'])
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(rows[0], EXPORT_FIELDS)
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[1][EXPORT_FIELDS.index('amount')], '0.50')
+        self.assertEqual(rows[5][EXPORT_FIELDS.index('comment')], render_comment(self.transactions[4]))
+        self.assertTrue(rows[5][EXPORT_FIELDS.index('comment')].endswith('; Комментарий: операция 4'))
+
+    def test_date_range(self):
+        _, content = self.export(**{'from': self.transactions[1].created_at.isoformat(),
+                                    'to': self.transactions[3].created_at.isoformat()})
+
+        self.assertEqual([json.loads(line)['id'] for line in content.splitlines()],
+                         [self.transactions[1].id, self.transactions[2].id])
+
+    def test_invalid_params(self):
+        response, _ = self.export(format='xml')
+        self.assertEqual(response.status_code, 400)
+
+        response, _ = self.export(**{'from': '2026-02-01', 'to': '2026-01-01'})
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(LEDGER_MODE='outbox')
+    def test_includes_pending_transactions(self):
+        Balance.objects.create(user_id=1, amount=Decimal('10.00'))
+        process_transaction({'operation': TransactionType.WITHDRAWAL.value, 'from_user_id': 1,
+                             'amount': Decimal('1.00')})
+
+        _, content = self.export()
+        last = json.loads(content.splitlines()[-1])
+        self.assertIsNone(last['id'])
+        self.assertEqual(last['operation'], TransactionType.WITHDRAWAL.value)
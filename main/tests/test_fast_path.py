@@ -0,0 +1,120 @@
+import datetime
+import json
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+
+from main.models import Balance, Transaction
+from main.serializers import TransactionSerializer
+from main.services.fast_path import validate_transaction
+from main.tests.test_exchange_rates import LOCMEM_CACHES
+from main.views import DepositAPIView, FastTransactionView, TransferAPIView, WithdrawalAPIView
+
+VALID = [
+    {'operation': 'deposit', 'to_user_id': 1, 'amount': '10.50'},
+    {'operation': 'deposit', 'to_user_id': '7', 'amount': 10, 'comment': '  зарплата  '},
+    {'operation': 'withdrawal', 'from_user_id': 1, 'amount': 0.01},
+    {'operation': 'withdrawal', 'from_user_id': 1, 'to_user_id': 2, 'amount': '9999999999.99'},
+    {'operation': 'transfer', 'from_user_id': 1, 'to_user_id': 2, 'amount': 12.5, 'comment': '', 'extra': True},
+]
+INVALID = [
+    [], {'operation': 'deposit', 'amount': '1.00'},
+    {'operation': 'withdrawal', 'to_user_id': 1, 'amount': '1.00'},
+    {'operation': 'transfer', 'from_user_id': 1, 'to_user_id': 1, 'amount': '1.00'},
+    {'operation': 'refund', 'to_user_id': 1, 'amount': '1.00'},
+    {'operation': 'deposit', 'to_user_id': 1, 'amount': '0.00'},
+    {'operation': 'deposit', 'to_user_id': 1, 'amount': '1.001'},
+    {'operation': 'deposit', 'to_user_id': 1, 'amount': '12345678901.00'},
+    {'operation': 'deposit', 'to_user_id': 1, 'amount': 'NaN'},
+    {'operation': 'deposit', 'to_user_id': 1, 'amount': True},
+    {'operation': 'deposit', 'to_user_id': True, 'amount': '1.00'},
+    {'operation': 'deposit', 'to_user_id': None, 'amount': '1.00'},
+    {'operation': 'deposit', 'to_user_id': 'abc', 'amount': '1.00'},
+    {'operation': 'deposit', 'to_user_id': 1, 'amount': '1.00', 'comment': 'x' * 1025},
+    {'operation': 'deposit', 'to_user_id': 1, 'amount': '1.00', 'comment': 'a\x00b'},
+    {'operation': 'deposit', 'to_user_id': 1, 'amount': '1.00', 'comment': None},
+]
+
+
+class ValidateTransactionTests(TestCase):
+    def test_valid_data_matches_serializer(self):
+        for data in VALID:
+            with self.subTest(data=data):
+                serializer = TransactionSerializer(data=data)
+                self.assertTrue(serializer.is_valid(), serializer.errors)
+                self.assertEqual(validate_transaction(data), dict(serializer.validated_data))
+
+    def test_invalid_data_is_left_to_serializer(self):
+        for data in INVALID:
+            with self.subTest(data=data):
+                self.assertIsNone(validate_transaction(data))
+                self.assertFalse(TransactionSerializer(data=data).is_valid())
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class FastTransactionViewTests(TestCase):
+    VIEWS = {'deposit': DepositAPIView, 'withdrawal': WithdrawalAPIView, 'transfer': TransferAPIView}
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        Balance.objects.create(user_id=1, amount=Decimal('100.00'))
+
+    def post(self, view, data, fast=True, **headers):
+        body = data if isinstance(data, str) else json.dumps(data)
+        request = self.factory.post(f'/api/v1/transactions/{data["operation"] if isinstance(data, dict) else "x"}/',
+                                    body, content_type='application/json', headers=headers)
+        view_class = self.VIEWS[view]
+        response = (FastTransactionView.as_view(view_class=view_class) if fast else view_class.as_view())(request)
+        if hasattr(response, 'render'):
+            response.render()
+        return response
+
+    def test_success_responses_match_drf(self):
+        Balance.objects.create(user_id=2, amount=Decimal('100.00'))
+        completed_at = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+        for view, data in (('deposit', {'operation': 'deposit', 'to_user_id': 1, 'amount': '10.00'}),
+                           ('withdrawal', {'operation': 'withdrawal', 'from_user_id': 1, 'amount': 5.5}),
+                           ('transfer', {'operation': 'transfer', 'from_user_id': 1, 'to_user_id': 2,
+                                         'amount': '1.25', 'comment': 'долг'})):
+            with self.subTest(view=view), mock.patch('main.services.transaction_service.now',
+                                                     return_value=completed_at):
+                fast = self.post(view, data)
+                Balance.objects.filter(user_id__in=[1, 2]).update(amount=Decimal('100.00'))
+                drf = self.post(view, data, fast=False)
+                Balance.objects.filter(user_id__in=[1, 2]).update(amount=Decimal('100.00'))
+
+                self.assertEqual(fast.status_code, 200)
+                self.assertEqual((fast.status_code, fast['Content-Type'], fast.content),
+                                 (drf.status_code, drf['Content-Type'], drf.content))
+
+        self.assertEqual(Transaction.objects.count(), 8)
+
+    def test_service_errors_match_drf(self):
+        for data in ({'operation': 'withdrawal', 'from_user_id': 1, 'amount': '500.00'},
+                     {'operation': 'withdrawal', 'from_user_id': 999, 'amount': '1.00'}):
+            with self.subTest(data=data):
+                fast = self.post('withdrawal', data)
+                drf = self.post('withdrawal', data, fast=False)
+                self.assertEqual((fast.status_code, fast.content), (drf.status_code, drf.content))
+
+    def test_validation_errors_fall_back_to_drf(self):
+        for view, data in (('deposit', {'operation': 'deposit', 'amount': '1.00'}),
+                           ('deposit', {'operation': 'transfer', 'from_user_id': 1, 'to_user_id': 2,
+                                        'amount': '1.00'}),
+                           ('transfer', '{"operation": "transfer",')):
+            with self.subTest(data=data):
+                fast = self.post(view, data)
+                drf = self.post(view, data, fast=False)
+                self.assertEqual((fast.status_code, fast.content), (drf.status_code, drf.content))
+                self.assertEqual(fast.status_code, 400)
+
+    def test_idempotent_requests_use_drf_view(self):
+        data = {'operation': 'deposit', 'to_user_id': 1, 'amount': '10.00'}
+        first = self.post('deposit', data, **{'Idempotency-Key': 'k1'})
+        second = self.post('deposit', data, **{'Idempotency-Key': 'k1'})
+
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(Balance.objects.get(user_id=1).amount, Decimal('110.00'))
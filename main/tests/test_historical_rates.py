@@ -0,0 +1,97 @@
+import datetime
+import json
+from decimal import Decimal
+
+from django.test import AsyncRequestFactory, TestCase
+from django.urls import reverse
+from rest_framework.exceptions import ValidationError
+
+from main.async_views import AsyncGetUserTransactionsView
+from main.enums import TransactionType
+from main.models import ExchangeRate, Transaction
+from main.services.historical_rates import get_historical_rates, record_daily_rates
+
+JAN_10 = datetime.date(2026, 1, 10)
+JAN_20 = datetime.date(2026, 1, 20)
+
+
+def at(day):
+    return datetime.datetime.combine(day, datetime.time(12), tzinfo=datetime.timezone.utc)
+
+
+class HistoricalRatesTests(TestCase):
+    def setUp(self):
+        record_daily_rates({'RUB': '1', 'USD': '0.0125', 'EUR': '0.0109'}, JAN_10)
+        record_daily_rates({'USD': '0.0110'}, JAN_20)
+
+    def test_record_daily_rates_overwrites_day(self):
+        record_daily_rates({'USD': '0.0111'}, JAN_20)
+
+        self.assertEqual(ExchangeRate.objects.count(), 3)
+        self.assertEqual(ExchangeRate.objects.get(currency='USD', date=JAN_20).rate, Decimal('0.0111'))
+        self.assertFalse(ExchangeRate.objects.filter(currency='RUB').exists())
+
+    def test_rate_on_date_is_last_known_rate(self):
+        dates = [JAN_10 - datetime.timedelta(days=5), JAN_10, JAN_10 + datetime.timedelta(days=3), JAN_20,
+                 JAN_20 + datetime.timedelta(days=30)]
+        with self.assertNumQueries(1):
+            rates = get_historical_rates('USD', dates)
+
+        self.assertEqual([rates.get(day) for day in dates],
+                         [None, Decimal('0.0125'), Decimal('0.0125'), Decimal('0.0110'), Decimal('0.0110')])
+        self.assertEqual(get_historical_rates('USD', [JAN_10 - datetime.timedelta(days=1)]), {})
+
+    def test_unknown_currency(self):
+        with self.assertRaises(ValidationError):
+            get_historical_rates('JPY', [JAN_10])
+
+
+class TransactionsInCurrencyTests(TestCase):
+    def setUp(self):
+        record_daily_rates({'USD': '0.0125'}, JAN_10)
+        record_daily_rates({'USD': '0.0110'}, JAN_20)
+        for day, amount in ((JAN_10, '100.00'), (JAN_20, '100.00'), (JAN_20, '33.33')):
+            Transaction.objects.create(user_id=1, to_user_id=1, operation=TransactionType.DEPOSIT.value,
+                                       amount=Decimal(amount), balance_after=Decimal('1000.00'), created_at=at(day))
+        self.url = reverse('get_user_transactions', args=[1])
+
+    def test_page_converted_at_rate_of_the_day(self):
+        response = self.client.get(self.url, {'currency': 'usd', 'ordering': 'created_at'})
+
+        self.assertEqual(response.status_code, 200)
+        results = response.data['results']
+        self.assertEqual([row['amount'] for row in results], ['1.25', '1.10', '0.37'])
+        self.assertEqual([row['balance_after'] for row in results], ['12.50', '11.00', '11.00'])
+        self.assertEqual(results[0]['exchange_rate'], '0.0125')
+        self.assertEqual({row['currency'] for row in results}, {'USD'})
+
+    def test_rows_before_first_rate_are_not_converted(self):
+        Transaction.objects.create(user_id=1, to_user_id=1, operation=TransactionType.DEPOSIT.value,
+                                   amount=Decimal('50.00'), balance_after=Decimal('900.00'),
+                                   created_at=at(JAN_10 - datetime.timedelta(days=1)))
+        response = self.client.get(self.url, {'currency': 'USD', 'ordering': 'created_at'})
+
+        first = response.data['results'][0]
+        self.assertEqual((first['amount'], first['currency'], first['exchange_rate']), ('50.00', 'RUB', None))
+        self.assertEqual(response.data['results'][1]['amount'], '1.25')
+
+    def test_single_rates_query_with_fields(self):
+        with self.assertNumQueries(3):  # проверка наличия транзакций, страница и курсы
+            response = self.client.get(self.url, {'currency': 'USD', 'fields': 'id,amount'})
+        self.assertEqual(set(response.data['results'][0]), {'id', 'amount', 'currency', 'exchange_rate'})
+
+    def test_rub_is_not_converted(self):
+        response = self.client.get(self.url, {'currency': 'RUB'})
+        self.assertNotIn('currency', response.data['results'][0])
+
+    def test_invalid_currency(self):
+        for currency in ('JPY', 'dollars'):
+            response = self.client.get(self.url, {'currency': currency})
+            self.assertEqual(response.status_code, 400)
+
+    async def test_async_view(self):
+        request = AsyncRequestFactory().get('/api/v1/users/1/transactions/', {'currency': 'USD', 'fields': 'amount'})
+        response = await AsyncGetUserTransactionsView.as_view()(request, user_id=1)
+
+        self.assertEqual(json.loads(response.content)['results'][0],
+                         {'amount': '0.37', 'currency': 'USD', 'exchange_rate': '0.011'})
@@ -0,0 +1,85 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from redis.exceptions import ConnectionError
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from main.exceptions import ConcurrencyConflict, IdempotencyKeyInProgress
+from main.models import IdempotencyRecord
+from main.services.idempotency import cache_store, idempotent_response, make_fingerprint
+from main.tests.test_exchange_rates import LOCMEM_CACHES
+
+
+@override_settings(CACHES=LOCMEM_CACHES, IDEMPOTENCY_WAIT_TIMEOUT=0.1, IDEMPOTENCY_POLL_INTERVAL=0.01)
+class IdempotentResponseTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+    def handler(self) -> Response:
+        self.calls += 1
+        return Response({'detail': 'ok', 'call': self.calls})
+
+    def test_handler_runs_once(self):
+        first = idempotent_response('deposit', 'k', {'amount': '1.00'}, self.handler)
+        second = idempotent_response('deposit', 'k', {'amount': '1.00'}, self.handler)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(second.data, first.data)
+
+    def test_pending_duplicate_times_out(self):
+        cache_store.reserve('idempotency:deposit:k', make_fingerprint({'amount': '1.00'}))
+        with self.assertRaises(IdempotencyKeyInProgress):
+            idempotent_response('deposit', 'k', {'amount': '1.00'}, self.handler)
+        self.assertEqual(self.calls, 0)
+
+    def test_database_fallback_when_redis_unavailable(self):
+        with mock.patch('django.core.cache.cache.add', side_effect=ConnectionError), \
+                mock.patch('django.core.cache.cache.get', side_effect=ConnectionError), \
+                mock.patch('django.core.cache.cache.set', side_effect=ConnectionError):
+            idempotent_response('deposit', 'k', {'amount': '1.00'}, self.handler)
+            replay = idempotent_response('deposit', 'k', {'amount': '1.00'}, self.handler)
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(replay.data, {'detail': 'ok', 'call': 1})
+        self.assertEqual(IdempotencyRecord.objects.get().status_code, 200)
+
+    def test_response_saved_in_database_when_redis_fails_after_reserve(self):
+        with mock.patch('django.core.cache.cache.set', side_effect=ConnectionError):
+            idempotent_response('deposit', 'k', {'amount': '1.00'}, self.handler)
+        self.assertEqual(IdempotencyRecord.objects.get().status_code, 200)
+
+        with mock.patch('django.core.cache.cache.add', side_effect=ConnectionError), \
+                mock.patch('django.core.cache.cache.get', side_effect=ConnectionError):
+            replay = idempotent_response('deposit', 'k', {'amount': '1.00'}, self.handler)
+        self.assertEqual(replay.data, {'detail': 'ok', 'call': 1})
+
+        # Незавершённая запись в Redis истекла: ответ берётся из базы данных и копируется в Redis
+        cache.delete('idempotency:deposit:k')
+        replay = idempotent_response('deposit', 'k', {'amount': '1.00'}, self.handler)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(replay['Idempotent-Replayed'], 'true')
+        self.assertEqual(cache.get('idempotency:deposit:k')['status_code'], 200)
+
+    def test_error_response_replayed(self):
+        def handler():
+            self.calls += 1
+            raise ValidationError({'error': 'Недостаточно средств на счете'})
+
+        first = idempotent_response('deposit', 'k', {'amount': '1.00'}, handler)
+        second = idempotent_response('deposit', 'k', {'amount': '1.00'}, handler)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(first.status_code, 400)
+        self.assertEqual(second.status_code, 400)
+        self.assertEqual(second.data, first.data)
+
+    def test_key_released_after_concurrency_conflict(self):
+        def handler():
+            self.calls += 1
+            raise ConcurrencyConflict()
+
+        with self.assertRaises(ConcurrencyConflict):
+            idempotent_response('deposit', 'k', {'amount': '1.00'}, handler)
+        idempotent_response('deposit', 'k', {'amount': '1.00'}, self.handler)
+        self.assertEqual(self.calls, 2)
@@ -0,0 +1,119 @@
+import json
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from main.models import Balance, IngestCheckpoint, Transaction
+from main.services.ingest import IngestErrors
+from main.services.transaction_service import process_batch
+from main.tests.test_exchange_rates import LOCMEM_CACHES
+
+OPERATIONS = [
+    {'operation': 'deposit', 'to_user_id': 1, 'amount': '100.00', 'comment': 'пополнение'},
+    {'operation': 'transfer', 'from_user_id': 1, 'to_user_id': 2, 'amount': '30.00'},
+    {'operation': 'withdrawal', 'from_user_id': 2, 'amount': '500.00'},
+    {'operation': 'withdrawal', 'from_user_id': 1, 'amount': '20.00'},
+]
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class IngestOperationsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / 'operations.jsonl'
+
+    def write(self, lines, mode='w'):
+        with self.path.open(mode, encoding='utf-8') as file:
+            for line in lines:
+                file.write((line if isinstance(line, str) else json.dumps(line, ensure_ascii=False)) + '\n')
+
+    def ingest(self, *args):
+        stdout, stderr = StringIO(), StringIO()
+        call_command('ingest_operations', str(self.path), *args, stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def amounts(self):
+        return dict(Balance.objects.values_list('user_id', 'amount'))
+
+    def test_ingest_applies_operations_in_order(self):
+        self.write(OPERATIONS)
+        stdout, stderr = self.ingest('--batch-size', '2')
+
+        self.assertEqual(self.amounts(), {1: Decimal('50.00'), 2: Decimal('30.00')})
+        self.assertEqual(Transaction.objects.count(), 4)
+        self.assertIn('Строка 3', stderr)
+        self.assertIn('строк/с', stdout)
+
+        checkpoint = IngestCheckpoint.objects.get()
+        self.assertEqual((checkpoint.lines, checkpoint.applied, checkpoint.rejected), (4, 3, 1))
+        self.assertEqual(checkpoint.offset, self.path.stat().st_size)
+
+    def test_invalid_lines_are_rejected(self):
+        self.write(['{broken', '', ['deposit'], {'operation': 'deposit', 'amount': '1.00'}, OPERATIONS[0]])
+        _, stderr = self.ingest()
+
+        self.assertEqual(self.amounts(), {1: Decimal('100.00')})
+        self.assertEqual(IngestCheckpoint.objects.get().rejected, 3)
+        self.assertIn('Строка 1', stderr)
+        self.assertIn('Строка 4', stderr)
+
+    def test_reported_errors_are_bounded(self):
+        self.write([OPERATIONS[2]] * 3 + ['{broken'] * 3)
+        _, stderr = self.ingest('--batch-size', '2', '--max-errors', '2')
+
+        self.assertIn('Строка 1:', stderr)
+        self.assertIn('Строка 2:', stderr)
+        self.assertNotIn('Строка 3:', stderr)
+        self.assertIn('... и ещё 4 ошибочных строк', stderr)
+
+    def test_errors_keep_first_lines(self):
+        errors = IngestErrors(2)
+        errors.extend([(5, 'e5'), (3, 'e3'), (9, 'e9'), (1, 'e1')])
+
+        self.assertEqual(len(errors), 4)
+        self.assertEqual(errors.first(), [(1, 'e1'), (3, 'e3')])
+
+    def test_rerun_resumes_after_checkpoint(self):
+        self.write(OPERATIONS[:2])
+        self.ingest()
+        self.write(OPERATIONS[3:], mode='a')
+        self.ingest()
+
+        self.assertEqual(self.amounts(), {1: Decimal('50.00'), 2: Decimal('30.00')})
+        self.assertEqual(IngestCheckpoint.objects.get().lines, 3)
+
+    def test_resume_after_crash(self):
+        self.write(OPERATIONS)
+        calls = []
+
+        def crash_on_second_batch(*args, **kwargs):
+            calls.append(args)
+            if len(calls) == 2:
+                raise RuntimeError('сбой')
+            return process_batch(*args, **kwargs)
+
+        with mock.patch('main.services.ingest.process_batch', side_effect=crash_on_second_batch):
+            with self.assertRaises(RuntimeError):
+                self.ingest('--batch-size', '2')
+
+        self.assertEqual(IngestCheckpoint.objects.get().lines, 2)
+        self.assertEqual(self.amounts(), {1: Decimal('70.00'), 2: Decimal('30.00')})
+
+        self.ingest('--batch-size', '2')
+        self.assertEqual(self.amounts(), {1: Decimal('50.00'), 2: Decimal('30.00')})
+        self.assertEqual(Transaction.objects.count(), 4)
+
+    def test_restart(self):
+        self.write(OPERATIONS[:1])
+        self.ingest()
+        self.ingest('--restart')
+
+        self.assertEqual(self.amounts(), {1: Decimal('200.00')})
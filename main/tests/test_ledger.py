@@ -0,0 +1,146 @@
+from datetime import timedelta
+from decimal import Decimal
+from importlib import import_module
+from types import SimpleNamespace
+
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils.timezone import now
+
+from main.enums import TransactionType
+from main.models import Balance, LedgerOutbox, Transaction
+from main.services.ledger import flush_outbox, get_outbox_stats, get_pending_transactions
+from main.services.transaction_service import process_batch, process_transaction, render_comment
+from main.tasks import flush_ledger_outbox
+
+
+@override_settings(LEDGER_MODE='outbox')
+class LedgerOutboxTests(TestCase):
+    def setUp(self):
+        Balance.objects.create(user_id=1, amount=Decimal('100.00'))
+        Balance.objects.create(user_id=2, amount=Decimal('50.00'))
+
+    def transfer(self, amount='10.00', comment=None):
+        data = {'operation': TransactionType.TRANSFER.value, 'from_user_id': 1, 'to_user_id': 2,
+                'amount': Decimal(amount)}
+        if comment:
+            data['comment'] = comment
+        return process_transaction(data)
+
+    def test_transaction_writes_single_outbox_entry(self):
+        self.transfer(comment='за обед')
+
+        self.assertEqual(LedgerOutbox.objects.count(), 1)
+        self.assertFalse(Transaction.objects.exists())
+        self.assertEqual(LedgerOutbox.objects.get().comment, 'за обед')
+
+    def test_flush_moves_entries_to_ledger(self):
+        result = self.transfer(comment='за обед')
+        entry = LedgerOutbox.objects.get()
+
+        self.assertEqual(flush_outbox(), 1)
+        self.assertFalse(LedgerOutbox.objects.exists())
+
+        sender = Transaction.objects.get(user_id=1)
+        recipient = Transaction.objects.get(user_id=2)
+        self.assertEqual(sender.created_at, entry.created_at)
+        self.assertEqual(sender.balance_after, Decimal('90.00'))
+        self.assertEqual(recipient.balance_after, Decimal('60.00'))
+        self.assertEqual(sender.comment, 'за обед')
+        self.assertIn(result['completed_at'], render_comment(sender))
+        self.assertTrue(render_comment(sender).endswith('Комментарий: за обед'))
+
+    def test_flush_is_exactly_once(self):
+        self.transfer()
+        self.transfer()
+
+        self.assertEqual(flush_outbox(batch_size=1), 2)
+        self.assertEqual(flush_outbox(), 0)
+        self.assertEqual(Transaction.objects.count(), 4)
+
+    def test_batch_writes_outbox_entries(self):
+        process_batch([
+            {'operation': TransactionType.DEPOSIT.value, 'to_user_id': 1, 'amount': Decimal('5.00')},
+            {'operation': TransactionType.WITHDRAWAL.value, 'from_user_id': 2, 'amount': Decimal('5.00')},
+        ])
+
+        self.assertEqual(LedgerOutbox.objects.count(), 2)
+        flush_outbox()
+        self.assertEqual(Transaction.objects.count(), 2)
+
+    def test_pending_transactions_of_user(self):
+        self.transfer()
+        pending = get_pending_transactions(2)
+
+        self.assertEqual(len(pending), 1)
+        self.assertEqual(pending[0].user_id, 2)
+        self.assertIsNone(pending[0].id)
+
+    def test_history_includes_pending_transactions(self):
+        Transaction.objects.create(user_id=1, operation=TransactionType.DEPOSIT.value, amount=Decimal('100.00'),
+                                   created_at=now() - timedelta(minutes=1))
+        self.transfer()
+
+        response = self.client.get(reverse('get_user_transactions', kwargs={'user_id': 1}))
+        self.assertEqual([row['operation'] for row in response.data['results']],
+                         [TransactionType.TRANSFER.value, TransactionType.DEPOSIT.value])
+
+        response = self.client.get(reverse('get_user_transactions', kwargs={'user_id': 2}))
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_outbox_stats(self):
+        self.assertEqual(get_outbox_stats()['pending'], 0)
+        self.transfer()
+
+        url = reverse('ledger_outbox_stats')
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.force_login(User.objects.create_user('admin', is_staff=True))
+        response = self.client.get(url)
+        self.assertEqual(response.data['mode'], 'outbox')
+        self.assertEqual(response.data['pending'], 1)
+        self.assertGreaterEqual(response.data['lag_seconds'], 0)
+
+    def test_flush_task_in_sync_mode(self):
+        self.transfer()
+
+        with override_settings(LEDGER_MODE='sync'):
+            # Оставшиеся после переключения режима записи переносятся
+            flush_ledger_outbox()
+            self.assertFalse(LedgerOutbox.objects.exists())
+            self.assertEqual(Transaction.objects.count(), 2)
+
+            with self.assertNumQueries(1):
+                flush_ledger_outbox()
+
+
+class CompactCommentsMigrationTests(TestCase):
+    migration = import_module('main.migrations.0012_compact_transaction_comments')
+
+    def setUp(self):
+        self.schema_editor = SimpleNamespace(connection=connection)
+        self.records = [
+            Transaction.objects.create(user_id=1, operation=operation, amount=Decimal('10.00'),
+                                       balance_after=Decimal('110.00'), comment=comment)
+            for operation, comment in ((TransactionType.DEPOSIT.value, ''),
+                                       (TransactionType.TRANSFER.value, 'за обед; Комментарий: десерт\nи кофе'),
+                                       (TransactionType.WITHDRAWAL.value, 'наличные'))
+        ]
+        self.rendered = [render_comment(record) for record in self.records]
+
+    def test_compact_and_expand(self):
+        Transaction.objects.bulk_update(
+            [Transaction(id=record.id, comment=rendered) for record, rendered in zip(self.records, self.rendered)],
+            ['comment'])
+        Transaction.objects.create(user_id=1, operation=TransactionType.DEPOSIT.value, comment='Зачисление вручную')
+
+        self.migration.compact_comments(apps, self.schema_editor)
+        self.assertEqual(list(Transaction.objects.order_by('id').values_list('comment', flat=True)),
+                         ['', 'за обед; Комментарий: десерт\nи кофе', 'наличные', 'Зачисление вручную'])
+
+        Transaction.objects.filter(comment='Зачисление вручную').delete()
+        self.migration.expand_comments(apps, self.schema_editor)
+        self.assertEqual(list(Transaction.objects.order_by('id').values_list('comment', flat=True)), self.rendered)
@@ -0,0 +1,92 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from main.async_views import AsyncGetUserBalanceView
+from main.enums import TransactionType
+from main.middleware import RequestMetricsMiddleware
+from main.models import Balance
+from main.services.metrics import phase_seconds, render_metrics, request_queries
+from main.services.stats import Histogram
+from main.tests.test_exchange_rates import LOCMEM_CACHES
+
+
+class HistogramTests(TestCase):
+    def test_observe_and_render_cumulative_buckets(self):
+        histogram = Histogram(buckets=(0.1, 1.0))
+        histogram.observe(('a',), 0.05)
+        histogram.observe(('a',), 0.5)
+        histogram.observe(('a',), 5)
+
+        counts, total, count = histogram.snapshot()[('a',)]
+        self.assertEqual(counts, [1, 1, 1])
+        self.assertEqual((total, count), (5.55, 3))
+
+    def test_bucket_upper_bound_is_inclusive(self):
+        histogram = Histogram(buckets=(1.0, 2.0))
+        histogram.observe(('a',), 1.0)
+        self.assertEqual(histogram.snapshot()[('a',)][0], [1, 0, 0])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class MetricsEndpointTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Balance.objects.create(user_id=1, amount=Decimal('100.00'))
+
+    def test_transaction_phases_and_query_counts(self):
+        before = phase_seconds.snapshot().get(('lock', TransactionType.TRANSFER.value), ([], 0, 0))[2]
+        response = self.client.post(reverse('transfer'), {'operation': TransactionType.TRANSFER.value,
+                                                          'from_user_id': 1, 'to_user_id': 2, 'amount': '10.00'},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+
+        phases = phase_seconds.snapshot()
+        self.assertEqual(phases[('lock', TransactionType.TRANSFER.value)][2], before + 1)
+        for phase in ('validate', 'execute', 'save', 'record', 'commit'):
+            self.assertIn((phase, TransactionType.TRANSFER.value), phases)
+        self.assertGreater(request_queries.snapshot()[('transfer', 'POST')][1], 0)
+
+    def test_query_counts(self):
+        before = request_queries.snapshot().get(('get_user_balance', 'GET'), ([], 0, 0))[1]
+        with self.assertNumQueries(1):
+            self.client.get(reverse('get_user_balance', args=[1]))
+        self.assertEqual(request_queries.snapshot()[('get_user_balance', 'GET')][1], before + 1)
+
+    async def test_query_counts_under_asgi(self):
+        # Запросы ORM исполняются в потоке sync_to_async, а не в потоке цикла событий
+        before = request_queries.snapshot().get(('get_user_balance', 'GET'), ([], 0, 0))[1]
+        await self.async_client.get(reverse('get_user_balance', args=[1]))
+        self.assertEqual(request_queries.snapshot()[('get_user_balance', 'GET')][1], before + 1)
+
+        await cache.aclear()
+
+        async def async_view(request):
+            return await AsyncGetUserBalanceView.as_view()(request, user_id=1)
+
+        before = request_queries.snapshot().get(('unmatched', 'GET'), ([], 0, 0))[1]
+        await RequestMetricsMiddleware(async_view)(AsyncRequestFactory().get('/api/v1/users/1/balance/'))
+        self.assertEqual(request_queries.snapshot()[('unmatched', 'GET')][1], before + 1)
+
+    def test_metrics_endpoint_renders_prometheus_text(self):
+        self.client.post(reverse('deposit'), {'operation': TransactionType.DEPOSIT.value, 'to_user_id': 1,
+                                              'amount': '1.00'}, content_type='application/json')
+        # Зачисление исполняется без блокировок, счётчики lock_stats появляются после перевода
+        self.client.post(reverse('transfer'), {'operation': TransactionType.TRANSFER.value, 'from_user_id': 1,
+                                               'to_user_id': 2, 'amount': '1.00'}, content_type='application/json')
+
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+
+        text = response.content.decode()
+        self.assertIn('# TYPE balance_phase_seconds histogram', text)
+        self.assertIn('balance_phase_seconds_bucket{phase="validate",operation="deposit",le="+Inf"}', text)
+        self.assertIn('balance_request_queries_count{view="deposit",method="POST"}', text)
+        self.assertIn('balance_lock_lock_acquisitions_total', text)
+        self.assertEqual(text, text.strip() + '\n')
+
+    def test_render_without_observations(self):
+        self.assertIn('# TYPE balance_request_seconds histogram', render_metrics())
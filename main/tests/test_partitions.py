@@ -0,0 +1,65 @@
+import datetime
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, TestCase
+
+from main.services.partitions import (Partition, add_months, archive_partition, is_partitioned, parse_partition,
+                                      partition_name)
+
+
+class PartitionHelpersTests(SimpleTestCase):
+    def test_add_months(self):
+        self.assertEqual(add_months(datetime.date(2026, 11, 20), 1), datetime.date(2026, 12, 1))
+        self.assertEqual(add_months(datetime.date(2026, 12, 5), 1), datetime.date(2027, 1, 1))
+        self.assertEqual(add_months(datetime.date(2026, 1, 31), -1), datetime.date(2025, 12, 1))
+
+    def test_partition_name(self):
+        self.assertEqual(partition_name(datetime.date(2026, 3, 1)), 'main_transaction_p202603')
+
+    def test_parse_range_partition(self):
+        partition = parse_partition(
+            'main_transaction_p202603',
+            "FOR VALUES FROM ('2026-03-01 00:00:00+00') TO ('2026-04-01 00:00:00+00')"
+        )
+        self.assertEqual(partition.lower, datetime.datetime(2026, 3, 1, tzinfo=datetime.timezone.utc))
+        self.assertEqual(partition.upper, datetime.datetime(2026, 4, 1, tzinfo=datetime.timezone.utc))
+        self.assertFalse(partition.is_default)
+
+    def test_parse_legacy_and_default_partitions(self):
+        legacy = parse_partition('main_transaction_legacy',
+                                 "FOR VALUES FROM (MINVALUE) TO ('2026-11-01 00:00:00+00')")
+        self.assertIsNone(legacy.lower)
+        self.assertEqual(legacy.upper.date(), datetime.date(2026, 11, 1))
+        self.assertTrue(parse_partition('main_transaction_default', 'DEFAULT').is_default)
+
+
+class ManagePartitionsCommandTests(TestCase):
+    def test_requires_partitioned_table(self):
+        self.assertFalse(is_partitioned())
+        with self.assertRaises(CommandError):
+            call_command('manage_partitions', 'status')
+
+
+class ArchivePartitionTests(TestCase):
+    def setUp(self):
+        self.partition = Partition('main_transaction_p202601')
+        patcher = mock.patch('main.services.partitions.connection')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @mock.patch('main.services.partitions.detach_partition')
+    @mock.patch('main.services.partitions.archive_table', side_effect=OSError('нет места на диске'))
+    def test_partition_stays_attached_if_export_fails(self, archive_table, detach_partition):
+        with self.assertRaises(OSError):
+            archive_partition(self.partition, Path('/backups'))
+        detach_partition.assert_not_called()
+
+    @mock.patch('main.services.partitions.detach_partition')
+    @mock.patch('main.services.partitions.archive_table', return_value=Path('/backups/main_transaction_p202601.csv.gz'))
+    def test_export_then_detach(self, archive_table, detach_partition):
+        self.assertEqual(archive_partition(self.partition, Path('/backups')), archive_table.return_value)
+        archive_table.assert_called_once_with(self.partition.name, Path('/backups'))
+        detach_partition.assert_called_once_with(self.partition)
@@ -0,0 +1,109 @@
+import datetime
+from decimal import Decimal
+
+import httpx
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils.timezone import localdate, now
+from rest_framework.exceptions import APIException
+
+from main.models import ExchangeRate, ExchangeRateSnapshot
+from main.services.exchange_rates import get_exchange_rate, local_rates
+from main.services.rates_refresh import REFRESH_LOCK_KEY, publish_rates, refresh_exchange_rates
+from main.tests.test_exchange_rates import LOCMEM_CACHES
+
+RATES = {'result': 'success', 'base_code': 'RUB', 'conversion_rates': {'RUB': 1, 'USD': 0.0125, 'EUR': 0.0109}}
+
+
+class StubRatesAPI:
+    """
+    Заглушка API курсов валют: отдаёт заданные ответы по очереди, последний - на все остальные запросы.
+    """
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+        self.transport = httpx.MockTransport(self.handle)
+
+    def handle(self, request):
+        self.calls += 1
+        response = self.responses[min(self.calls, len(self.responses)) - 1]
+        if isinstance(response, Exception):
+            raise response
+        status_code, body = response
+        return httpx.Response(status_code, json=body)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, EXCHANGE_RATES_FETCH_BACKOFF=0, EXCHANGE_RATES_FETCH_ATTEMPTS=3,
+                   EXCHANGE_RATES_FRESH_TTL=3600, EXCHANGE_RATES_STALE_TTL=7200, EXCHANGE_RATES_REFRESH_AHEAD=600,
+                   EXCHANGE_RATES_L1_TTL=0)
+class RatesRefreshTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        local_rates.clear()
+
+    def test_refresh_publishes_rates_and_snapshot(self):
+        api = StubRatesAPI((200, RATES))
+
+        self.assertTrue(refresh_exchange_rates(transport=api.transport))
+        self.assertEqual(get_exchange_rate('USD'), Decimal('0.0125'))
+
+        snapshot = ExchangeRateSnapshot.objects.get()
+        self.assertEqual(snapshot.rates['EUR'], '0.0109')
+        self.assertEqual(snapshot.stale_until - snapshot.fresh_until, datetime.timedelta(seconds=3600))
+        self.assertEqual(ExchangeRate.objects.get(currency='USD', date=localdate(snapshot.fetched_at)).rate,
+                         Decimal('0.0125'))
+
+    def test_transient_errors_are_retried(self):
+        api = StubRatesAPI(httpx.ConnectError('сбой'), (503, {}), (200, RATES))
+
+        self.assertTrue(refresh_exchange_rates(transport=api.transport))
+        self.assertEqual(api.calls, 3)
+
+    def test_client_errors_and_invalid_responses_are_not_retried(self):
+        for response in ((403, {'result': 'error'}), (200, {'conversion_rates': {'USD': -1}}),
+                         (200, {'result': 'error', 'error-type': 'invalid-key'})):
+            with self.subTest(response=response):
+                api = StubRatesAPI(response)
+                self.assertFalse(refresh_exchange_rates(transport=api.transport))
+                self.assertEqual(api.calls, 1)
+
+    def test_stale_rates_served_when_api_is_down(self):
+        publish_rates({'USD': '0.0125'}, now() - datetime.timedelta(seconds=3500))
+        api = StubRatesAPI((500, {}))
+
+        self.assertFalse(refresh_exchange_rates(transport=api.transport))
+        self.assertEqual(api.calls, 3)
+        self.assertEqual(get_exchange_rate('USD'), Decimal('0.0125'))
+
+    def test_refresh_ahead_of_expiry(self):
+        publish_rates({'USD': '0.0125'}, now())
+        api = StubRatesAPI((200, RATES))
+
+        self.assertFalse(refresh_exchange_rates(transport=api.transport))
+        self.assertEqual(api.calls, 0)
+
+        publish_rates({'USD': '0.0125'}, now() - datetime.timedelta(seconds=3100))
+        self.assertTrue(refresh_exchange_rates(transport=api.transport))
+        self.assertEqual(api.calls, 1)
+
+    def test_single_refresher(self):
+        cache.set(REFRESH_LOCK_KEY, 'другой воркер')
+        api = StubRatesAPI((200, RATES))
+
+        self.assertFalse(refresh_exchange_rates(transport=api.transport))
+        self.assertEqual(api.calls, 0)
+        self.assertEqual(cache.get(REFRESH_LOCK_KEY), 'другой воркер')
+
+    def test_cold_cache_restored_from_snapshot(self):
+        publish_rates({'USD': '0.0125'}, now() - datetime.timedelta(seconds=5000))
+        cache.clear()
+
+        self.assertEqual(get_exchange_rate('USD'), Decimal('0.0125'))
+
+    def test_expired_snapshot_is_not_served(self):
+        publish_rates({'USD': '0.0125'}, now() - datetime.timedelta(seconds=8000))
+        cache.clear()
+
+        with self.assertRaises(APIException):
+            get_exchange_rate('USD')
@@ -0,0 +1,57 @@
+from django.db import OperationalError
+from django.test import SimpleTestCase, override_settings
+
+from main.exceptions import ConcurrencyConflict
+from main.services.retry import retry_on_conflict, retry_stats
+
+
+class FakeDriverError(Exception):
+    def __init__(self, sqlstate: str):
+        super().__init__(sqlstate)
+        self.sqlstate = sqlstate
+
+
+def make_db_error(sqlstate: str) -> OperationalError:
+    error = OperationalError(sqlstate)
+    error.__cause__ = FakeDriverError(sqlstate)
+    return error
+
+
+@override_settings(TRANSACTION_RETRY_ATTEMPTS=3, TRANSACTION_RETRY_BACKOFF=0)
+class RetryOnConflictTests(SimpleTestCase):
+    def test_retries_deadlock_until_success(self):
+        calls = []
+
+        @retry_on_conflict
+        def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise make_db_error('40P01')
+            return 'done'
+
+        before = retry_stats.snapshot()
+        self.assertEqual(flaky(), 'done')
+        self.assertEqual(len(calls), 3)
+        delta = retry_stats.diff(retry_stats.snapshot(), before)
+        self.assertEqual(delta['deadlocks'], 2)
+        self.assertEqual(delta['retries'], 2)
+
+    def test_raises_conflict_after_attempts_exhausted(self):
+        @retry_on_conflict
+        def always_fails():
+            raise make_db_error('40001')
+
+        with self.assertRaises(ConcurrencyConflict):
+            always_fails()
+
+    def test_does_not_retry_other_errors(self):
+        calls = []
+
+        @retry_on_conflict
+        def broken():
+            calls.append(1)
+            raise make_db_error('23505')
+
+        with self.assertRaises(OperationalError):
+            broken()
+        self.assertEqual(len(calls), 1)
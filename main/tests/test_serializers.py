@@ -70,4 +70,6 @@ class UserTransactionsListSerializerTests(TestCase):
         self.assertEqual(Decimal(data['balance_after']), Decimal('80.00'))
         self.assertEqual(Decimal(data['amount']), Decimal('20.00'))
         self.assertEqual(data['operation'], TransactionType.TRANSFER.value)
-        self.assertEqual(data['comment'], 'Test transfer')
+        self.assertEqual(data['comment'],
+                         f'Перевод на сумму 20.00; Баланс: 80.00; '
+                         f'Время исполнения: {self.transaction.created_at:%d.%m.%Y %H:%M:%S}; Комментарий: Test transfer')
@@ -0,0 +1,138 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.exceptions import ValidationError
+
+from main.enums import TransactionType
+from main.models import Balance, BalanceShard, Transaction
+from main.services.sharding import demote, load_balances, promote, sharded_accounts
+from main.services.transaction_service import process_batch, process_transaction
+from main.tests.test_exchange_rates import LOCMEM_CACHES
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ShardedBalanceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        sharded_accounts.clear()
+        Balance.objects.create(user_id=1, amount=Decimal('100.00'))
+        Balance.objects.create(user_id=2, amount=Decimal('10.00'))
+        promote(1, 4)
+
+    def deposit(self, user_id, amount):
+        return process_transaction({'operation': TransactionType.DEPOSIT.value, 'to_user_id': user_id,
+                                    'amount': Decimal(amount)})
+
+    def withdraw(self, user_id, amount):
+        return process_transaction({'operation': TransactionType.WITHDRAWAL.value, 'from_user_id': user_id,
+                                    'amount': Decimal(amount)})
+
+    def test_promote_creates_slots(self):
+        self.assertEqual(BalanceShard.objects.filter(user_id=1).count(), 4)
+        self.assertEqual(load_balances([1])[1].amount, Decimal('100.00'))
+
+    def test_deposit_goes_to_slot(self):
+        for _ in range(5):
+            result = self.deposit(1, '10.00')
+
+        self.assertEqual(Balance.objects.get(user_id=1).amount, Decimal('100.00'))
+        self.assertEqual(load_balances([1])[1].amount, Decimal('150.00'))
+        self.assertEqual(result['to_balance_after'], Decimal('150.00'))
+        self.assertEqual(Transaction.objects.filter(user_id=1).count(), 5)
+
+    def test_withdrawal_draws_from_slot(self):
+        self.deposit(1, '50.00')
+        result = self.withdraw(1, '120.00')
+
+        self.assertEqual(result['from_balance_after'], Decimal('30.00'))
+        self.assertEqual(load_balances([1])[1].amount, Decimal('30.00'))
+
+    def test_withdrawal_consolidates_split_funds(self):
+        BalanceShard.objects.filter(user_id=1, slot__in=[0, 1]).update(amount=Decimal('20.00'))
+        result = self.withdraw(1, '130.00')
+
+        self.assertEqual(result['from_balance_after'], Decimal('10.00'))
+        self.assertEqual(Balance.objects.get(user_id=1).amount, Decimal('10.00'))
+        self.assertFalse(BalanceShard.objects.filter(user_id=1, amount__gt=0).exists())
+
+    def test_withdrawal_insufficient_funds(self):
+        self.deposit(1, '10.00')
+        with self.assertRaises(ValidationError):
+            self.withdraw(1, '110.01')
+        self.assertEqual(load_balances([1])[1].amount, Decimal('110.00'))
+
+    @override_settings(BALANCE_SHARDS_REFRESH_INTERVAL=3600)
+    def test_withdrawal_with_stale_sharded_accounts(self):
+        sharded_accounts.clear()
+        sharded_accounts.get_shard_count(1)
+        promote(2, 2)
+        BalanceShard.objects.filter(user_id=2, slot=0).update(amount=Decimal('40.00'))
+
+        result = self.withdraw(2, '45.00')
+        self.assertEqual(result['from_balance_after'], Decimal('5.00'))
+
+    @override_settings(BALANCE_SHARDS_REFRESH_INTERVAL=3600)
+    def test_deposit_with_stale_sharded_accounts(self):
+        sharded_accounts.clear()
+        sharded_accounts.get_shard_count(1)
+        promote(2, 2)
+        BalanceShard.objects.filter(user_id=2, slot=0).update(amount=Decimal('40.00'))
+
+        result = self.deposit(2, '5.00')
+        self.assertEqual(result['to_balance_before'], Decimal('50.00'))
+        self.assertEqual(result['to_balance_after'], Decimal('55.00'))
+        self.assertEqual(load_balances([2])[2].amount, Decimal('55.00'))
+
+    def test_transfer_consolidates_sharded_balances(self):
+        self.deposit(1, '25.00')
+        result = process_transaction({'operation': TransactionType.TRANSFER.value, 'from_user_id': 2,
+                                      'to_user_id': 1, 'amount': Decimal('5.00')})
+
+        self.assertEqual(result['to_balance_before'], Decimal('125.00'))
+        self.assertEqual(result['to_balance_after'], Decimal('130.00'))
+        self.assertEqual(Balance.objects.get(user_id=1).amount, Decimal('130.00'))
+
+    def test_batch_consolidates_sharded_balances(self):
+        self.deposit(1, '25.00')
+        results = process_batch([
+            {'operation': TransactionType.WITHDRAWAL.value, 'from_user_id': 1, 'amount': Decimal('120.00')},
+        ])
+
+        self.assertEqual(results[0]['from_balance_after'], Decimal('5.00'))
+        self.assertEqual(load_balances([1])[1].amount, Decimal('5.00'))
+
+    def test_demote_restores_single_row(self):
+        self.deposit(1, '25.00')
+        version = load_balances([1])[1].version
+        balance = demote(1)
+
+        self.assertEqual(balance.amount, Decimal('125.00'))
+        self.assertEqual(balance.shard_count, 0)
+        self.assertGreater(balance.version, version)
+        self.assertFalse(BalanceShard.objects.filter(user_id=1).exists())
+
+    def test_deposit_after_demote_with_stale_sharded_accounts(self):
+        sharded_accounts.get_shard_count(1)
+        demote(1)
+        self.deposit(1, '25.00')
+        self.assertEqual(Balance.objects.get(user_id=1).amount, Decimal('125.00'))
+
+    def test_balance_endpoints_return_total(self):
+        self.deposit(1, '25.00')
+        cache.clear()
+
+        response = self.client.get(reverse('get_user_balance', kwargs={'user_id': 1}))
+        self.assertEqual(response.data['balance'], '125.00')
+
+        response = self.client.get(reverse('get_balances'), {'user_ids': '1,2'})
+        self.assertEqual(response.data['balances'][1]['RUB'], '125.00')
+
+    def test_cached_balance_refreshed_after_deposit(self):
+        self.deposit(1, '25.00')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.deposit(1, '5.00')
+
+        response = self.client.get(reverse('get_user_balance', kwargs={'user_id': 1}))
+        self.assertEqual(response.data['balance'], '130.00')
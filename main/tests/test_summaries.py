@@ -0,0 +1,122 @@
+import datetime
+from decimal import Decimal
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils.timezone import localdate, now
+
+from main.enums import TransactionType
+from main.models import Balance, Transaction, UserPeriodSummary
+from main.services.sharding import promote, sharded_accounts
+from main.services.summaries import get_summaries, rebuild_summaries
+from main.services.transaction_service import process_batch, process_transaction
+from main.tests.test_exchange_rates import LOCMEM_CACHES
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PeriodSummaryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        sharded_accounts.clear()
+        Balance.objects.create(user_id=1, amount=Decimal('100.00'))
+        Balance.objects.create(user_id=2, amount=Decimal('50.00'))
+
+    def summary(self, user_id, period=UserPeriodSummary.DAY):
+        return get_summaries(user_id, period)
+
+    def test_transactions_update_summaries(self):
+        process_transaction({'operation': TransactionType.DEPOSIT.value, 'to_user_id': 1, 'amount': Decimal('20.00')})
+        process_transaction({'operation': TransactionType.WITHDRAWAL.value, 'from_user_id': 1,
+                             'amount': Decimal('5.00')})
+        process_transaction({'operation': TransactionType.TRANSFER.value, 'from_user_id': 1, 'to_user_id': 2,
+                             'amount': Decimal('10.00')})
+
+        [sender] = self.summary(1)
+        self.assertEqual(sender['period_start'], localdate())
+        self.assertEqual(sender['deposited'], Decimal('20.00'))
+        self.assertEqual(sender['withdrawn'], Decimal('5.00'))
+        self.assertEqual(sender['transferred_out'], Decimal('10.00'))
+        self.assertEqual(sender['count'], 3)
+
+        [recipient] = self.summary(2, UserPeriodSummary.MONTH)
+        self.assertEqual(recipient['period_start'], localdate().replace(day=1))
+        self.assertEqual(recipient['transferred_in'], Decimal('10.00'))
+        self.assertEqual(recipient['count'], 1)
+
+    def test_batch_updates_summaries(self):
+        process_batch([
+            {'operation': TransactionType.DEPOSIT.value, 'to_user_id': 1, 'amount': Decimal('5.00')},
+            {'operation': TransactionType.DEPOSIT.value, 'to_user_id': 1, 'amount': Decimal('7.50')},
+        ])
+
+        self.assertEqual(UserPeriodSummary.objects.filter(user_id=1).count(), 2)
+        self.assertEqual(self.summary(1)[0]['deposited'], Decimal('12.50'))
+        self.assertEqual(self.summary(1)[0]['count'], 2)
+
+    def test_failed_transaction_does_not_update_summaries(self):
+        with self.assertRaises(Exception):
+            process_transaction({'operation': TransactionType.WITHDRAWAL.value, 'from_user_id': 2,
+                                 'amount': Decimal('500.00')})
+
+        self.assertFalse(UserPeriodSummary.objects.exists())
+
+    def test_sharded_balance_summaries_are_summed_over_slots(self):
+        promote(1, 4)
+        for _ in range(8):
+            process_transaction({'operation': TransactionType.DEPOSIT.value, 'to_user_id': 1,
+                                 'amount': Decimal('1.00')})
+
+        self.assertEqual(self.summary(1)[0]['deposited'], Decimal('8.00'))
+        self.assertEqual(self.summary(1)[0]['count'], 8)
+
+    def test_rebuild_from_ledger(self):
+        day = now() - datetime.timedelta(days=40)
+        Transaction.objects.create(user_id=1, from_user_id=1, to_user_id=2, operation=TransactionType.TRANSFER.value,
+                                   amount=Decimal('3.00'), created_at=day)
+        Transaction.objects.create(user_id=2, from_user_id=1, to_user_id=2, operation=TransactionType.TRANSFER.value,
+                                   amount=Decimal('3.00'), created_at=day)
+        Transaction.objects.create(user_id=1, to_user_id=1, operation=TransactionType.DEPOSIT.value,
+                                   amount=Decimal('4.00'), created_at=day)
+
+        rebuild_summaries(localdate())
+        rebuild_summaries(localdate())
+
+        [sender] = self.summary(1)
+        self.assertEqual(sender['period_start'], localdate(day))
+        self.assertEqual(sender['transferred_out'], Decimal('3.00'))
+        self.assertEqual(sender['transferred_in'], Decimal('0.00'))
+        self.assertEqual(sender['deposited'], Decimal('4.00'))
+        self.assertEqual(sender['count'], 2)
+        self.assertEqual(self.summary(2, UserPeriodSummary.MONTH)[0]['transferred_in'], Decimal('3.00'))
+
+    @override_settings(TIME_ZONE='Pacific/Kiritimati')
+    def test_rebuild_command_uses_project_timezone(self):
+        call_command('rebuild_period_summaries', '--before', localdate().isoformat(), stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command('rebuild_period_summaries', '--before',
+                         (localdate() + datetime.timedelta(days=1)).isoformat(), stdout=StringIO())
+
+    def test_summary_endpoint(self):
+        process_transaction({'operation': TransactionType.DEPOSIT.value, 'to_user_id': 1, 'amount': Decimal('20.00')})
+        today = localdate()
+
+        response = self.client.get(reverse('get_user_summary', kwargs={'user_id': 1}),
+                                   {'period': 'month', 'from': today.replace(day=1).isoformat()})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['period'], 'month')
+        self.assertEqual(response.data['results'], [{
+            'period_start': today.replace(day=1).isoformat(), 'deposited': '20.00', 'withdrawn': '0.00',
+            'transferred_in': '0.00', 'transferred_out': '0.00', 'count': 1,
+        }])
+
+        response = self.client.get(reverse('get_user_summary', kwargs={'user_id': 1}),
+                                   {'to': (today - datetime.timedelta(days=1)).isoformat()})
+        self.assertEqual(response.data['results'], [])
+
+    def test_summary_endpoint_validates_params(self):
+        url = reverse('get_user_summary', kwargs={'user_id': 1})
+        self.assertEqual(self.client.get(url, {'period': 'year'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'from': '2026-02-01', 'to': '2026-01-01'}).status_code, 400)
@@ -1,7 +1,7 @@
 from decimal import Decimal
 
-from django.test import TestCase
-from rest_framework.exceptions import ValidationError
+from django.test import TestCase, override_settings
+from rest_framework.exceptions import ValidationError, NotFound
 
 from main.enums import TransactionType
 from main.models import Balance, Transaction
@@ -10,7 +10,10 @@ from main.services.transaction_service import (
     get_balances,
     execute_transaction,
     save_balances,
-    record_transaction
+    record_transaction,
+    process_batch,
+    lock_balances,
+    execute_conditional_update
 )
 
 
@@ -34,6 +37,15 @@ class TransactionServiceTests(TestCase):
         self.assertEqual(balances['to'], self.to_user)
         self.assertNotIn('from', balances)
 
+    def test_get_balances_deposit_creates_missing_balance(self):
+        balances = get_balances(None, 3, TransactionType.DEPOSIT.value)
+        self.assertEqual(balances['to'].user_id, 3)
+        self.assertTrue(Balance.objects.filter(user_id=3).exists())
+
+    def test_get_balances_withdrawal_missing_balance(self):
+        with self.assertRaises(NotFound):
+            get_balances(99, None, TransactionType.WITHDRAWAL.value)
+
     def test_execute_transaction_transfer_success(self):
         balances = {'from': self.from_user, 'to': self.to_user}
         result = execute_transaction(balances, Decimal('30.00'), TransactionType.TRANSFER.value)
@@ -67,6 +79,7 @@ class TransactionServiceTests(TestCase):
         balances['to'].amount += Decimal('10.00')
         save_balances(balances)
         self.assertEqual(Balance.objects.get(user_id=1).amount, Decimal('90.00'))
+        self.assertEqual(Balance.objects.get(user_id=1).version, 1)
         self.assertEqual(Balance.objects.get(user_id=2).amount, Decimal('60.00'))
 
     def test_process_transaction_transfer(self):
@@ -80,6 +93,24 @@ class TransactionServiceTests(TestCase):
         self.assertEqual(result['from_balance_after'], Decimal('80.00'))
         self.assertEqual(result['to_balance_after'], Decimal('70.00'))
 
+    def test_process_transaction_records_ledger(self):
+        data = {
+            'from_user_id': 1,
+            'to_user_id': 2,
+            'amount': Decimal('20.00'),
+            'operation': TransactionType.TRANSFER.value,
+            'comment': 'Test'
+        }
+        process_transaction(data)
+        self.assertEqual(Transaction.objects.get(user_id=1).balance_after, Decimal('80.00'))
+        self.assertEqual(Transaction.objects.get(user_id=2).balance_after, Decimal('70.00'))
+
+    def test_process_transaction_failure_records_nothing(self):
+        data = {'from_user_id': 1, 'amount': Decimal('500.00'), 'operation': TransactionType.WITHDRAWAL.value}
+        with self.assertRaises(ValidationError):
+            process_transaction(data)
+        self.assertFalse(Transaction.objects.exists())
+
     def test_record_transaction_creates_transactions(self):
         data = {
             'amount': Decimal('20.00'),
@@ -95,3 +126,85 @@ class TransactionServiceTests(TestCase):
         record_transaction(data, comment="Test")
         transactions = Transaction.objects.filter(user_id__in=[1, 2])
         self.assertEqual(transactions.count(), 2)
+
+    def test_lock_balances_creates_missing(self):
+        balances = lock_balances([1, 2, 3], create_missing=[3])
+        self.assertEqual(sorted(balances), [1, 2, 3])
+        self.assertEqual(balances[3].amount, Decimal('0.00'))
+
+    def test_process_batch_applies_operations_in_order(self):
+        operations = [
+            {'to_user_id': 3, 'amount': Decimal('10.00'), 'operation': TransactionType.DEPOSIT.value},
+            {'from_user_id': 3, 'to_user_id': 1, 'amount': Decimal('10.00'),
+             'operation': TransactionType.TRANSFER.value},
+            {'from_user_id': 1, 'amount': Decimal('110.00'), 'operation': TransactionType.WITHDRAWAL.value},
+        ]
+        results = process_batch(operations)
+        self.assertEqual([result['status'] for result in results], ['ok', 'ok', 'ok'])
+        self.assertEqual(Balance.objects.get(user_id=1).amount, Decimal('0.00'))
+        self.assertEqual(Balance.objects.get(user_id=3).amount, Decimal('0.00'))
+        self.assertEqual(Transaction.objects.count(), 4)
+
+    def test_process_batch_atomic_rolls_back(self):
+        operations = [
+            {'to_user_id': 1, 'amount': Decimal('10.00'), 'operation': TransactionType.DEPOSIT.value},
+            {'from_user_id': 2, 'amount': Decimal('500.00'), 'operation': TransactionType.WITHDRAWAL.value},
+            {'to_user_id': 3, 'amount': Decimal('10.00'), 'operation': TransactionType.DEPOSIT.value},
+        ]
+        results = process_batch(operations, atomic=True)
+        self.assertEqual([result['status'] for result in results], ['rolled_back', 'error', 'skipped'])
+        self.assertEqual(Balance.objects.get(user_id=1).amount, Decimal('100.00'))
+        self.assertFalse(Balance.objects.filter(user_id=3).exists())
+        self.assertFalse(Transaction.objects.exists())
+
+    def test_process_batch_partial_skips_failed(self):
+        operations = [
+            {'from_user_id': 99, 'amount': Decimal('10.00'), 'operation': TransactionType.WITHDRAWAL.value},
+            {'to_user_id': 2, 'amount': Decimal('10.00'), 'operation': TransactionType.DEPOSIT.value},
+        ]
+        results = process_batch(operations, atomic=False)
+        self.assertEqual([result['status'] for result in results], ['error', 'ok'])
+        self.assertEqual(Balance.objects.get(user_id=2).amount, Decimal('60.00'))
+
+    def test_process_batch_partial_leaves_no_empty_balances(self):
+        operations = [
+            {'from_user_id': 1, 'to_user_id': 3, 'amount': Decimal('500.00'),
+             'operation': TransactionType.TRANSFER.value},
+            {'from_user_id': 99, 'to_user_id': 4, 'amount': Decimal('1.00'), 'operation': TransactionType.TRANSFER.value},
+            {'to_user_id': 5, 'amount': Decimal('1.00'), 'operation': TransactionType.DEPOSIT.value},
+            {'from_user_id': 5, 'to_user_id': 3, 'amount': Decimal('1.00'), 'operation': TransactionType.TRANSFER.value},
+        ]
+        results = process_batch(operations, atomic=False)
+        self.assertEqual([result['status'] for result in results], ['error', 'error', 'ok', 'ok'])
+        self.assertFalse(Balance.objects.filter(user_id=4).exists())
+        self.assertEqual(Balance.objects.get(user_id=3).amount, Decimal('1.00'))
+        self.assertEqual(Balance.objects.get(user_id=5).amount, Decimal('0.00'))
+
+    def test_execute_conditional_update_withdrawal(self):
+        balances, result = execute_conditional_update(1, None, Decimal('40.00'), TransactionType.WITHDRAWAL.value)
+        self.assertEqual(balances['from'].version, 1)
+        self.assertEqual(result['from_balance_before'], Decimal('100.00'))
+        self.assertEqual(result['from_balance_after'], Decimal('60.00'))
+        self.assertEqual(Balance.objects.get(user_id=1).amount, Decimal('60.00'))
+
+    def test_execute_conditional_update_withdrawal_insufficient_funds(self):
+        with self.assertRaises(ValidationError):
+            execute_conditional_update(1, None, Decimal('100.01'), TransactionType.WITHDRAWAL.value)
+        self.assertEqual(Balance.objects.get(user_id=1).amount, Decimal('100.00'))
+
+    def test_execute_conditional_update_withdrawal_missing_balance(self):
+        with self.assertRaises(NotFound):
+            execute_conditional_update(99, None, Decimal('1.00'), TransactionType.WITHDRAWAL.value)
+
+    def test_execute_conditional_update_deposit_creates_balance(self):
+        _, result = execute_conditional_update(None, 3, Decimal('15.50'), TransactionType.DEPOSIT.value)
+        self.assertEqual(result['to_balance_before'], Decimal('0.00'))
+        self.assertEqual(result['to_balance_after'], Decimal('15.50'))
+        self.assertEqual(Balance.objects.get(user_id=3).amount, Decimal('15.50'))
+
+    @override_settings(TRANSACTION_ENGINE='locking')
+    def test_process_transaction_locking_engine(self):
+        data = {'to_user_id': 2, 'amount': Decimal('5.00'), 'operation': TransactionType.DEPOSIT.value}
+        result = process_transaction(data)
+        self.assertEqual(result['to_balance_before'], Decimal('50.00'))
+        self.assertEqual(result['to_balance_after'], Decimal('55.00'))
@@ -1,20 +1,33 @@
+import json
+from datetime import datetime, timezone
 from decimal import Decimal
 
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 
 from main.enums import TransactionType
 from main.models import Balance, Transaction
+from main.serializers import UserTransactionsListSerializer
+from main.services.exchange_rates import local_rates, store_exchange_rates
+from main.tests.test_exchange_rates import LOCMEM_CACHES
 
 
+@override_settings(CACHES=LOCMEM_CACHES)
 class TransactionTests(APITestCase):
     def setUp(self):
+        cache.clear()
         self.user_id = 1
         self.balance = Balance.objects.create(user_id=self.user_id, amount=Decimal('100.00'))
         self.deposit_url = reverse('deposit')
         self.withdrawal_url = reverse('withdrawal')
         self.transfer_url = reverse('transfer')
+        self.batch_url = reverse('batch')
         self.balance_url = reverse('get_user_balance', args=[self.user_id])
 
     def test_get_user_balance(self):
@@ -24,6 +37,15 @@ class TransactionTests(APITestCase):
         self.assertEqual(response.data['balance'], '100.00')
         self.assertEqual(response.data['currency'], 'RUB')
 
+    def test_get_user_balance_served_from_cache_after_deposit(self):
+        data = {'to_user_id': self.user_id, 'amount': '25.00', 'operation': TransactionType.DEPOSIT.value}
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(self.deposit_url, data=data, format='json')
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.balance_url)
+        self.assertEqual(response.data['balance'], '125.00')
+
     def test_deposit(self):
         data = {
             'from_user_id': self.user_id,
@@ -50,6 +72,35 @@ class TransactionTests(APITestCase):
         self.assertEqual(self.balance.amount, Decimal('50.00'))
         self.assertTrue(Transaction.objects.filter(user_id=self.user_id).exists())
 
+    def test_idempotent_retry_replays_response(self):
+        data = {'from_user_id': self.user_id, 'amount': '30.00', 'operation': TransactionType.WITHDRAWAL.value}
+        first = self.client.post(self.withdrawal_url, data=data, format='json', HTTP_IDEMPOTENCY_KEY='key-1')
+        retry = self.client.post(self.withdrawal_url, data=data, format='json', HTTP_IDEMPOTENCY_KEY='key-1')
+        self.assertEqual(retry.status_code, status.HTTP_200_OK)
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.balance.refresh_from_db()
+        self.assertEqual(self.balance.amount, Decimal('70.00'))
+        self.assertEqual(Transaction.objects.filter(user_id=self.user_id).count(), 1)
+
+    def test_idempotency_key_reused_with_other_payload(self):
+        data = {'from_user_id': self.user_id, 'amount': '30.00', 'operation': TransactionType.WITHDRAWAL.value}
+        self.client.post(self.withdrawal_url, data=data, format='json', HTTP_IDEMPOTENCY_KEY='key-2')
+        data['amount'] = '40.00'
+        response = self.client.post(self.withdrawal_url, data=data, format='json', HTTP_IDEMPOTENCY_KEY='key-2')
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    def test_idempotency_key_replays_error_response(self):
+        data = {'from_user_id': self.user_id, 'amount': '150.00', 'operation': TransactionType.WITHDRAWAL.value}
+        first = self.client.post(self.withdrawal_url, data=data, format='json', HTTP_IDEMPOTENCY_KEY='key-3')
+        Balance.objects.filter(user_id=self.user_id).update(amount=Decimal('200.00'))
+        retry = self.client.post(self.withdrawal_url, data=data, format='json', HTTP_IDEMPOTENCY_KEY='key-3')
+        self.assertEqual(retry.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.balance.refresh_from_db()
+        self.assertEqual(self.balance.amount, Decimal('200.00'))
+
     def test_withdrawal_insufficient_funds(self):
         data = {
             'from_user_id': self.user_id,
@@ -77,9 +128,173 @@ class TransactionTests(APITestCase):
         self.assertEqual(self.balance.amount, Decimal('50.00'))
         self.assertEqual(recipient_balance.amount, Decimal('50.00'))
 
+    def test_db_pool_stats_without_pooling(self):
+        url = reverse('db_pool_stats')
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_login(User.objects.create_user('admin', is_staff=True))
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('pooling', response.data)
+
     def test_get_balance_not_found(self):
         invalid_user_id = 999
         url = reverse('get_user_balance', args=[invalid_user_id])
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
         self.assertIn('error', response.data)
+
+    def test_batch_atomic_success(self):
+        data = {
+            'operations': [
+                {'to_user_id': 2, 'amount': '30.00', 'operation': TransactionType.DEPOSIT.value},
+                {'from_user_id': self.user_id, 'to_user_id': 2, 'amount': '20.00',
+                 'operation': TransactionType.TRANSFER.value},
+            ]
+        }
+        response = self.client.post(self.batch_url, data=data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['succeeded'], 2)
+        self.assertEqual(response.data['results'][1]['balance'], '80.00')
+        self.assertEqual(Balance.objects.get(user_id=2).amount, Decimal('50.00'))
+
+    def test_batch_atomic_invalid_operation_rejects_batch(self):
+        data = {
+            'operations': [
+                {'to_user_id': 2, 'amount': '30.00', 'operation': TransactionType.DEPOSIT.value},
+                {'amount': '30.00', 'operation': TransactionType.WITHDRAWAL.value},
+            ]
+        }
+        response = self.client.post(self.batch_url, data=data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['results'][0]['status'], 'skipped')
+        self.assertIn('from_user_id', response.data['results'][1]['errors'])
+        self.assertFalse(Balance.objects.filter(user_id=2).exists())
+
+    def test_batch_partial_mode(self):
+        data = {
+            'atomic': False,
+            'operations': [
+                {'from_user_id': self.user_id, 'amount': '500.00', 'operation': TransactionType.WITHDRAWAL.value},
+                {'from_user_id': self.user_id, 'amount': '40.00', 'operation': TransactionType.WITHDRAWAL.value},
+            ]
+        }
+        response = self.client.post(self.batch_url, data=data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['status'] for item in response.data['results']], ['error', 'ok'])
+        self.balance.refresh_from_db()
+        self.assertEqual(self.balance.amount, Decimal('60.00'))
+
+
+class UserTransactionsTests(APITestCase):
+    def setUp(self):
+        self.user_id = 1
+        self.url = reverse('get_user_transactions', args=[self.user_id])
+        Transaction.objects.bulk_create([
+            Transaction(user_id=self.user_id, to_user_id=self.user_id, amount=Decimal(index),
+                        operation=TransactionType.DEPOSIT.value)
+            for index in range(1, 16)
+        ])
+
+    def test_cursor_pagination_walks_all_pages(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertNotIn('count', response.data)
+
+        next_response = self.client.get(response.data['next'])
+        self.assertEqual(len(next_response.data['results']), 5)
+        self.assertIsNone(next_response.data['next'])
+
+        ids = [row['id'] for row in response.data['results'] + next_response.data['results']]
+        self.assertEqual(ids, sorted(ids, reverse=True))
+
+    def test_ascending_ordering(self):
+        response = self.client.get(self.url, {'ordering': 'created_at'})
+        ids = [row['id'] for row in response.data['results']]
+        self.assertEqual(ids, sorted(ids))
+
+    def test_unindexed_ordering_rejected(self):
+        response = self.client.get(self.url, {'ordering': 'comment'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_cursor_rejected(self):
+        response = self.client.get(self.url, {'cursor': 'garbage'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_no_transactions(self):
+        response = self.client.get(reverse('get_user_transactions', args=[999]))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_date_range(self):
+        Transaction.objects.filter(amount__lte=5).update(created_at=datetime(2026, 1, 15, tzinfo=timezone.utc))
+
+        response = self.client.get(self.url, {'from': '2026-01-01', 'to': '2026-02-01'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 5)
+
+        response = self.client.get(self.url, {'from': '2026-02-01'})
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertIsNone(response.data['next'])
+
+    def test_invalid_date_range(self):
+        response = self.client.get(self.url, {'from': '2026-02-01', 'to': '2026-01-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(self.url, {'from': 'yesterday'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_default_fields_match_model_serializer(self):
+        Transaction.objects.filter(amount=15).update(comment='комментарий', from_user_id=2)
+        response = self.client.get(self.url)
+
+        expected = UserTransactionsListSerializer(
+            Transaction.objects.filter(user_id=self.user_id).order_by('-created_at', '-id')[:10], many=True).data
+        self.assertEqual(json.loads(response.content)['results'], json.loads(json.dumps(expected)))
+
+    def test_fields_projection(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {'fields': 'amount,id,amount'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(response.data['results'][0]), ['amount', 'id'])
+        self.assertEqual(response.data['results'][0]['amount'], '15.00')
+        self.assertNotIn('comment', queries.captured_queries[-1]['sql'])
+
+        next_response = self.client.get(response.data['next'])
+        self.assertEqual(len(next_response.data['results']), 5)
+
+    def test_invalid_fields_rejected(self):
+        for fields in ('amount,password', ','):
+            response = self.client.get(self.url, {'fields': fields})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('fields', response.data)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class BalancesLookupTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        local_rates.clear()
+        store_exchange_rates({'conversion_rates': {'USD': 0.0125, 'EUR': 0.01}}, timeout=60)
+        Balance.objects.create(user_id=1, amount=Decimal('100.00'))
+        Balance.objects.create(user_id=2, amount=Decimal('250.00'))
+        self.url = reverse('get_balances')
+
+    def test_multiple_users_and_currencies(self):
+        response = self.client.get(self.url, {'user_ids': '1,2,3', 'currencies': 'rub,usd,EUR'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['balances'][1], {'RUB': '100.00', 'USD': '1.25', 'EUR': '1.00'})
+        self.assertEqual(response.data['balances'][2]['USD'], '3.12')
+        self.assertEqual(response.data['not_found'], [3])
+
+    def test_defaults_to_rub(self):
+        response = self.client.get(self.url, {'user_ids': '2'})
+        self.assertEqual(response.data['balances'][2], {'RUB': '250.00'})
+
+    def test_invalid_user_ids(self):
+        response = self.client.get(self.url, {'user_ids': '1,abc'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_unknown_currency(self):
+        response = self.client.get(self.url, {'user_ids': '1', 'currencies': 'USD,XXX'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
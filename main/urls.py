@@ -1,15 +1,44 @@
+from django.conf import settings
 from django.urls import path
 from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
 
+from main.async_views import AsyncGetUserBalanceView, AsyncGetUserTransactionsView
 from main.views import DepositAPIView, WithdrawalAPIView, TransferAPIView, GetUserBalanceAPIView, \
-    GetUserTransactionsAPIView
+    GetUserTransactionsAPIView, BatchTransactionAPIView, GetBalancesAPIView, DatabasePoolStatsAPIView, \
+    LedgerOutboxStatsAPIView, GetUserPeriodSummaryAPIView, ExportUserTransactionsView, \
+    MetricsView, LockContentionAPIView, FastTransactionView
+
+if settings.ASYNC_READ_VIEWS:
+    user_transactions_view = AsyncGetUserTransactionsView.as_view()
+    user_balance_view = AsyncGetUserBalanceView.as_view()
+else:
+    user_transactions_view = GetUserTransactionsAPIView.as_view()
+    user_balance_view = GetUserBalanceAPIView.as_view()
+
+if settings.TRANSACTION_FAST_PATH:
+    deposit_view = FastTransactionView.as_view(view_class=DepositAPIView)
+    withdrawal_view = FastTransactionView.as_view(view_class=WithdrawalAPIView)
+    transfer_view = FastTransactionView.as_view(view_class=TransferAPIView)
+else:
+    deposit_view = DepositAPIView.as_view()
+    withdrawal_view = WithdrawalAPIView.as_view()
+    transfer_view = TransferAPIView.as_view()
 
 urlpatterns = [
-    path('api/v1/transactions/deposit/', DepositAPIView.as_view(), name='deposit'),
-    path('api/v1/transactions/withdrawal/', WithdrawalAPIView.as_view(), name='withdrawal'),
-    path('api/v1/transactions/transfer/', TransferAPIView.as_view(), name='transfer'),
-    path('api/v1/users/<int:user_id>/transactions/', GetUserTransactionsAPIView.as_view(), name='get_user_transactions'),
-    path('api/v1/users/<int:user_id>/balance/', GetUserBalanceAPIView.as_view(), name='get_user_balance'),
+    path('api/v1/transactions/deposit/', deposit_view, name='deposit'),
+    path('api/v1/transactions/withdrawal/', withdrawal_view, name='withdrawal'),
+    path('api/v1/transactions/transfer/', transfer_view, name='transfer'),
+    path('api/v1/transactions/batch/', BatchTransactionAPIView.as_view(), name='batch'),
+    path('api/v1/users/<int:user_id>/transactions/', user_transactions_view, name='get_user_transactions'),
+    path('api/v1/users/<int:user_id>/transactions/export/', ExportUserTransactionsView.as_view(),
+         name='export_user_transactions'),
+    path('api/v1/users/<int:user_id>/balance/', user_balance_view, name='get_user_balance'),
+    path('api/v1/users/<int:user_id>/summary/', GetUserPeriodSummaryAPIView.as_view(), name='get_user_summary'),
+    path('api/v1/balances/', GetBalancesAPIView.as_view(), name='get_balances'),
+    path('api/v1/health/db-pool/', DatabasePoolStatsAPIView.as_view(), name='db_pool_stats'),
+    path('api/v1/health/ledger-outbox/', LedgerOutboxStatsAPIView.as_view(), name='ledger_outbox_stats'),
+    path('api/v1/admin/lock-contention/', LockContentionAPIView.as_view(), name='lock_contention'),
+    path('metrics', MetricsView.as_view(), name='metrics'),
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
     path('api/schema/swagger-ui/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
     path('api/schema/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
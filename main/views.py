@@ -1,20 +1,40 @@
 from decimal import Decimal
-from typing import Any
+from typing import Any, Callable
 
-from django.core.cache import cache
+from django.conf import settings
+from django.db import connections
+from django.core.handlers.asgi import ASGIRequest
 from django.db.models import QuerySet
+from django.http import HttpRequest, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from rest_framework import status
-from rest_framework.exceptions import ValidationError, NotFound, APIException
+from rest_framework.exceptions import APIException, ValidationError, NotFound
 from rest_framework.generics import ListAPIView
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.permissions import IsAdminUser
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from main.enums import TransactionType
-from main.models import Balance, Transaction
-from main.serializers import TransactionSerializer, UserTransactionsListSerializer
-from main.services.transaction_service import process_transaction, record_transaction
+from main.models import Transaction
+from main.pagination import TransactionCursorPagination, filter_created_range, merge_pending
+from main.serializers import TransactionSerializer, UserTransactionsListSerializer, BatchTransactionSerializer, \
+    BalancesQuerySerializer, TransactionsRangeSerializer, PeriodSummaryQuerySerializer, TransactionsListQuerySerializer
+from main.services.balance_cache import get_cached_balance, cache_balance
+from main.services.contention import contention_profiler
+from main.services.export import EXPORT_FORMATS, STREAMERS, aiter_chunks, iter_transaction_rows
+from main.services.exchange_rates import get_exchange_rate, get_exchange_rates
+from main.services.historical_rates import convert_rows
+from main.services.fast_path import dumps, loads, validate_transaction
+from main.services.idempotency import idempotent_response
+from main.services.ledger import get_outbox_stats, get_pending_transactions
+from main.services.metrics import render_metrics, timed
+from main.services.projection import TRANSACTION_FIELDS, get_columns, project_queryset, project_records, \
+    serialize_rows
+from main.services.sharding import load_balances
+from main.services.summaries import get_summaries
+from main.services.transaction_service import process_transaction, process_batch
 
 
 class BaseTransactionAPIView(APIView):
@@ -42,13 +62,39 @@ class BaseTransactionAPIView(APIView):
         if request.data.get('operation') != self.OPERATION_TYPE:
             raise ValidationError({'error': f'Недопустимая операция для transactions/{self.OPERATION_TYPE}/'})
 
-        return self.handle_transaction(request)
+        return self.idempotent(request, self.handle_transaction)
+
+    def idempotent(self, request: Request, handler: Callable[[Request], Response]) -> Response:
+        """
+        Исполняет обработчик запроса с учётом заголовка Idempotency-Key.
+
+        Если заголовок передан, повторный запрос с тем же ключом получает сохранённый ответ на исходный запрос
+        без повторного исполнения транзакции, см. idempotent_response.
+
+        Args:
+            request (Request): POST-запрос клиента.
+            handler (Callable[[Request], Response]): Обработчик запроса.
+
+        Returns:
+            Response: ответ сервера на запрос клиента.
+
+        Raises:
+            ValidationError: В случае, если значение заголовка Idempotency-Key длиннее 255 символов.
+        """
+        key = request.headers.get('Idempotency-Key')
+        if not key:
+            return handler(request)
+        if len(key) > 255:
+            raise ValidationError({'error': 'Значение Idempotency-Key не должно превышать 255 символов'})
+
+        return idempotent_response(self.OPERATION_TYPE or 'batch', key, request.data, lambda: handler(request))
 
     def handle_transaction(self, request: Request) -> Response:
         """
         Обрабатывает POST-запрос.
 
         Выполняет транзакцию с использованием сериализованных и валидированных входных данных, возвращает объект Response.
+        Записи Transaction сохраняются в той же транзакции базы данных, что и изменения балансов.
 
         Args:
             request (Request): POST-запрос клиента.
@@ -56,14 +102,11 @@ class BaseTransactionAPIView(APIView):
         Returns:
             Response: ответ сервера на запрос клиента.
         """
-        serializer = TransactionSerializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
+        with timed('validate', self.OPERATION_TYPE):
+            serializer = TransactionSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
 
         transaction_data = process_transaction(serializer.validated_data)
-
-        comment = serializer.validated_data.get('comment')
-        record_transaction(transaction_data, comment)
-
         balance_after = self.get_balance_after(transaction_data)
 
         return Response(
@@ -75,7 +118,8 @@ class BaseTransactionAPIView(APIView):
             status=status.HTTP_200_OK
         )
 
-    def get_balance_after(self, transaction_data: dict[str, Any]) -> Decimal:
+    @staticmethod
+    def get_balance_after(transaction_data: dict[str, Any]) -> Decimal:
         """
         Возвращает баланс денежных средств пользователя после исполнения транзакции.
 
@@ -124,6 +168,155 @@ class TransferAPIView(BaseTransactionAPIView):
     OPERATION_TYPE = TransactionType.TRANSFER.value
 
 
+class BatchTransactionAPIView(BaseTransactionAPIView):
+    """
+    Дочерний класс BaseTransactionAPIView, отвечающий за обработку запросов на /transactions/batch/
+
+    Исполняет пакет операций любых типов в рамках одной транзакции базы данных.
+    """
+    serializer_class = BatchTransactionSerializer
+
+    def post(self, request: Request) -> Response:
+        """
+        Принимает POST-запрос клиента.
+
+        Валидирует каждую операцию пакета, исполняет валидные операции и возвращает результат по каждой из них.
+        В режиме atomic (по умолчанию) при ошибке любой операции пакет целиком отменяется.
+
+        Args:
+            request (Request): POST-запрос клиента.
+
+        Returns:
+            Response: ответ сервера на запрос клиента.
+        """
+        return self.idempotent(request, self.handle_batch)
+
+    def handle_batch(self, request: Request) -> Response:
+        """
+        Обрабатывает POST-запрос с пакетом операций.
+
+        Args:
+            request (Request): POST-запрос клиента.
+
+        Returns:
+            Response: ответ сервера на запрос клиента.
+        """
+        with timed('validate', 'batch'):
+            batch_serializer = BatchTransactionSerializer(data=request.data)
+            batch_serializer.is_valid(raise_exception=True)
+            atomic = batch_serializer.validated_data['atomic']
+
+            results = []
+            valid_operations = []
+            for operation_data in batch_serializer.validated_data['operations']:
+                serializer = TransactionSerializer(data=operation_data)
+                if serializer.is_valid():
+                    valid_operations.append(serializer.validated_data)
+                    results.append(None)
+                else:
+                    results.append({'status': 'error', 'errors': serializer.errors})
+
+        if atomic and len(valid_operations) != len(results):
+            results = [result or {'status': 'skipped'} for result in results]
+            return self.batch_response(results, status.HTTP_400_BAD_REQUEST)
+
+        processed = iter(process_batch(valid_operations, atomic=atomic))
+        results = [result or next(processed) for result in results]
+
+        failed = any(result['status'] != 'ok' for result in results)
+        response_status = status.HTTP_400_BAD_REQUEST if atomic and failed else status.HTTP_200_OK
+        return self.batch_response(results, response_status)
+
+    def batch_response(self, results: list[dict[str, Any]], response_status: int) -> Response:
+        """
+        Формирует ответ сервера с результатами операций пакета.
+
+        Args:
+            results (list[dict[str, Any]]): Результаты операций в порядке их передачи.
+            response_status (int): HTTP-статус ответа.
+
+        Returns:
+            Response: ответ сервера на запрос клиента.
+        """
+        items = []
+        for index, result in enumerate(results):
+            item = {'index': index, 'status': result['status']}
+            if result['status'] == 'ok':
+                item['balance'] = f'{self.get_balance_after(result):.2f}'
+                item['completed_at'] = result['completed_at']
+            elif 'errors' in result:
+                item['errors'] = result['errors']
+            items.append(item)
+
+        succeeded = sum(item['status'] == 'ok' for item in items)
+        return Response(
+            {
+                'detail': 'Пакет операций обработан' if response_status == status.HTTP_200_OK
+                else 'Пакет операций отклонён',
+                'succeeded': succeeded,
+                'failed': len(items) - succeeded,
+                'results': items
+            },
+            status=response_status
+        )
+
+
+class FastTransactionView(View):
+    """
+    Быстрый путь эндпоинтов зачисления, списания и перевода (TRANSACTION_FAST_PATH = True).
+
+    Обычное представление Django: тело запроса разбирается и ответ сериализуется через orjson (при его наличии),
+    данные проверяются validate_transaction без создания сериализатора DRF. Запросы, которые быстрый путь
+    не принимает (другой Content-Type, заголовок Idempotency-Key, некорректные или нетипичные данные),
+    целиком обрабатываются представлением DRF view_class, поэтому ответы с ошибками валидации не меняются.
+
+    Attributes:
+        view_class (type[BaseTransactionAPIView] | None): Представление DRF того же эндпоинта.
+        fallback (Callable | None): Функция представления view_class; создаётся в as_view.
+    """
+    view_class = None
+    fallback = None
+
+    @classmethod
+    def as_view(cls, **initkwargs: Any) -> Callable:
+        initkwargs.setdefault('fallback', initkwargs['view_class'].as_view())
+        # Как и у APIView: эндпоинты транзакций не используют сессионную аутентификацию
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    def post(self, request: HttpRequest) -> HttpResponse:
+        """
+        Принимает POST-запрос клиента.
+
+        Args:
+            request (HttpRequest): POST-запрос клиента.
+
+        Returns:
+            HttpResponse: ответ сервера на запрос клиента.
+        """
+        operation = self.view_class.OPERATION_TYPE
+        data = None
+        if request.content_type == 'application/json' and 'Idempotency-Key' not in request.headers:
+            with timed('validate', operation):
+                try:
+                    data = validate_transaction(loads(request.body))
+                except ValueError:
+                    data = None
+        if data is None or data['operation'] != operation:
+            return self.fallback(request)
+
+        try:
+            transaction_data = process_transaction(data)
+        except APIException as exc:
+            detail = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+            return HttpResponse(dumps(detail), status=exc.status_code, content_type='application/json')
+
+        return HttpResponse(dumps({
+            'detail': 'Операция успешно выполнена',
+            'balance': f'{self.view_class.get_balance_after(transaction_data):.2f}',
+            'completed_at': transaction_data['completed_at']
+        }), content_type='application/json')
+
+
 class GetUserBalanceAPIView(APIView):
     """
     Класс, предоставляющий метод получения баланса денежных средств пользователя по ID
@@ -148,7 +341,7 @@ class GetUserBalanceAPIView(APIView):
 
         if currency != 'RUB':
             rate = self.get_exchange_rate(currency)
-            converted_balance = Decimal(balance) * Decimal(rate)
+            converted_balance = balance * rate
         else:
             converted_balance = balance
 
@@ -163,7 +356,10 @@ class GetUserBalanceAPIView(APIView):
 
     def get_balance(self, user_id: int) -> Decimal:
         """
-        Получает баланс пользователя из базы данных по его ID.
+        Получает баланс пользователя по его ID.
+
+        Баланс читается из кэша балансов, при промахе - из базы данных с последующей записью в кэш.
+        Баланс шардированного счёта равен сумме его строк, см. load_balances.
 
         Args:
             user_id (int): ID пользователя, чей баланс необходимо вернуть.
@@ -174,64 +370,349 @@ class GetUserBalanceAPIView(APIView):
         Raises:
             NotFound: В случае, если указанному user_id не соответствует ни один объект Balance.
         """
-        try:
-            balance = Balance.objects.get(user_id=user_id)
-        except Balance.DoesNotExist:
+        cached_amount = get_cached_balance(user_id)
+        if cached_amount is not None:
+            return cached_amount
+
+        balance = load_balances([user_id]).get(user_id)
+        if balance is None:
             raise NotFound({'error': 'Баланс пользователя не найден'})
 
+        cache_balance(user_id, balance.amount, balance.version)
         return balance.amount
 
-    def get_exchange_rate(self, currency: str) -> float:
+    def get_exchange_rate(self, currency: str) -> Decimal:
         """
-        Возвращает курс обмена валют из кэшированного словаря.
+        Возвращает курс обмена валют из локальной таблицы курсов процесса.
+
+        Таблица курсов перечитывается из Redis только при изменении её версии, см. LocalRateTable.
 
         Args:
             currency (str): Наименование валюты. Например, 'USD', 'CNY', 'JPY'.
 
         Returns:
-            float: извлечённое значение курса обмена.
+            Decimal: извлечённое значение курса обмена.
 
         Raises:
             APIException: В случае, если не удалось получить кэшированные данные о курсах валют.
             ValidationError: В случае, если переданное наименование валюты не было найдено в кэшированном ответе стороннего API.
         """
-        data = cache.get('exchange_rates')
-        if data is None:
-            raise APIException({'error': 'Данные о курсах валют временно недоступны'})
+        with timed('exchange_rate', 'balance'):
+            return get_exchange_rate(currency)
 
-        try:
-            rate = data['conversion_rates'][currency]
-        except KeyError:
-            raise ValidationError({'error': f'Валюта {currency} не найдена в ответе API'})
 
-        return rate
+class GetBalancesAPIView(APIView):
+    """
+    Класс, предоставляющий метод получения балансов нескольких пользователей в нескольких валютах одним запросом.
+    """
+
+    def get(self, request: Request) -> Response:
+        """
+        Принимает GET-запрос клиента.
+
+        Получает балансы всех запрошенных пользователей одним запросом к базе данных и конвертирует их
+        во все запрошенные валюты по одному снимку таблицы курсов.
+
+        Args:
+            request (Request): GET-запрос клиента.
+
+        Returns:
+            Response: ответ сервера на запрос клиента. Поле 'balances' содержит словарь вида
+                {user_id: {currency: balance}}, поле 'not_found' - ID пользователей, чьи балансы не найдены.
+        """
+        query_serializer = BalancesQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        user_ids = query_serializer.validated_data['user_ids']
+        currencies = query_serializer.validated_data['currencies']
+
+        rates = get_exchange_rates(currencies)
+        amounts = {user_id: balance.amount for user_id, balance in load_balances(user_ids).items()}
+
+        return Response(
+            {
+                'balances': {
+                    user_id: {currency: f'{amount * rate:.2f}' for currency, rate in rates.items()}
+                    for user_id, amount in amounts.items()
+                },
+                'not_found': [user_id for user_id in user_ids if user_id not in amounts]
+            },
+            status=status.HTTP_200_OK
+        )
+
+
+class GetUserPeriodSummaryAPIView(APIView):
+    """
+    Класс, предоставляющий метод получения итогов операций пользователя по дням или месяцам.
+    """
+
+    def get(self, request: Request, user_id: int) -> Response:
+        """
+        Принимает GET-запрос клиента.
+
+        Итоги читаются из таблицы UserPeriodSummary, обновляемой при исполнении транзакций, без чтения журнала.
+
+        Args:
+            request (Request): GET-запрос клиента.
+            user_id (int): ID пользователя.
+
+        Returns:
+            Response: ответ сервера на запрос клиента. Поле 'results' содержит итоги периодов в порядке
+                возрастания их начала; периоды без операций не возвращаются.
+        """
+        query_serializer = PeriodSummaryQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        period = query_serializer.validated_data['period']
+
+        summaries = get_summaries(user_id, period, query_serializer.validated_data.get('from'),
+                                  query_serializer.validated_data.get('to'))
+
+        return Response(
+            {
+                'user_id': user_id,
+                'period': period,
+                'results': [
+                    {
+                        'period_start': summary['period_start'].isoformat(),
+                        'deposited': f"{summary['deposited']:.2f}",
+                        'withdrawn': f"{summary['withdrawn']:.2f}",
+                        'transferred_in': f"{summary['transferred_in']:.2f}",
+                        'transferred_out': f"{summary['transferred_out']:.2f}",
+                        'count': summary['count'],
+                    }
+                    for summary in summaries
+                ]
+            },
+            status=status.HTTP_200_OK
+        )
 
 
 class GetUserTransactionsAPIView(ListAPIView):
     """
     Класс, предоставляющий метод получения пагинированного списка транзакций пользователя по его ID.
+
+    Использует курсорную пагинацию по (created_at, id), см. TransactionCursorPagination.
+    Параметры from и to ограничивают диапазон created_at, параметр fields - выводимые поля, параметр currency -
+    валюту, в которую суммы пересчитываются по курсу на день транзакции (см. convert_rows),
+    см. TransactionsListQuerySerializer. Записи читаются из базы данных кортежами только нужных столбцов
+    и сериализуются serialize_rows; UserTransactionsListSerializer описывает формат ответа в схеме OpenAPI.
+    При LEDGER_MODE = 'outbox' дополняет список транзакциями, ещё не перенесёнными в журнал, см. merge_pending.
     """
     serializer_class = UserTransactionsListSerializer
-    pagination_class = PageNumberPagination
+    pagination_class = TransactionCursorPagination
     queryset = Transaction.objects.all()
 
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        """
+        Принимает GET-запрос клиента.
+
+        Args:
+            request (Request): GET-запрос клиента.
+
+        Returns:
+            Response: ответ сервера на запрос клиента.
+        """
+        queryset = self.get_queryset()
+        page = self.paginate_queryset(queryset)
+        page = merge_pending(page, self.pending, self.paginator.descending, self.paginator.position is None,
+                             not self.paginator.has_next)
+
+        results = serialize_rows(page, self.selected_fields)
+        if self.currency != 'RUB':
+            with timed('exchange_rate', 'history'):
+                convert_rows(results, page, self.currency)
+        return self.get_paginated_response(results)
+
     def get_queryset(self) -> QuerySet:
         """
-        Возвращает кверисет экземпляров класса модели Transaction.
+        Возвращает кверисет транзакций в виде именованных кортежей столбцов, необходимых для вывода полей
+        из параметра запроса fields и для пагинации.
 
-        Кверисет содержит все транзакции пользователя с ID, переданным в параметре запроса user_id.
-        Сортирует результирующий кверисет по указанному в параметре запроса 'ordering' полю. По умолчанию - по убыванию даты.
+        Кверисет содержит все транзакции пользователя с ID, переданным в параметре запроса user_id,
+        в диапазоне дат из параметров запроса from и to. Сортировка по указанному в параметре запроса 'ordering' полю ('-created_at' по умолчанию или 'created_at')
+        выполняется при пагинации.
 
         Returns:
-            QuerySet: Отсортированный результирующий кверисет.
+            QuerySet: Результирующий кверисет.
 
         Raises:
-            ValidationError: В случае, если указанному user_id не соответствует ни один объект Transaction.
+            ValidationError: В случае, если указанному user_id не соответствует ни один объект Transaction
+                или передан некорректный диапазон дат либо недопустимое поле в fields.
         """
+        query_serializer = TransactionsListQuerySerializer(data=self.request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        date_range = query_serializer.validated_data
+        self.selected_fields = date_range.get('fields', TRANSACTION_FIELDS)
+        self.currency = date_range['currency']
+        columns = get_columns(self.selected_fields)
+
         user_id = self.kwargs.get('user_id')
-        ordering = self.request.query_params.get('ordering', '-created_at')
-        queryset = self.queryset.filter(user_id=user_id).order_by(ordering)
-        if not queryset:
+        queryset = filter_created_range(self.queryset.filter(user_id=user_id), date_range)
+        pending = filter_created_range(get_pending_transactions(user_id), date_range)
+        self.pending = project_records(pending, columns)
+        if not self.pending and not queryset.exists():
             raise ValidationError({'error': 'Транзакции пользователя не найдены'})
 
-        return queryset
+        return project_queryset(queryset, columns)
+
+
+class ExportUserTransactionsView(View):
+    """
+    Класс, предоставляющий метод потоковой выгрузки всех транзакций пользователя в NDJSON или CSV.
+
+    Обычное представление Django, а не DRF: DRF интерпретирует параметр запроса format как выбор рендерера.
+    """
+
+    def get(self, request: HttpRequest, user_id: int) -> HttpResponse:
+        """
+        Принимает GET-запрос клиента.
+
+        Транзакции читаются через серверный курсор и отправляются клиенту по мере чтения в порядке возрастания
+        (created_at, id), см. iter_transaction_rows; под ASGI-сервером - асинхронным итератором, см. aiter_chunks.
+        Параметр format принимает значения 'ndjson' (по умолчанию) и 'csv'; параметры from и to ограничивают
+        диапазон дат, см. TransactionsRangeSerializer.
+
+        Args:
+            request (HttpRequest): GET-запрос клиента.
+            user_id (int): ID пользователя.
+
+        Returns:
+            HttpResponse: потоковый ответ сервера или ответ с ошибкой валидации параметров.
+        """
+        export_format = request.GET.get('format', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            return JsonResponse({'error': f"Формат выгрузки должен быть одним из: {', '.join(EXPORT_FORMATS)}"},
+                                status=status.HTTP_400_BAD_REQUEST)
+
+        range_serializer = TransactionsRangeSerializer(data=request.GET)
+        if not range_serializer.is_valid():
+            return JsonResponse(range_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        chunks = STREAMERS[export_format](iter_transaction_rows(user_id, range_serializer.validated_data))
+        if isinstance(request, ASGIRequest):
+            # Под ASGI синхронный итератор был бы прочитан в память целиком до отправки ответа
+            chunks = aiter_chunks(chunks)
+        response = StreamingHttpResponse(chunks, content_type=EXPORT_FORMATS[export_format])
+        response['Content-Disposition'] = f'attachment; filename="transactions_{user_id}.{export_format}"'
+        # Запрещает буферизацию ответа обратным прокси (nginx), чтобы клиент получал строки по мере чтения
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
+class LockContentionAPIView(APIView):
+    """
+    Класс, предоставляющий администраторам статистику ожидания блокировок балансов по счетам.
+
+    Статистика собирается только при LOCK_PROFILING = True, см. ContentionProfiler.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request: Request) -> Response:
+        """
+        Принимает GET-запрос клиента.
+
+        Возвращает счета с наибольшим суммарным временем ожидания блокировок. Параметр limit задаёт
+        количество счетов (по умолчанию 20, не более LOCK_PROFILING_TOP_K).
+
+        Args:
+            request (Request): GET-запрос клиента.
+
+        Returns:
+            Response: ответ сервера на запрос клиента. Поле 'scope' равно 'cluster' для общей по процессам
+                статистики из Redis и 'process' для статистики текущего процесса.
+        """
+        try:
+            limit = int(request.query_params.get('limit', 20))
+        except ValueError:
+            raise ValidationError({'error': 'Параметр limit должен быть целым числом'})
+        if not 1 <= limit <= settings.LOCK_PROFILING_TOP_K:
+            raise ValidationError({'error': f'Параметр limit должен быть от 1 до {settings.LOCK_PROFILING_TOP_K}'})
+
+        scope, accounts = contention_profiler.top(limit)
+        return Response({'enabled': settings.LOCK_PROFILING, 'scope': scope, 'accounts': accounts},
+                        status=status.HTTP_200_OK)
+
+    def delete(self, request: Request) -> Response:
+        """
+        Принимает DELETE-запрос клиента и сбрасывает статистику ожидания блокировок.
+
+        Args:
+            request (Request): DELETE-запрос клиента.
+
+        Returns:
+            Response: пустой ответ сервера.
+        """
+        contention_profiler.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class MetricsView(View):
+    """
+    Класс, предоставляющий метрики процесса в текстовом формате Prometheus, см. render_metrics.
+
+    Обычное представление Django, а не DRF: ответ не проходит через рендереры и согласование формата.
+    """
+
+    def get(self, request: HttpRequest) -> HttpResponse:
+        return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+class DatabasePoolStatsAPIView(APIView):
+    """
+    Класс, предоставляющий администраторам состояние пула соединений с базой данных текущего процесса-воркера.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request: Request) -> Response:
+        """
+        Принимает GET-запрос клиента.
+
+        Возвращает размер пула, количество свободных и занятых соединений, количество запросов, ожидающих
+        соединения, и накопленную статистику psycopg_pool. Значения относятся к процессу, обработавшему запрос.
+
+        Args:
+            request (Request): GET-запрос клиента.
+
+        Returns:
+            Response: ответ сервера на запрос клиента. Статус 503, если пул закрыт.
+        """
+        pool = getattr(connections['default'], 'pool', None)
+        if pool is None:
+            return Response({'pooling': False}, status=status.HTTP_200_OK)
+
+        stats = pool.get_stats()
+        return Response(
+            {
+                'pooling': True,
+                'closed': pool.closed,
+                'min_size': pool.min_size,
+                'max_size': pool.max_size,
+                'size': stats.get('pool_size', 0),
+                'available': stats.get('pool_available', 0),
+                'in_use': stats.get('pool_size', 0) - stats.get('pool_available', 0),
+                'requests_waiting': stats.get('requests_waiting', 0),
+                'stats': stats
+            },
+            status=status.HTTP_503_SERVICE_UNAVAILABLE if pool.closed else status.HTTP_200_OK
+        )
+
+
+class LedgerOutboxStatsAPIView(APIView):
+    """
+    Класс, предоставляющий администраторам состояние транзакционного outbox журнала транзакций.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request: Request) -> Response:
+        """
+        Принимает GET-запрос клиента.
+
+        Возвращает режим записи журнала, количество записей outbox, ожидающих переноса в журнал, время исполнения
+        самой старой из них и отставание журнала от текущего времени в секундах.
+
+        Args:
+            request (Request): GET-запрос клиента.
+
+        Returns:
+            Response: ответ сервера на запрос клиента.
+        """
+        return Response({'mode': settings.LEDGER_MODE, **get_outbox_stats()}, status=status.HTTP_200_OK)